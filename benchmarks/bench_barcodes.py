@@ -0,0 +1,60 @@
+"""
+Barcode checkout load test: startup time and per-scan latency of LibraryManager
+for growing numbers of copies.
+
+The barcode index is loaded when barcodes are first used: on the first start
+this labels every copy and writes the index file; the restart reads it back. Scans run in journal mode, so no checkout rewrites the catalog file.
+
+Usage: python -m benchmarks.bench_barcodes [copies ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.common import write_catalog, quiet, time_per_call, parse_sizes
+from data.barcode_index import format_barcode
+from data.books import DataManager
+from services.library_manager import LibraryManager
+
+DEFAULT_COPIES = [10_000, 100_000, 1_000_000]
+COPIES_PER_TITLE = 2
+SCANS = 500
+
+
+def run(copies):
+    """
+    Build a catalog with 'copies' copies, start the library twice and time
+    barcode lookups, checkouts and returns.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, copies // COPIES_PER_TITLE, copies=COPIES_PER_TITLE)
+        with quiet():
+            start = time.perf_counter()
+            LibraryManager(file_path, use_journal=True, checkpoint_interval=10 ** 9).barcodes
+            first_start = time.perf_counter() - start
+            start = time.perf_counter()
+            library_manager = LibraryManager(file_path, use_journal=True, checkpoint_interval=10 ** 9)
+            library_manager.barcodes
+            restart = time.perf_counter() - start
+
+        rng = np.random.default_rng(copies)
+        barcodes = [(format_barcode(number),) for number in rng.choice(len(library_manager.barcodes), SCANS, replace=False)]
+        with quiet():
+            lookup = time_per_call(library_manager.barcodes.lookup, barcodes)
+            borrow = time_per_call(library_manager.borrow_by_barcode, [barcode + ("kiosk",) for barcode in barcodes])
+            give_back = time_per_call(library_manager.return_by_barcode, barcodes)
+        DataManager.get_instance().disable_journal()
+    return first_start, restart, lookup, borrow, give_back
+
+
+def main(argv):
+    print(f"{'copies':>10} {'first s':>8} {'restart s':>10} {'lookup us':>10} {'borrow us':>10} {'return us':>10}")
+    for copies in parse_sizes(argv, DEFAULT_COPIES):
+        first_start, restart, lookup, borrow, give_back = run(copies)
+        print(f"{copies:>10} {first_start:>8.2f} {restart:>10.2f} {lookup:>10.1f} {borrow:>10.1f} {give_back:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,49 @@
+"""
+Wall time of the LibraryManager batch operations for growing batches.
+
+Usage: python -m benchmarks.bench_batch [batch size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.common import write_catalog, quiet, parse_sizes
+from models.book import Book
+from services.library_manager import LibraryManager
+
+DEFAULT_SIZES = [1_000, 10_000]
+
+
+def run(size):
+    """
+    Build a catalog of 'size' titles and time one batch of 'size' borrows,
+    returns and additions, each persisted with a full save of the CSV file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, size)
+        with quiet():
+            library_manager = LibraryManager(file_path)
+
+        keys = [(f"Title {i}", f"Author {i % max(size // 10, 1)}") for i in range(size)]
+        shipment = [Book(f"New Title {i}", "New Author", "Fiction", 2024, 2) for i in range(size)]
+        timings = []
+        with quiet():
+            for function, batch in ((library_manager.borrow_many, [key + ("bench",) for key in keys]),
+                                    (library_manager.return_many, keys),
+                                    (library_manager.add_books, shipment)):
+                start = time.perf_counter()
+                function(batch)
+                timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(argv):
+    print(f"{'batch':>10} {'borrow ms':>10} {'return ms':>10} {'add ms':>10}")
+    for size in parse_sizes(argv, DEFAULT_SIZES):
+        borrow, give_back, add = run(size)
+        print(f"{size:>10} {borrow * 1e3:>10.1f} {give_back * 1e3:>10.1f} {add * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,125 @@
+"""
+Throughput of concurrent borrows and returns, with and without thread-safe mode.
+
+Every thread runs a random mix of borrow_book and return_book on a small set of
+hot titles. Afterwards the loan state is checked against the successful
+operations: if two borrows handed out the same copy, a book ends up with fewer
+loaned copies than successful borrows minus successful returns.
+
+To make the race show up in a short run, every borrow yields to the other
+threads between finding a free copy and marking it loaned. Without thread-safe
+mode some books must break the invariant; with it none may.
+
+Usage: python -m benchmarks.bench_concurrency [threads ...]
+"""
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+import numpy as np
+from benchmarks.common import write_catalog, quiet, parse_sizes
+from data.books import DataManager
+from services.library_manager import LibraryManager
+
+DEFAULT_THREADS = [1, 2, 4, 8]
+TITLES = 50
+OPERATIONS_PER_THREAD = 2_000
+
+
+@contextlib.contextmanager
+def yield_after_finding_a_copy(book_class):
+    """
+    Make first_free_copy release the GIL before returning, so another thread
+    can take the same copy before the caller marks it loaned.
+
+    Args:
+        book_class (type): The class of the library's books (Book, or BookView with a catalog store).
+    """
+    first_free_copy = book_class.first_free_copy
+
+    def first_free_copy_then_yield(book):
+        copy_id = first_free_copy(book)
+        time.sleep(0)
+        return copy_id
+
+    book_class.first_free_copy = first_free_copy_then_yield
+    try:
+        yield
+    finally:
+        book_class.first_free_copy = first_free_copy
+
+
+def run(threads, thread_safe):
+    """
+    Run the workload and return the throughput in operations per second and the
+    number of books whose loan state broke the invariant. Operations that raised
+    (only seen without thread-safe mode) are counted as errors.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, TITLES)
+        with quiet():
+            library_manager = LibraryManager(file_path, use_journal=True, checkpoint_interval=10 ** 9,
+                                             thread_safe=thread_safe)
+        keys = [(f"Title {i}", f"Author {i % max(TITLES // 10, 1)}") for i in range(TITLES)]
+        borrowed, returned, errors = Counter(), Counter(), Counter()
+        counter_lock = threading.Lock()
+
+        def desk(seed):
+            rng = np.random.default_rng(seed)
+            local_borrowed, local_returned, local_errors = Counter(), Counter(), Counter()
+            for key_index, borrow in zip(rng.integers(0, TITLES, OPERATIONS_PER_THREAD),
+                                         rng.random(OPERATIONS_PER_THREAD) < 0.5):
+                key = keys[key_index]
+                try:
+                    if borrow:
+                        if library_manager.borrow_book(*key, f"user{seed}"):
+                            local_borrowed[key] += 1
+                    elif library_manager.return_book(*key):
+                        local_returned[key] += 1
+                except Exception:
+                    local_errors[key] += 1
+            with counter_lock:
+                borrowed.update(local_borrowed)
+                returned.update(local_returned)
+                errors.update(local_errors)
+
+        workers = [threading.Thread(target=desk, args=(seed,)) for seed in range(threads)]
+        with quiet(), yield_after_finding_a_copy(type(library_manager.get_book(*keys[0]))):
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+        DataManager.get_instance().disable_journal()
+
+        violations = 0
+        for key in keys:
+            book = library_manager.get_book(*key)
+            loaned = list(book.is_loaned.values()).count("yes")
+            if loaned != borrowed[key] - returned[key] or book.borrow_count != borrowed[key]:
+                violations += 1
+    return threads * OPERATIONS_PER_THREAD / elapsed, violations, sum(errors.values())
+
+
+def main(argv):
+    # Switch threads far more often than the default 5 ms, so races surface within a short run
+    sys.setswitchinterval(1e-5)
+    print(f"{'threads':>8} {'mode':>12} {'ops/s':>10} {'violations':>11} {'errors':>7}")
+    for threads in parse_sizes(argv, DEFAULT_THREADS):
+        for thread_safe in (False, True):
+            throughput, violations, errors = run(threads, thread_safe)
+            mode = "thread-safe" if thread_safe else "unsafe"
+            print(f"{threads:>8} {mode:>12} {throughput:>10.0f} {violations:>11} {errors:>7}")
+            if thread_safe and violations + errors:
+                raise AssertionError(f"thread-safe mode broke {violations} books with {threads} threads")
+            if not thread_safe and threads > 1 and not violations + errors:
+                raise AssertionError(f"unsafe mode showed no race with {threads} threads")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,52 @@
+"""
+Latency of a title search by column scan (SearchByName), through the inverted
+token index (SearchByKeywords) and through the trigram index (SearchByTrigrams)
+for growing catalogs. Build times are those of the first search with an index.
+
+Usage: python -m benchmarks.bench_keyword_search [size ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from benchmarks.common import write_catalog, quiet, time_per_call, parse_sizes
+from data.books import DataManager, load_books_from_file
+from models.search_strategy import SearchByName, SearchByKeywords, SearchByTrigrams
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = [("Title 4242",), ("title 99",), ("author 7",)]
+
+
+def run(size):
+    """
+    Load a catalog of 'size' titles and time the strategies on the same queries.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, size)
+        with quiet():
+            load_books_from_file(file_path, use_cache=False)
+        data_manager = DataManager.get_instance()
+        books_df = data_manager.get_data()
+
+        start = time.perf_counter()
+        data_manager.get_search_index()
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        data_manager.get_trigram_index()
+        trigram_build = time.perf_counter() - start
+        scan = time_per_call(lambda query: SearchByName().search(books_df, query), QUERIES * 5)
+        indexed = time_per_call(lambda query: SearchByKeywords(fields=["title"]).search(books_df, query), QUERIES * 5)
+        trigram = time_per_call(lambda query: SearchByTrigrams("title").search(books_df, query), QUERIES * 5)
+    return build, trigram_build, scan, indexed, trigram
+
+
+def main(argv):
+    print(f"{'titles':>10} {'build s':>8} {'trigram build s':>16} {'scan us':>10} {'index us':>10} {'trigram us':>11}")
+    for size in parse_sizes(argv, DEFAULT_SIZES):
+        build, trigram_build, scan, indexed, trigram = run(size)
+        print(f"{size:>10} {build:>8.2f} {trigram_build:>16.2f} {scan:>10.0f} {indexed:>10.0f} {trigram:>11.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,47 @@
+"""
+Borrow and lookup latency of LibraryManager for growing catalogs.
+
+Usage: python -m benchmarks.bench_library_index [size ...]
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+from benchmarks.common import write_catalog, quiet, time_per_call, parse_sizes
+from data.books import DataManager
+from services.library_manager import LibraryManager
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+OPERATIONS = 200
+
+
+def run(size):
+    """
+    Build a catalog of 'size' titles and time lookups and borrow / return pairs
+    in journal mode, so no operation rewrites the catalog file.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, size)
+        with quiet():
+            library_manager = LibraryManager(file_path, use_journal=True, checkpoint_interval=10 ** 9)
+
+        rng = np.random.default_rng(size)
+        keys = [(f"Title {i}", f"Author {i % max(size // 10, 1)}") for i in rng.integers(0, size, OPERATIONS)]
+        with quiet():
+            lookup = time_per_call(library_manager.get_book, keys)
+            borrow = time_per_call(library_manager.borrow_book, [key + ("bench",) for key in keys])
+            give_back = time_per_call(library_manager.return_book, keys)
+        DataManager.get_instance().disable_journal()
+    return lookup, borrow, give_back
+
+
+def main(argv):
+    print(f"{'titles':>10} {'lookup us':>10} {'borrow us':>10} {'return us':>10}")
+    for size in parse_sizes(argv, DEFAULT_SIZES):
+        lookup, borrow, give_back = run(size)
+        print(f"{size:>10} {lookup:>10.1f} {borrow:>10.1f} {give_back:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
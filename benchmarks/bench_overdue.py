@@ -0,0 +1,76 @@
+"""
+Overdue scan over LoanLedger for growing numbers of active loans.
+
+The ledger is written with synthetic loans spread over the last 30 days and
+read back through LoanLedger.load; the scans then run as of now.
+
+Usage: python -m benchmarks.bench_overdue [loans ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.common import parse_sizes
+from data.loan_ledger import LoanLedger, SECONDS_PER_DAY
+
+DEFAULT_LOANS = [100_000, 1_000_000, 5_000_000]
+COPIES_PER_BOOK = 4
+USERS = 100_000
+REPEATS = 20
+
+
+def write_ledger(file_path, loans, now, seed=0):
+    """
+    Write a ledger file with 'loans' active loans of 14 days, loaned during the last 30 days.
+    """
+    rng = np.random.default_rng(seed)
+    books = loans // COPIES_PER_BOOK + 1
+    loaned_at = now - rng.integers(0, 30 * SECONDS_PER_DAY, loans)
+    with open(file_path, "wb") as handle:
+        np.savez(
+            handle,
+            titles=np.array([f"Title {i}" for i in range(books)]),
+            authors=np.array([f"Author {i % max(books // 10, 1)}" for i in range(books)]),
+            users=np.array([f"user{i}" for i in range(USERS)]),
+            book=(np.arange(loans) // COPIES_PER_BOOK).astype(np.int32),
+            copy_id=(np.arange(loans) % COPIES_PER_BOOK + 1).astype(np.uint32),
+            user=rng.integers(0, USERS, loans).astype(np.int32),
+            loaned_at=loaned_at,
+            due_at=loaned_at + 14 * SECONDS_PER_DAY,
+        )
+
+
+def best_of(function, *args):
+    """
+    Returns the best wall time of REPEATS calls in milliseconds.
+    """
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1e3
+
+
+def run(loans):
+    now = int(time.time())
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv.ledger.npz")
+        write_ledger(file_path, loans, now)
+        start = time.perf_counter()
+        ledger = LoanLedger.load(file_path)
+        load = time.perf_counter() - start
+    overdue = len(ledger.overdue_rows(now))
+    return load, overdue, best_of(ledger.overdue_rows, now), best_of(ledger.overdue_counts, now)
+
+
+def main(argv):
+    print(f"{'loans':>10} {'load s':>8} {'overdue':>10} {'scan ms':>8} {'counts ms':>10}")
+    for loans in parse_sizes(argv, DEFAULT_LOANS):
+        load, overdue, scan, counts = run(loans)
+        print(f"{loans:>10} {load:>8.2f} {overdue:>10} {scan:>8.1f} {counts:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,56 @@
+"""
+Latency of repeated title searches through SearchManager without and with the
+result cache, for growing catalogs. Every query of a round is repeated, as
+popular queries are; the catalog changes between rounds, so every round starts
+with misses.
+
+Usage: python -m benchmarks.bench_search_cache [size ...]
+"""
+import os
+import sys
+import tempfile
+from benchmarks.common import write_catalog, quiet, time_per_call, parse_sizes
+from data.books import DataManager, load_books_from_file
+from models.search_cache import SearchCache
+from models.search_strategy import SearchManager, SearchByName
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+QUERIES = [("Title 4242",), ("title 99",), ("author 7",)]
+ROUNDS = 3
+REPEATS = 10
+
+
+def run(size):
+    """
+    Load a catalog of 'size' titles and time the same query mix without and with the cache.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, size)
+        with quiet():
+            load_books_from_file(file_path, use_cache=False)
+        data_manager = DataManager.get_instance()
+
+        uncached = SearchManager(SearchByName(), cache=SearchCache(maxsize=0))
+        cached = SearchManager(SearchByName(), cache=SearchCache())
+        timings = {}
+        for name, manager in (("uncached", uncached), ("cached", cached)):
+            rounds = []
+            for _ in range(ROUNDS):
+                data_manager.bump_version()
+                rounds.append(time_per_call(lambda query: manager.search(data_manager.get_data(), query),
+                                            QUERIES * REPEATS))
+            timings[name] = sum(rounds) / len(rounds)
+        stats = cached.cache_stats()
+    return timings["uncached"], timings["cached"], stats["hits"], stats["misses"]
+
+
+def main(argv):
+    print(f"{'titles':>10} {'uncached us':>12} {'cached us':>10} {'hits':>6} {'misses':>7}")
+    for size in parse_sizes(argv, DEFAULT_SIZES):
+        uncached, cached, hits, misses = run(size)
+        print(f"{size:>10} {uncached:>12.0f} {cached:>10.0f} {hits:>6} {misses:>7}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,65 @@
+"""
+Throughput of borrows and returns through ShardedLibrary for a growing number of shards.
+
+Several client threads send borrow / return pairs through the router; every
+shard runs in its own process in journal mode. Throughput can only grow with
+the number of shards up to the number of CPU cores.
+
+Usage: python -m benchmarks.bench_sharding [shards ...]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from benchmarks.common import write_catalog, quiet_processes, parse_sizes
+from services.sharded_library import ShardedLibrary
+
+DEFAULT_SHARDS = [1, 2, 4]
+TITLES = 10_000
+CLIENTS = 8
+PAIRS_PER_CLIENT = 500
+
+
+def run(shards):
+    """
+    Time CLIENTS threads that each run PAIRS_PER_CLIENT borrow / return pairs.
+
+    Returns:
+        float: Operations per second.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = os.path.join(directory, "books.csv")
+        write_catalog(file_path, TITLES)
+        with quiet_processes():
+            library = ShardedLibrary(file_path, shards=shards, use_journal=True, checkpoint_interval=10 ** 9)
+
+        def client(seed):
+            rng = np.random.default_rng(seed)
+            for i in rng.integers(0, TITLES, PAIRS_PER_CLIENT):
+                key = (f"Title {i}", f"Author {i % (TITLES // 10)}")
+                library.borrow_book(*key, f"user{seed}")
+                library.return_book(*key)
+
+        clients = [threading.Thread(target=client, args=(seed,)) for seed in range(CLIENTS)]
+        start = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        with quiet_processes():
+            library.close()
+    return 2 * CLIENTS * PAIRS_PER_CLIENT / elapsed
+
+
+def main(argv):
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'shards':>8} {'ops/s':>10}")
+    for shards in parse_sizes(argv, DEFAULT_SHARDS):
+        print(f"{shards:>8} {run(shards):>10.0f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
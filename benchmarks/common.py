@@ -0,0 +1,103 @@
+import contextlib
+import io
+import logging
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+
+def write_catalog(file_path, size, copies=2, seed=0):
+    """
+    Write a synthetic books CSV file.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        size (int): Number of titles.
+        copies (int): Number of copies of every title.
+        seed (int): Seed for the random columns.
+
+    Returns:
+        pd.DataFrame: The rows that were written.
+    """
+    rng = np.random.default_rng(seed)
+    ids = np.arange(size)
+    books_df = pd.DataFrame({
+        "title": [f"Title {i}" for i in ids],
+        "author": [f"Author {i}" for i in ids % max(size // 10, 1)],
+        "genre": np.array(["Fiction", "Drama", "Programming", "History", "Poetry"])[rng.integers(0, 5, size)],
+        "year": rng.integers(1900, 2025, size),
+        "copies": copies,
+        "is_loaned": "N" * copies,
+    })
+    books_df.to_csv(file_path, index=False)
+    return books_df
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Silence the progress messages and action log of the library while benchmarking.
+    """
+    logging.disable(logging.CRITICAL)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@contextlib.contextmanager
+def quiet_processes():
+    """
+    Silence standard output and error at the file-descriptor level, including
+    those of worker processes started while it is active.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        os.dup2(devnull.fileno(), 2)
+    try:
+        with quiet():
+            yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for descriptor, copy in enumerate(saved, start=1):
+            os.dup2(copy, descriptor)
+            os.close(copy)
+
+
+def time_per_call(function, arguments):
+    """
+    Time a function over a list of argument tuples.
+
+    Args:
+        function (callable): The function to time.
+        arguments (list): One argument tuple per call.
+
+    Returns:
+        float: Median latency of a call in microseconds.
+    """
+    timings = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1e6
+
+
+def parse_sizes(argv, default):
+    """
+    Parse catalog sizes from the command line, e.g. "1000 10000".
+    """
+    return [int(arg) for arg in argv] if argv else default
+
+
+def remove_if_exists(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
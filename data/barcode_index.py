@@ -0,0 +1,227 @@
+import os
+import numpy as np
+import pandas as pd
+from data.schema import BOOKS_SCHEMA, MAX_COPIES
+
+# Barcodes are zero-padded copy numbers, e.g. "0000001234"
+BARCODE_WIDTH = 10
+# Largest copy ID the index can hold, as copy IDs run up to a book's 'copies'
+MAX_COPY_ID = MAX_COPIES
+
+
+def format_barcode(number: int) -> str:
+    """
+    Returns the barcode of a global copy number.
+    """
+    return f"{number:0{BARCODE_WIDTH}d}"
+
+
+class BarcodeIndex:
+    """
+    A persistent index from copy barcodes to (title, author, copy_id).
+
+    Every physical copy gets a global copy number when it is added, printed as
+    its barcode. Copy numbers index NumPy arrays holding the book and copy ID,
+    so resolving a scanned barcode is two array reads, and the index stays
+    small at millions of copies.
+
+    The index file is an append-only CSV log next to the catalog. New barcodes
+    are appended as rows; removing a book appends one row per barcode with
+    copy_id 0. When loading, the last row of a barcode wins. compact() rewrites
+    the file with the live barcodes only.
+    """
+
+    FIELDS = ["barcode", "title", "author", "copy_id"]
+
+    def __init__(self, file_path: str = None, capacity: int = 1024):
+        """
+        Initializes an empty index.
+
+        Args:
+            file_path (str): The index file that changes are appended to, or None.
+            capacity (int): Number of copy numbers to allocate room for.
+        """
+        self.file_path = file_path
+        self.books = []      # book number -> (title, author)
+        self.numbers = {}    # (title, author) -> book number
+        self.copies = {}     # (title, author) -> copy numbers, by copy ID
+        self.book_of = np.full(max(capacity, 1), -1, dtype=np.int64)
+        self.copy_of = np.zeros(max(capacity, 1), dtype=BOOKS_SCHEMA['copies'])   # Copy IDs, up to MAX_COPY_ID
+        self.size = 0        # The next copy number
+        self.retired = 0     # Rows of the file that are not live barcodes
+
+    @staticmethod
+    def path_for(catalog_path: str) -> str:
+        """
+        Returns the index path that belongs to a catalog file.
+        """
+        return f"{catalog_path}.barcodes"
+
+    @classmethod
+    def load(cls, file_path: str):
+        """
+        Reads an index file. A missing file gives an empty index that writes to it.
+
+        Args:
+            file_path (str): Path to the index file.
+
+        Returns:
+            BarcodeIndex: The index.
+        """
+        if not os.path.exists(file_path):
+            return cls(file_path)
+
+        rows = pd.read_csv(file_path, dtype={"barcode": str, "title": str, "author": str},
+                           keep_default_na=False)
+        numbers = rows["barcode"].astype(np.int64).to_numpy()
+        index = cls(file_path, capacity=int(numbers.max()) + 1 if len(rows) else 1024)
+        if len(rows) == 0:
+            return index
+
+        rows = rows.assign(number=numbers).drop_duplicates("number", keep="last")
+        index.size = int(numbers.max()) + 1
+        live = rows[rows["copy_id"] > 0].sort_values("number")
+        index.retired = len(numbers) - len(live)
+
+        # Copy numbers grow with the copy ID within a book, so one pass in number order
+        # lists every book's copies in copy ID order
+        copy_numbers = live["number"].to_numpy()
+        book_of = []
+        keys = zip(live["title"].tolist(), live["author"].tolist())
+        for number, key in zip(copy_numbers.tolist(), keys):
+            book = index.numbers.get(key)
+            if book is None:
+                book = index.numbers[key] = len(index.books)
+                index.books.append(key)
+                index.copies[key] = []
+            index.copies[key].append(number)
+            book_of.append(book)
+        index.book_of[copy_numbers] = book_of
+        index.copy_of[copy_numbers] = live["copy_id"].to_numpy()
+        return index
+
+    def _grow(self, size):
+        capacity = len(self.book_of)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        book_of = np.full(capacity, -1, dtype=np.int64)
+        copy_of = np.zeros(capacity, dtype=BOOKS_SCHEMA['copies'])
+        book_of[:self.size] = self.book_of[:self.size]
+        copy_of[:self.size] = self.copy_of[:self.size]
+        self.book_of, self.copy_of = book_of, copy_of
+
+    def _append_rows(self, rows):
+        if self.file_path is None or not rows:
+            return
+        new_file = not os.path.exists(self.file_path)
+        pd.DataFrame(rows, columns=self.FIELDS).to_csv(self.file_path, mode="a", header=new_file, index=False)
+
+    def assign(self, title: str, author: str, copies: int) -> list:
+        """
+        Gives barcodes to the copies of a book that have none yet.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            copies (int): The book's number of copies.
+
+        Returns:
+            list: The new barcodes, by copy ID.
+        """
+        return self.assign_many([((title, author), copies)])
+
+    def assign_many(self, books) -> list:
+        """
+        Gives barcodes to the unlabeled copies of several books with one append to the index file.
+
+        Args:
+            books (iterable): ((title, author), copies) pairs.
+
+        Returns:
+            list: The new barcodes.
+        """
+        rows = []
+        for key, copies in books:
+            if int(copies) > MAX_COPY_ID:
+                raise ValueError(f"'{key[0]}' by {key[1]} has more than {MAX_COPY_ID} copies")
+            labeled = self.copies.setdefault(key, [])
+            missing = int(copies) - len(labeled)
+            if missing <= 0:
+                continue
+            if key not in self.numbers:
+                self.numbers[key] = len(self.books)
+                self.books.append(key)
+            self._grow(self.size + missing)
+            numbers = range(self.size, self.size + missing)
+            self.book_of[self.size:self.size + missing] = self.numbers[key]
+            self.copy_of[self.size:self.size + missing] = np.arange(len(labeled) + 1, int(copies) + 1)
+            for number, copy_id in zip(numbers, range(len(labeled) + 1, int(copies) + 1)):
+                rows.append((format_barcode(number), key[0], key[1], copy_id))
+            labeled.extend(numbers)
+            self.size += missing
+        self._append_rows(rows)
+        return [row[0] for row in rows]
+
+    def remove(self, title: str, author: str) -> bool:
+        """
+        Retires the barcodes of a removed book.
+
+        Returns:
+            bool: True if the book had barcodes, False otherwise.
+        """
+        numbers = self.copies.pop((title, author), None)
+        self.numbers.pop((title, author), None)
+        if not numbers:
+            return False
+        self.book_of[numbers] = -1
+        self.retired += 2 * len(numbers)
+        self._append_rows([(format_barcode(number), title, author, 0) for number in numbers])
+        return True
+
+    def lookup(self, barcode: str):
+        """
+        Resolves a scanned barcode.
+
+        Args:
+            barcode (str): The barcode.
+
+        Returns:
+            tuple: (title, author, copy_id), or None for an unknown or retired barcode.
+        """
+        try:
+            number = int(barcode)
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= number < self.size or self.book_of[number] < 0:
+            return None
+        title, author = self.books[self.book_of[number]]
+        return title, author, int(self.copy_of[number])
+
+    def barcodes_of(self, title: str, author: str) -> list:
+        """
+        Returns the barcodes of a book's copies, by copy ID.
+        """
+        return [format_barcode(number) for number in self.copies.get((title, author), [])]
+
+    def __len__(self):
+        return int(np.count_nonzero(self.book_of[:self.size] >= 0))
+
+    def compact(self):
+        """
+        Rewrites the index file with only the live barcodes.
+        """
+        if self.file_path is None:
+            return
+        numbers = np.flatnonzero(self.book_of[:self.size] >= 0)
+        keys = [self.books[book] for book in self.book_of[numbers]]
+        rows = pd.DataFrame({
+            "barcode": [format_barcode(number) for number in numbers],
+            "title": [key[0] for key in keys],
+            "author": [key[1] for key in keys],
+            "copy_id": self.copy_of[numbers],
+        })
+        temporary_path = f"{self.file_path}.tmp"
+        rows.to_csv(temporary_path, index=False)
+        os.replace(temporary_path, self.file_path)
+        self.retired = 0
@@ -1,5 +1,24 @@
+import ast
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+from data.cache import file_fingerprint, load_cached_frame, store_cached_frame
+from data.journal import BookJournal
+from data.loan_state import LOANED, parse_loan_column, encode_is_loaned, decode_is_loaned, loan_matrix
+from data.schema import apply_schema, new_book_row, ensure_category, concat_books, empty_books_frame
+from data.snapshot import is_snapshot_path, load_snapshot, save_snapshot
+from data.sqlite_store import SQLiteBookStore, is_sqlite_path
+from data.write_behind import WriteBehindFlusher
 from models.book import Book
+from models.search_index import SearchIndex
+from models.trigram_index import TrigramIndex
+
+# Number of books get_page returns by default, e.g. to the books window
+PAGE_SIZE = 100
+
 
 class DataManager:
     _instance = None
@@ -15,14 +34,466 @@ class DataManager:
             raise Exception("This class is a singleton!")
         else:
             self.data = None
+            self.journal = None
+            self.checkpoint_interval = 1000
+            self.engine = None
+            self.flusher = None
+            self.dirty = False
+            self.lock = threading.RLock()
+            # Serializes saves, so an older snapshot never overwrites a newer one
+            self.save_lock = threading.Lock()
+            self.row_positions = None
+            self.store = None
+            self.store_version = None
+            # Store row position of every DataFrame row, and the store size the DataFrame has seen
+            self.frame_positions = None
+            self.synced_size = 0
+            # Indexes for token and substring search, built on first use
+            self.search_index = None
+            self.trigram_index = None
+            # Incremented by every change to the catalog, so cached search results can tell they are stale
+            self.version = 0
             DataManager._instance = self
 
-    def initialize_data(self, dataframe):
+    def initialize_data(self, dataframe, rows=None):
+        """
+        Set the catalog DataFrame.
+
+        While a CatalogStore is attached, the store is the catalog: the
+        DataFrame it backs may be passed back after rows were changed in it
+        directly, and those rows are then copied into the store. Any other
+        DataFrame is refused; detach_store must be called first.
+
+        Args:
+            dataframe (pd.DataFrame): The catalog.
+            rows (list): With a store attached, the positions of the rows that
+                were changed. Defaults to all rows.
+
+        Raises:
+            ValueError: If a store is attached and 'dataframe' is not its DataFrame.
+        """
+        if self.store is not None:
+            with self.lock:
+                if dataframe is not self.data:
+                    raise ValueError("A catalog store is attached; call detach_store before replacing the catalog.")
+                rows = range(len(dataframe)) if rows is None else rows
+                for row in rows:
+                    book = row_to_book(dataframe.iloc[row])
+                    if book is None or not self.store.update_from(book):
+                        raise ValueError(f"Row {row} is not a book of the attached catalog store.")
+                self.bump_version()
+            return
+        if dataframe is not self.data:
+            # A different frame may be ordered differently; the index is rebuilt on the next lookup
+            self.row_positions = None
+            self.search_index = None
+            self.trigram_index = None
         self.data = dataframe
+        self.bump_version()
+
+    def attach_store(self, store):
+        """
+        Make a CatalogStore the canonical catalog. The DataFrame returned by
+        get_data is then built from the store whenever the store has changed.
+
+        Args:
+            store (CatalogStore): The store.
+        """
+        self.store = store
+        self.store_version = None
+        self.search_index = None
+        self.trigram_index = None
+        self.bump_version()
+
+    def detach_store(self):
+        """
+        Stop using the attached CatalogStore. The DataFrame keeps the catalog
+        as it is now and becomes the canonical catalog again.
+        """
+        with self.lock:
+            if self.store is None:
+                return
+            self.get_data()
+            self.store = None
+            self.store_version = None
+            self.frame_positions = None
 
     def get_data(self):
+        store = self.store
+        if store is not None and store.version != self.store_version:
+            with self.lock:
+                self._sync_store()
+        elif self.data is None and self.engine is not None:
+            # A database catalog is read on first use, not when it is opened
+            with self.lock:
+                if self.data is None:
+                    self.data = apply_schema(self.engine.read_frame())
+                    self.row_positions = None
+                    self.bump_version()
         return self.data
 
+    def catalog_unread(self):
+        """
+        Returns True while the catalog lives only in the storage engine and no
+        DataFrame of it has been read yet.
+        """
+        return self.data is None and self.engine is not None
+
+    def _sync_store(self):
+        """
+        Bring the DataFrame in line with the attached store. Only the rows the
+        store reports as changed, appended or removed are written; the frame is
+        rebuilt only when the store cannot tell which rows changed.
+        """
+        store = self.store
+        version = store.version
+        if version == self.store_version:
+            return
+        changed, removed = store.take_changes()
+        if self.store_version is None or changed is None or self.data is None:
+            self.data = store.to_frame()
+            self.frame_positions = store.live_positions()
+            self.row_positions = None
+        else:
+            if removed:
+                rows = np.flatnonzero(np.isin(self.frame_positions, removed))
+                if len(rows):
+                    self.data = self.data.drop(index=self.data.index[rows]).reset_index(drop=True)
+                    self.frame_positions = np.delete(self.frame_positions, rows)
+                    self.row_positions = None
+
+            appended = np.arange(self.synced_size, store.size)
+            appended = appended[store.alive[appended]]
+            if len(appended):
+                start = len(self.data)
+                new_rows = store.to_frame(appended)
+                self.data = concat_books(self.data, new_rows)
+                self.frame_positions = np.concatenate([self.frame_positions, appended])
+                if self.row_positions is not None:
+                    for position, key in enumerate(zip(new_rows['title'], new_rows['author']), start=start):
+                        self.row_positions.setdefault(key, position)
+
+            changed = np.array(sorted(changed), dtype=np.int64)
+            changed = changed[changed < self.synced_size]
+            changed = changed[store.alive[changed]]
+            if len(changed):
+                self._write_store_rows(changed)
+        self.synced_size = store.size
+        self.store_version = version
+        self.bump_version()
+
+    def _write_store_rows(self, positions):
+        """
+        Copy the mutable columns of some store rows into their DataFrame rows.
+
+        Args:
+            positions (np.ndarray): Sorted store row positions that are in the DataFrame.
+        """
+        rows = np.searchsorted(self.frame_positions, positions)
+        values = self.store.column_values(positions)
+        for column, column_values in values.items():
+            if column not in self.data.columns:
+                continue
+            column_index = self.data.columns.get_loc(column)
+            if len(rows) <= _SCALAR_ROW_LIMIT:
+                for row, value in zip(rows, column_values):
+                    self.data.iat[row, column_index] = value
+            else:
+                self.data.iloc[rows, column_index] = column_values
+
+    def compact_store(self):
+        """
+        Compact the attached store and keep the DataFrame's rows pointing at it.
+        The DataFrame itself does not change. Callers must keep other threads
+        from changing the store meanwhile, e.g. by compacting at checkpoints.
+        """
+        with self.lock:
+            store = self.store
+            if store is None or not store.needs_compaction():
+                return
+            self.get_data()
+            store.compact()
+            self.frame_positions = store.live_positions()
+            self.synced_size = store.size
+
+    def bump_version(self):
+        """
+        Record that the catalog has changed. Code that writes to the DataFrame
+        directly must call this, or searches may return cached results.
+        """
+        with self.lock:
+            self.version += 1
+
+    def get_row_position(self, title, author):
+        """
+        Get the row position of a book through the (title, author) index.
+        The index is built on first use and kept up to date by append_rows and remove_row.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            int: The row position, or None if the book is not in the DataFrame.
+        """
+        # A store sync in get_data can reset the index, so the frame is fetched first
+        books_df = self.get_data()
+        if self.row_positions is None:
+            row_positions = {}
+            if books_df is not None and len(books_df):
+                for position, key in enumerate(zip(books_df['title'], books_df['author'])):
+                    row_positions.setdefault(key, position)
+            self.row_positions = row_positions
+        return self.row_positions.get((title, author))
+
+    def get_search_index(self):
+        """
+        Get the inverted token index of the catalog. It is built on first use
+        and kept up to date as books are added and removed.
+
+        Returns:
+            SearchIndex: The index.
+        """
+        with self.lock:
+            if self.search_index is None:
+                self.search_index = SearchIndex.from_frame(self.get_data())
+            return self.search_index
+
+    def get_trigram_index(self):
+        """
+        Get the trigram index of the catalog's title, author and genre columns.
+        It is built on first use and kept up to date as books are added and removed.
+
+        Returns:
+            TrigramIndex: The index, keyed by (title, author).
+        """
+        with self.lock:
+            if self.trigram_index is None:
+                self.trigram_index = TrigramIndex.from_frame(self.get_data())
+            return self.trigram_index
+
+    def index_book(self, title, author, genre):
+        """
+        Add a book to the search indexes that have been built.
+        """
+        if self.search_index is not None:
+            self.search_index.add(title, author, genre)
+        if self.trigram_index is not None:
+            self.trigram_index.add((title, author), (title, author, genre))
+
+    def unindex_book(self, title, author):
+        """
+        Remove a book from the search indexes that have been built.
+        """
+        if self.search_index is not None:
+            self.search_index.remove(title, author)
+        if self.trigram_index is not None:
+            self.trigram_index.remove((title, author))
+
+    def append_rows(self, new_rows, to_engine=True):
+        """
+        Append rows to the DataFrame and add them to the row and search indexes.
+
+        With a storage engine the rows are inserted into the database as well,
+        so they show up in get_page and get_book_row.
+
+        Args:
+            new_rows (pd.DataFrame): The rows to append, in the shared schema.
+            to_engine (bool): False if the caller has already inserted the rows into the engine.
+        """
+        if to_engine and self.engine is not None:
+            with self.lock:
+                for row in new_rows.to_dict("records"):
+                    self.engine.insert_book(row_to_book(row))
+        if self.catalog_unread():
+            # The first get_data reads the new rows from the database
+            for title, author, genre in zip(new_rows['title'], new_rows['author'], new_rows['genre']):
+                self.index_book(title, author, genre)
+            self.bump_version()
+            return
+        if self.store is not None:
+            # The store is the catalog; the DataFrame picks the rows up on the next get_data
+            for row in new_rows.to_dict("records"):
+                self.store.append_book(row_to_book(row))
+                self.index_book(row['title'], row['author'], row['genre'])
+            self.bump_version()
+            return
+        books_df = self.get_data()
+        start = len(books_df) if books_df is not None else 0
+        self.data = concat_books(books_df, new_rows)
+        if self.row_positions is not None:
+            for position, key in enumerate(zip(new_rows['title'], new_rows['author']), start=start):
+                self.row_positions.setdefault(key, position)
+        for title, author, genre in zip(new_rows['title'], new_rows['author'], new_rows['genre']):
+            self.index_book(title, author, genre)
+        self.bump_version()
+
+    def remove_row(self, title, author):
+        """
+        Remove a book's row from the DataFrame and shift the positions of the rows after it.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            bool: True if the row existed, False otherwise.
+        """
+        if self.store is not None:
+            if not self.store.remove(title, author):
+                return False
+            self.unindex_book(title, author)
+            self.bump_version()
+            return True
+        position = self.get_row_position(title, author)
+        if position is None:
+            return False
+        self.data = self.data.drop(index=self.data.index[position]).reset_index(drop=True)
+        del self.row_positions[(title, author)]
+        self.unindex_book(title, author)
+        self.bump_version()
+        tail = zip(self.data['title'].iloc[position:], self.data['author'].iloc[position:])
+        for new_position, key in enumerate(tail, start=position):
+            if self.row_positions.get(key) == new_position + 1:
+                self.row_positions[key] = new_position
+        return True
+
+    def mark_dirty(self):
+        """
+        Record that the DataFrame has changes that are not persisted yet.
+        In write-behind mode this schedules a background flush.
+        """
+        self.dirty = True
+        self.bump_version()
+        if self.flusher is not None:
+            self.flusher.mark_dirty()
+
+    def enable_write_behind(self, file_path, interval_ms=500, max_pending=100):
+        """
+        Switch persistence to write-behind mode: mutations only mark the
+        DataManager as dirty, and a background thread saves the file once every
+        'interval_ms' milliseconds or 'max_pending' mutations.
+
+        Args:
+            file_path (str): Path to the catalog file to flush to.
+            interval_ms (int): Maximum delay before a mutation is written.
+            max_pending (int): Number of mutations that triggers an immediate flush.
+        """
+        self.disable_write_behind()
+        self.flusher = WriteBehindFlusher(
+            lambda: save_books_to_file(file_path), interval_ms=interval_ms, max_pending=max_pending
+        )
+
+    def disable_write_behind(self):
+        """
+        Flush pending mutations and switch back to synchronous saves.
+        """
+        if self.flusher is not None:
+            self.flusher.stop()
+            self.flusher = None
+
+    def flush(self):
+        """
+        In write-behind mode, write pending mutations now on the caller's thread.
+        """
+        if self.flusher is not None:
+            self.flusher.flush()
+
+    def enable_journal(self, catalog_path, checkpoint_interval=1000, sync=False):
+        """
+        Switch persistence to write-ahead journal mode.
+
+        Args:
+            catalog_path (str): Path to the catalog file the journal belongs to.
+            checkpoint_interval (int): Number of journal records after which the
+                journal is folded back into the catalog file.
+            sync (bool): If True, fsync the journal after every record.
+        """
+        self.disable_journal()
+        self.journal = BookJournal(BookJournal.path_for(catalog_path), sync=sync)
+        torn = self.journal.repair()
+        if torn:
+            print(f"Discarded a torn record of {torn} bytes at the end of {self.journal.file_path}.")
+        self.journal.pending = len(self.journal.read_records())
+        self.checkpoint_interval = checkpoint_interval
+
+    def disable_journal(self):
+        """
+        Switch persistence back to full file rewrites.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def attach_engine(self, engine):
+        """
+        Use a storage engine (e.g. SQLiteBookStore) for persistence and targeted reads.
+
+        Args:
+            engine (SQLiteBookStore): The engine, or None to go back to file storage.
+        """
+        if self.engine is not None and self.engine is not engine:
+            self.engine.close()
+        self.engine = engine
+
+    def get_book_row(self, title, author):
+        """
+        Get a single book's row. With a storage engine only that row is read.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            dict: The book's row, or None if it does not exist.
+        """
+        if self.engine is not None:
+            return self.engine.get_book_row(title, author)
+        position = self.get_row_position(title, author)
+        return self.get_data().iloc[position].to_dict() if position is not None else None
+
+    def update_book_row(self, row):
+        """
+        Write back a row from get_book_row after some of its fields were changed.
+        'available' and 'popularity_score' are derived again. With a storage
+        engine only that row is written, and the DataFrame only once it has been read.
+
+        Args:
+            row (dict): The book's row.
+        """
+        book = row_to_book(row)
+        with self.lock:
+            if self.engine is not None:
+                self.engine.update_book(book)
+                if self.catalog_unread():
+                    self.bump_version()
+                    return
+            update_book_in_dataframe(book)
+
+    def get_page(self, offset, limit=PAGE_SIZE):
+        """
+        Get a page of books. With a storage engine only those rows are read.
+
+        Args:
+            offset (int): Number of books to skip.
+            limit (int): Maximum number of books to return.
+
+        Returns:
+            pd.DataFrame: The requested books.
+        """
+        if self.engine is not None:
+            return apply_schema(self.engine.read_frame(limit=limit, offset=offset))
+        return self.get_data().iloc[offset:offset + limit]
+
+    def count_books(self):
+        """
+        Returns the number of books, without reading a database catalog.
+        """
+        if self.catalog_unread():
+            return self.engine.count_books()
+        books_df = self.get_data()
+        return len(books_df) if books_df is not None else 0
+
 def adjust_is_loaned(row):
     """
     Adjust the 'is_loaned' value to ensure it matches the number of copies.
@@ -34,18 +505,13 @@ def adjust_is_loaned(row):
     Returns:
         dict: Updated 'is_loaned' dictionary.
     """
-    num_copies = row['copies']
-    is_loaned_dict = eval(row['is_loaned']) if isinstance(row['is_loaned'], str) else row['is_loaned']
+    return parse_is_loaned(row['is_loaned'], row['copies'])
 
-    # Adjust the size of the dictionary
-    is_loaned_dict = {
-        i + 1: is_loaned_dict.get(i + 1, 'no') for i in range(num_copies)
-    }
 
-    return is_loaned_dict
 def parse_is_loaned(value, num_copies):
     """
     Parses the 'is_loaned' value from the CSV into a valid dictionary.
+    Accepts the compact encoding ("YYN"), 'yes' / 'no' and the legacy dictionary text.
 
     Args:
         value (str): The raw 'is_loaned' value from the CSV.
@@ -54,71 +520,349 @@ def parse_is_loaned(value, num_copies):
     Returns:
         dict: A dictionary representing the loan status of each copy.
     """
-    if isinstance(value, str):
-        value = value.strip()
-        if value.lower() == 'no':  # All copies are available
-            return {i + 1: 'no' for i in range(num_copies)}
-        elif value.lower() == 'yes':  # All copies are loaned
-            return {i + 1: 'yes' for i in range(num_copies)}
+    if not isinstance(value, (str, dict)):
+        raise ValueError(f"Unexpected is_loaned value type: {type(value)}")
+    return decode_is_loaned(parse_loan_column([value], [num_copies])[0])
+
+
+def derive_book_columns(books_df):
+    """
+    Parse the raw CSV columns and add the derived ones.
+
+    Args:
+        books_df (pd.DataFrame): The DataFrame as read from the CSV file.
+
+    Returns:
+        pd.DataFrame: The DataFrame with 'is_loaned' parsed into compact loan-state
+        strings and 'available', 'waiting_list', 'borrow_count' and
+        'popularity_score' added.
+    """
+    # Parse the whole 'is_loaned' column at once and adjust it to 'copies'
+    if 'is_loaned' not in books_df.columns:
+        books_df['is_loaned'] = 'no'
+    books_df['is_loaned'] = parse_loan_column(books_df['is_loaned'], books_df['copies'])
+
+    # Add 'waiting_list' column as empty lists if not exists, otherwise parse its text form
+    if 'waiting_list' not in books_df.columns:
+        books_df['waiting_list'] = pd.Series([[] for _ in range(len(books_df))], index=books_df.index, dtype=object)
+    else:
+        books_df['waiting_list'] = parse_waiting_list_column(books_df['waiting_list'])
+
+    # Calculate 'available', 'borrow_count' and 'popularity_score' based on 'is_loaned'
+    return derive_loan_counters(books_df)
+
+
+def parse_waiting_list_column(values):
+    """
+    Parse a column of waiting lists, given as lists or as their text form, into lists.
+    The text is parsed as a Python literal, never evaluated.
+
+    Args:
+        values (pd.Series): The raw 'waiting_list' values.
+
+    Returns:
+        pd.Series: The waiting lists, with the index of 'values'.
+    """
+    parsed = []
+    for value in values:
+        if isinstance(value, (list, tuple)):
+            value = list(value)
+        elif isinstance(value, str):
+            value = ast.literal_eval(value) if value.strip() not in ("", "[]") else []
         else:
-            try:
-                # Try to evaluate the string as a dictionary
-                parsed_dict = eval(value)
-                return {
-                    i + 1: parsed_dict.get(i + 1, 'no') for i in range(num_copies)
-                }
-            except Exception as e:
-                raise ValueError(f"Unexpected is_loaned value: {value}") from e
-    elif isinstance(value, dict):
-        return {
-         i + 1: value.get(i + 1, 'no') for i in range(num_copies)
-         }
+            value = []  # Missing value
+        parsed.append(value)
+    return pd.Series(parsed, index=values.index, dtype=object)
+
+
+# Slices up to this many rows are recomputed with scalar access in derive_loan_counters
+_SCALAR_ROW_LIMIT = 16
+
+
+def derive_loan_counters(books_df, rows=None, reset_borrow_count=True):
+    """
+    Compute 'available', 'borrow_count' and 'popularity_score' in one vectorized
+    pass over the loan state of the selected rows. A handful of rows, like a
+    single updated book, is computed with scalar access instead, which avoids
+    the fixed cost of label-based slicing.
+
+    Args:
+        books_df (pd.DataFrame): DataFrame with compact 'is_loaned' strings,
+            'copies' and 'waiting_list'. Changed in place.
+        rows (list): Index labels of the rows to recompute. Defaults to all rows.
+        reset_borrow_count (bool): If True, 'borrow_count' is set to the number of
+            loaned copies, as on load. Otherwise the stored count is kept.
+
+    Returns:
+        pd.DataFrame: The same DataFrame.
+    """
+    if rows is not None and len(rows) <= _SCALAR_ROW_LIMIT:
+        for row in rows:
+            loaned = books_df.at[row, 'is_loaned'].count(LOANED)
+            borrow_count = loaned if reset_borrow_count else int(books_df.at[row, 'borrow_count'])
+            books_df.at[row, 'available'] = int(books_df.at[row, 'copies']) - loaned
+            books_df.at[row, 'borrow_count'] = borrow_count
+            books_df.at[row, 'popularity_score'] = borrow_count + len(books_df.at[row, 'waiting_list'])
+        return books_df
+
+    selected = books_df if rows is None else books_df.loc[rows]
+    loaned = loan_matrix(selected['is_loaned'].to_numpy()).sum(axis=1)
+    copies = selected['copies'].to_numpy(dtype=np.int64)
+    waiting = np.fromiter(map(len, selected['waiting_list']), dtype=np.int64, count=len(selected))
+    if reset_borrow_count:
+        borrow_count = loaned
     else:
-        raise ValueError(f"Unexpected is_loaned value type: {type(value)}")
+        borrow_count = selected['borrow_count'].to_numpy(dtype=np.int64)
 
+    counters = {
+        'available': copies - loaned,
+        'borrow_count': borrow_count,
+        'popularity_score': borrow_count + waiting,
+    }
+    for column, values in counters.items():
+        if rows is None:
+            books_df[column] = values
+        else:
+            books_df.loc[rows, column] = values.astype(books_df[column].dtype)
+    return books_df
 
 
-def load_books_from_file(file_path="books.csv"):
+# Text columns are always read as text, so a chunk of numeric-looking titles parses like the whole file
+_CSV_TEXT_DTYPES = {'title': str, 'author': str, 'genre': str, 'is_loaned': str}
+
+
+def _count_csv_rows(file_path):
     """
-    Load books from a CSV file into a DataFrame and initialize the DataManager.
+    Return an upper bound for the number of data rows in a CSV file,
+    by counting line breaks without parsing.
     """
-    try:
-        # Load the CSV into a DataFrame
-        books_df = pd.read_csv(file_path)
+    line_breaks = 0
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            line_breaks += block.count(b"\n")
+    return line_breaks + 1
 
-        if books_df.empty:
-            print(f"Warning: The file '{file_path}' is empty.")
-            return []
 
-        # Parse 'is_loaned' values and adjust based on 'copies'
-        books_df['is_loaned'] = books_df.apply(
-            lambda row: parse_is_loaned(row['is_loaned'], row['copies']),
-            axis=1
-        )
+def _load_csv_in_chunks(file_path, chunksize):
+    """
+    Read and derive a books CSV file one chunk at a time.
 
-        # Add 'available' column based on 'is_loaned'
-        books_df['available'] = books_df['is_loaned'].apply(
-            lambda loaned_dict: sum(1 for status in loaned_dict.values() if status == 'no')
-        )
+    Every chunk is parsed and derived on its own and then copied into columns
+    that were allocated once for the whole file, so peak memory stays close to
+    the size of the final DataFrame instead of several times it.
 
-        # Add 'waiting_list' column as empty lists if not exists
-        if 'waiting_list' not in books_df.columns:
-            books_df['waiting_list'] = [[] for _ in range(len(books_df))]
+    Args:
+        file_path (str): Path to the CSV file.
+        chunksize (int): Number of rows per chunk.
 
+    Returns:
+        pd.DataFrame: The derived DataFrame.
+    """
+    capacity = _count_csv_rows(file_path)
+    columns = {}
+    row_count = 0
 
-        # Calculate 'borrow_count' based on 'is_loaned'
-        books_df['borrow_count'] = books_df['is_loaned'].apply(
-            lambda loaned_dict: sum(1 for status in loaned_dict.values() if status == 'yes')
-        )
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=_CSV_TEXT_DTYPES):
+        chunk = derive_book_columns(chunk)
+        start, end = row_count, row_count + len(chunk)
+
+        for name in chunk.columns:
+            values = chunk[name].to_numpy()
+            if name not in columns:
+                dtype = values.dtype if values.dtype.kind in "biuf" else object
+                columns[name] = np.empty(capacity, dtype=dtype)
+            elif not np.can_cast(values.dtype, columns[name].dtype, casting="same_kind"):
+                # A later chunk needs a wider type, e.g. floats after a missing value
+                numeric = values.dtype.kind in "biuf" and columns[name].dtype.kind in "biuf"
+                dtype = np.result_type(values.dtype, columns[name].dtype) if numeric else object
+                columns[name] = columns[name].astype(dtype)
+            columns[name][start:end] = values
+
+        row_count = end
+
+    return pd.DataFrame({name: column[:row_count] for name, column in columns.items()}, copy=False)
+
+
+def _csv_split_points(file_path, parts):
+    """
+    Split a CSV file into byte ranges that start and end at line boundaries.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        parts (int): The number of ranges to aim for.
+
+    Returns:
+        tuple: The header line (bytes) and a list of (start, end) byte offsets of the data rows.
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, "rb") as handle:
+        header = handle.readline()
+        data_start = handle.tell()
+        boundaries = [data_start]
+        for part in range(1, parts):
+            target = data_start + (size - data_start) * part // parts
+            if target <= boundaries[-1]:
+                continue
+            handle.seek(target - 1)
+            handle.readline()  # Move to the start of the next line
+            if handle.tell() >= size:
+                break
+            boundaries.append(handle.tell())
+    boundaries.append(size)
+    ranges = [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+    return header, ranges
+
+
+def _parse_csv_range(file_path, header, start, end):
+    """
+    Parse and derive the rows of a CSV file between two byte offsets.
+    Runs in a worker process of _load_csv_in_parallel.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        header (bytes): The header line of the file.
+        start (int): Offset of the first row.
+        end (int): Offset just past the last row.
+
+    Returns:
+        pd.DataFrame: The derived rows in the shared schema.
+    """
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        rows = handle.read(end - start)
+    books_df = pd.read_csv(io.BytesIO(header + rows), dtype=_CSV_TEXT_DTYPES)
+    return apply_schema(derive_book_columns(books_df))
 
-        # Add 'popularity_score' column
-        books_df['popularity_score'] = books_df['borrow_count'] + books_df['waiting_list'].apply(len)
 
-        # Initialize the DataManager with the DataFrame
+def _load_csv_in_parallel(file_path, workers):
+    """
+    Read and derive a books CSV file in several processes.
+
+    The file is split into byte ranges at line boundaries, every range is
+    parsed and derived in its own process and the typed results are
+    concatenated in file order, which gives the same DataFrame as a serial
+    load. Quoted fields must not contain line breaks.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        workers (int): Number of worker processes.
+
+    Returns:
+        pd.DataFrame: The derived DataFrame.
+    """
+    header, ranges = _csv_split_points(file_path, workers)
+    if len(ranges) <= 1:
+        return _parse_csv(file_path)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures = [executor.submit(_parse_csv_range, file_path, header, start, end) for start, end in ranges]
+        parts = [future.result() for future in futures]
+    return apply_schema(pd.concat(parts, ignore_index=True))
+
+
+def _parse_csv(file_path, chunksize=None, workers=None):
+    """
+    Parse a books CSV file and derive its columns in the shared schema.
+
+    Args:
+        file_path (str): Path to the CSV file.
+        chunksize (int): If set, the file is read and derived this many rows at a time.
+        workers (int): If greater than 1, the file is parsed in this many processes.
+
+    Returns:
+        pd.DataFrame: The parsed DataFrame, possibly empty.
+    """
+    if workers and workers > 1:
+        books_df = _load_csv_in_parallel(file_path, workers)
+    elif chunksize:
+        books_df = _load_csv_in_chunks(file_path, chunksize)
+    else:
+        # Load the CSV into a DataFrame
+        books_df = pd.read_csv(file_path, dtype=_CSV_TEXT_DTYPES)
+        if not books_df.empty:
+            books_df = derive_book_columns(books_df)
+    return apply_schema(books_df)
+
+
+def load_books_from_file(file_path="books.csv", chunksize=None, use_cache=True, workers=None):
+    """
+    Load books from a CSV file, a binary snapshot (.npy) or a SQLite database
+    (.db / .sqlite) into a DataFrame and initialize the DataManager. If a journal
+    exists next to a catalog file, its records are replayed on top of it.
+
+    A parsed CSV file is cached next to it, keyed on the file's path, size,
+    mtime and content hash. While the file is unchanged, later loads read the
+    cache and skip all parsing.
+
+    A SQLite database is only opened: single books and pages are read from it
+    through DataManager.get_book_row and get_page, and the whole table is read
+    the first time DataManager.get_data is called.
+
+    Args:
+        file_path (str): Path to the catalog file.
+        chunksize (int): If set, a CSV file is read and derived this many rows at
+            a time, which keeps peak memory low for very large catalogs.
+        use_cache (bool): Whether to read and write the parsed-catalog cache of a CSV file.
+        workers (int): If greater than 1, a CSV file is split at line boundaries and
+            parsed in this many processes, for bulk imports of very large catalogs.
+
+    Returns:
+        pd.DataFrame: The loaded DataFrame, or None if loading failed. For a
+        SQLite database, the first page of books.
+    """
+    try:
         data_manager = DataManager.get_instance()
+        if is_sqlite_path(file_path):
+            # The database becomes the storage engine; mutations are written to it row by row
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(file_path)
+            engine = data_manager.engine
+            if engine is None or engine.db_path != file_path:
+                engine = SQLiteBookStore(file_path)
+            data_manager.attach_engine(engine)
+            if engine.count_books() == 0:
+                print(f"Warning: The file '{file_path}' is empty.")
+                return []
+            # A loaded file replaces the catalog, including an attached store. The
+            # table itself is read by get_data when the whole catalog is first needed
+            data_manager.detach_store()
+            data_manager.initialize_data(None)
+            print("Books loaded successfully.")
+            return data_manager.get_page(0)
+
+        data_manager.attach_engine(None)
+        if is_snapshot_path(file_path):
+            # Snapshots are memory-mapped and already contain the derived columns
+            books_df = load_snapshot(file_path)
+        else:
+            books_df = None
+            if use_cache:
+                fingerprint = file_fingerprint(file_path)
+                books_df = load_cached_frame(file_path, fingerprint)
+            if books_df is None:
+                books_df = _parse_csv(file_path, chunksize, workers)
+                if use_cache and not books_df.empty:
+                    store_cached_frame(file_path, fingerprint, books_df)
+
+        if books_df.empty:
+            # The journal may still hold books added to an empty catalog
+            books_df = empty_books_frame()
+
+        # Cast to the shared compact dtypes before the journal adds rows to it
+        books_df = apply_schema(books_df)
+
+        # Replay mutations that were journaled after the last checkpoint
+        books_df = replay_journal(books_df, BookJournal.path_for(file_path))
+        if books_df.empty:
+            print(f"Warning: The file '{file_path}' is empty.")
+            return []
+
+        # Initialize the DataManager with the DataFrame; a loaded file replaces an attached store
+        data_manager.detach_store()
         data_manager.initialize_data(books_df)
 
         print("Books loaded successfully.")
+        return books_df
 
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
@@ -127,16 +871,47 @@ def load_books_from_file(file_path="books.csv"):
 
 def save_books_to_file(file_path="books.csv"):
     """
-    Save the updated DataFrame from DataManager to a file.
+    Save the updated DataFrame from DataManager to a CSV file or, for a .npy
+    path, to a binary snapshot, or replace the contents of a SQLite database.
+    The saved file is a full snapshot, so any journal next to it is discarded.
     """
     try:
-        # Get the DataFrame from DataManager
         data_manager = DataManager.get_instance()
-        books_df = data_manager.get_data()
+        engine = data_manager.engine
+        if data_manager.catalog_unread() and engine.db_path == file_path:
+            # Every change was written to the database row by row, and nothing else was read
+            data_manager.dirty = False
+            print(f"All updated data successfully saved to {file_path}.")
+            return
+        with data_manager.save_lock:
+            # Take a consistent copy of the DataFrame from DataManager
+            with data_manager.lock:
+                books_df = apply_schema(data_manager.get_data().copy())
+                data_manager.dirty = False
+
+            if is_sqlite_path(file_path):
+                engine = data_manager.engine
+                if engine is not None and engine.db_path == file_path:
+                    engine.write_frame(books_df)
+                else:
+                    store = SQLiteBookStore(file_path)
+                    store.write_frame(books_df)
+                    store.close()
+            elif is_snapshot_path(file_path):
+                save_snapshot(books_df, file_path)
+            else:
+                # Save the DataFrame to the file, with the loan state in its compact encoding
+                if 'is_loaned' in books_df.columns:
+                    books_df['is_loaned'] = parse_loan_column(books_df['is_loaned'], books_df['copies'])
+                books_df.to_csv(file_path, index=False)
 
-        # Save the DataFrame to the file
-        books_df.to_csv(file_path, index=False)
-        print(f"All updated data successfully saved to {file_path}.")
+            # The snapshot now contains every journaled change
+            journal_path = BookJournal.path_for(file_path)
+            if data_manager.journal is not None and data_manager.journal.file_path == journal_path:
+                data_manager.journal.truncate()
+            elif os.path.exists(journal_path):
+                os.remove(journal_path)
+            print(f"All updated data successfully saved to {file_path}.")
     except Exception as e:
         print(f"Error saving the updated DataFrame: {e}")
 
@@ -159,9 +934,12 @@ def row_to_book(row):
             genre=row.get('genre', 'Unknown'),  # Map 'genre' to 'genre'
             copies=int(row['copies'])
         )
-        book.borrow_count = row.get('borrow_count', 0)
-        book.is_loaned = row.get('is_loaned', {})
+        book.borrow_count = int(row.get('borrow_count', 0))
+        is_loaned = row.get('is_loaned', {})
+        # The DataFrame holds the compact loan-state string, Book objects the dictionary
+        book.is_loaned = decode_is_loaned(is_loaned) if isinstance(is_loaned, str) else is_loaned
         book.waiting_list = row.get('waiting_list', [])
+        book.popularity_score = book.borrow_count + len(book.waiting_list)
         return book
 
     except KeyError as e:
@@ -177,23 +955,250 @@ def update_book_in_dataframe(book):
     Update a row in the DataFrame managed by DataManager based on the Book object.
     """
     try:
-        # Get the DataFrame from DataManager
         data_manager = DataManager.get_instance()
+        if data_manager.store is not None:
+            # Views already wrote to the store; a plain Book is copied into it
+            if data_manager.store.owns(book):
+                data_manager.store.touch(data_manager.store.position_of(book.title, book.author))
+            elif not data_manager.store.update_from(book):
+                raise IndexError(book.title)
+            return
+
+        # Get the DataFrame from DataManager
         books_df = data_manager.get_data()
 
-        # Locate the row to update
-        row_index = books_df[books_df['title'] == book.title].index[0]
+        # Locate the row to update through the (title, author) index
+        row_index = data_manager.get_row_position(book.title, book.author)
+        if row_index is None:
+            raise IndexError(book.title)
 
         # Update the row with data from the Book object
-        books_df.at[row_index, 'is_loaned'] = book.is_loaned
-        books_df.at[row_index, 'available'] = sum(1 for status in book.is_loaned.values() if status == 'no')
+        books_df.at[row_index, 'is_loaned'] = encode_is_loaned(book.is_loaned, int(book.copies))
         books_df.at[row_index, 'copies'] = book.copies
-        books_df.at[row_index, 'waiting_list'] = book.waiting_list
+        books_df.at[row_index, 'waiting_list'] = list(book.waiting_list)
         books_df.at[row_index, 'borrow_count'] = book.borrow_count
-        books_df.at[row_index, 'popularity_score'] = book.popularity_score
+        derive_loan_counters(books_df, [row_index], reset_borrow_count=False)
+        data_manager.bump_version()
 
 
     except IndexError:
         print(f"Error: Book '{book.title}' not found in the DataFrame.")
     except Exception as e:
-        print(f"Error updating the DataFrame: {e}")
\ No newline at end of file
+        print(f"Error updating the DataFrame: {e}")
+
+
+def book_to_record(book):
+    """
+    Convert a Book object to a plain dictionary of its persistent fields.
+
+    Args:
+        book (Book): The book to convert.
+
+    Returns:
+        dict: JSON serializable fields of the book.
+    """
+    return {
+        'title': book.title,
+        'author': book.author,
+        'genre': book.genre,
+        'year': int(book.year),
+        'copies': int(book.copies),
+        'is_loaned': encode_is_loaned(book.is_loaned, int(book.copies)),
+        'waiting_list': list(book.waiting_list),
+        'borrow_count': int(book.borrow_count),
+    }
+
+
+def _apply_record(books_df, record):
+    """
+    Apply a single journal record to a DataFrame.
+
+    Args:
+        books_df (pd.DataFrame): The DataFrame to update.
+        record (dict): A record written by BookJournal.
+
+    Returns:
+        pd.DataFrame: The updated DataFrame.
+    """
+    if record.get('op') == BookJournal.DELETE:
+        mask = (books_df['title'] == record['title']) & (books_df['author'] == record['author'])
+        return books_df[~mask].reset_index(drop=True)
+
+    row = dict(record['row'])
+    matches = books_df.index[(books_df['title'] == row['title']) & (books_df['author'] == row['author'])]
+    if len(matches) == 0:
+        return concat_books(books_df, new_book_row(**row))
+
+    row_index = matches[0]
+    for column, value in row.items():
+        ensure_category(books_df, column, value)
+        books_df.at[row_index, column] = value
+    return derive_loan_counters(books_df, [row_index], reset_borrow_count=False)
+
+
+def replay_journal(books_df, journal_path):
+    """
+    Replay the records of a journal file on top of a loaded snapshot.
+
+    Args:
+        books_df (pd.DataFrame): The snapshot loaded from the catalog file.
+        journal_path (str): Path to the journal file.
+
+    Returns:
+        pd.DataFrame: The DataFrame with all journaled mutations applied.
+    """
+    records = BookJournal(journal_path).read_records()
+    for record in records:
+        books_df = _apply_record(books_df, record)
+    if records:
+        print(f"Replayed {len(records)} journal records from {journal_path}.")
+    return books_df
+
+
+def add_book_to_dataframe(book):
+    """
+    Append a new Book object as a row to the DataFrame managed by DataManager,
+    or to its catalog store if one is attached.
+    """
+    data_manager = DataManager.get_instance()
+    if data_manager.store is not None:
+        data_manager.store.append_book(book)
+        data_manager.index_book(book.title, book.author, book.genre)
+        data_manager.bump_version()
+    else:
+        # persist_book has already inserted the book into the storage engine
+        data_manager.append_rows(new_book_row(**book_to_record(book)), to_engine=False)
+
+
+def remove_book_from_dataframe(title, author):
+    """
+    Remove a book's row from the DataFrame managed by DataManager,
+    or from its catalog store if one is attached.
+    """
+    data_manager = DataManager.get_instance()
+    if data_manager.store is not None:
+        data_manager.store.remove(title, author)
+        data_manager.unindex_book(title, author)
+        data_manager.bump_version()
+    else:
+        data_manager.remove_row(title, author)
+
+
+def checkpoint_books_file(file_path="books.csv"):
+    """
+    Fold the journal back into the catalog file by writing a full snapshot.
+    """
+    save_books_to_file(file_path)
+
+
+def persist_book(book, file_path="books.csv", is_new=False, copy_id=None):
+    """
+    Persist a changed Book object.
+
+    With a storage engine only the changed rows are written; a borrow or a
+    return (copy_id given) updates just that copy's loan row and the book's
+    counters. In journal mode the
+    change is appended as one record and the catalog file is only rewritten at
+    checkpoints. In write-behind mode the file is saved in the background.
+    Otherwise the whole file is saved.
+
+    Args:
+        book (Book): The changed book.
+        file_path (str): Path to the catalog file.
+        is_new (bool): True if the book is not in the DataFrame yet.
+        copy_id (int): The one copy that was loaned or returned, if that is the only change.
+    """
+    data_manager = DataManager.get_instance()
+    with data_manager.lock:
+        if data_manager.engine is not None:
+            if is_new:
+                data_manager.engine.insert_book(book)
+            elif copy_id is None or not data_manager.engine.set_loan_state(book, copy_id):
+                data_manager.engine.update_book(book)
+        elif data_manager.journal is not None:
+            data_manager.journal.append_put(book_to_record(book))
+
+        # The database now has the change; a DataFrame that was never read needs none
+        if data_manager.catalog_unread():
+            data_manager.bump_version()
+        elif is_new:
+            add_book_to_dataframe(book)
+        else:
+            update_book_in_dataframe(book)
+
+    _persist(file_path)
+
+
+def persist_books(changed=(), new=(), file_path="books.csv"):
+    """
+    Persist a batch of changed and new Book objects with a single write:
+    one transaction with a storage engine, one journal append in journal
+    mode and otherwise one save (or one dirty mark in write-behind mode).
+
+    Args:
+        changed (iterable): Existing books whose fields changed.
+        new (iterable): Books that are not in the DataFrame yet.
+        file_path (str): Path to the catalog file.
+    """
+    changed, new = list(changed), list(new)
+    if not changed and not new:
+        return
+
+    data_manager = DataManager.get_instance()
+    with data_manager.lock:
+        if data_manager.engine is not None:
+            data_manager.engine.write_books(changed, new)
+        elif data_manager.journal is not None:
+            data_manager.journal.append_puts([book_to_record(book) for book in changed + new])
+
+        if data_manager.catalog_unread():
+            data_manager.bump_version()
+        else:
+            for book in changed:
+                update_book_in_dataframe(book)
+            for book in new:
+                add_book_to_dataframe(book)
+
+    _persist(file_path)
+
+
+def persist_book_removal(title, author, file_path="books.csv"):
+    """
+    Persist the removal of a book.
+
+    Args:
+        title (str): The title of the removed book.
+        author (str): The author of the removed book.
+        file_path (str): Path to the catalog file.
+    """
+    data_manager = DataManager.get_instance()
+    with data_manager.lock:
+        if data_manager.engine is not None:
+            data_manager.engine.delete_book(title, author)
+        elif data_manager.journal is not None:
+            data_manager.journal.append_delete(title, author)
+
+        if data_manager.catalog_unread():
+            data_manager.bump_version()
+        else:
+            remove_book_from_dataframe(title, author)
+    _persist(file_path)
+
+
+def _persist(file_path):
+    """
+    Write a full snapshot, or in journal mode only when a checkpoint is due.
+    Storage engines have already written the change, and in write-behind mode
+    the DataManager is only marked as dirty.
+    """
+    data_manager = DataManager.get_instance()
+    if data_manager.engine is not None:
+        return
+    journal = data_manager.journal
+    if journal is not None:
+        if journal.pending >= data_manager.checkpoint_interval:
+            save_books_to_file(file_path)
+    elif data_manager.flusher is not None:
+        data_manager.mark_dirty()
+    else:
+        save_books_to_file(file_path)
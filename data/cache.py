@@ -0,0 +1,110 @@
+import hashlib
+import os
+from data.snapshot import SNAPSHOT_EXTENSION, save_snapshot, load_snapshot, snapshot_metadata
+
+CACHE_DIRECTORY = ".books_cache"
+# Caches are binary snapshots, which hold plain arrays only and never run code when loaded
+CACHE_EXTENSION = SNAPSHOT_EXTENSION
+
+
+def cache_path_for(file_path):
+    """
+    Return the path of the parsed-catalog cache that belongs to a catalog file.
+    Caches live in a hidden directory next to the catalog.
+
+    Args:
+        file_path (str): Path to the catalog file.
+
+    Returns:
+        str: Path to the cache file.
+    """
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, CACHE_DIRECTORY, name + CACHE_EXTENSION)
+
+
+def file_fingerprint(file_path):
+    """
+    Fingerprint a catalog file by its path, size, mtime and content hash.
+    The content is hashed in 1 MB blocks, which is far cheaper than parsing it.
+
+    Args:
+        file_path (str): Path to the catalog file.
+
+    Returns:
+        tuple: (path, size, mtime_ns, content_hash).
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+def _fingerprint_text(fingerprint):
+    return "\x1f".join(str(part) for part in fingerprint)
+
+
+def load_cached_frame(file_path, fingerprint):
+    """
+    Load the parsed DataFrame of a catalog file from its cache.
+
+    Args:
+        file_path (str): Path to the catalog file.
+        fingerprint (tuple): The current fingerprint of the file, see file_fingerprint.
+
+    Returns:
+        pd.DataFrame: The cached DataFrame, or None if there is no cache for this fingerprint.
+    """
+    cache_path = cache_path_for(file_path)
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        if snapshot_metadata(cache_path).get("fingerprint") != _fingerprint_text(fingerprint):
+            return None
+        return load_snapshot(cache_path, mmap=False)
+    except Exception as e:
+        print(f"Ignoring unreadable cache {cache_path}: {e}")
+        return None
+
+
+def store_cached_frame(file_path, fingerprint, books_df):
+    """
+    Store the parsed DataFrame of a catalog file in its cache.
+
+    The cache is written to a temporary file and renamed over the old one, so
+    concurrent readers never see a partial cache. Failures are reported and
+    otherwise ignored, since the cache is only an optimization.
+
+    Args:
+        file_path (str): Path to the catalog file.
+        fingerprint (tuple): The fingerprint the file had before it was parsed.
+        books_df (pd.DataFrame): The parsed DataFrame, before any journal replay.
+    """
+    cache_path = cache_path_for(file_path)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp{CACHE_EXTENSION}"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        save_snapshot(books_df, temp_path, metadata={"fingerprint": _fingerprint_text(fingerprint)})
+        os.replace(temp_path, cache_path)
+    except Exception as e:
+        print(f"Could not write cache {cache_path}: {e}")
+        for path in (temp_path, f"{temp_path}.tmp{CACHE_EXTENSION}"):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def clear_cache(file_path):
+    """
+    Remove the cache of a catalog file, if there is one.
+
+    Args:
+        file_path (str): Path to the catalog file.
+    """
+    cache_path = cache_path_for(file_path)
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    # Leave no empty cache directory behind
+    directory = os.path.dirname(cache_path)
+    if os.path.isdir(directory) and not os.listdir(directory):
+        os.rmdir(directory)
@@ -0,0 +1,648 @@
+import itertools
+import threading
+import numpy as np
+import pandas as pd
+from data.loan_state import loan_codes_from_matrix, loan_matrix
+from data.schema import BOOKS_SCHEMA, apply_schema
+from models.book import BaseBook
+from models.waiting_list import WaitingList
+
+# Column order of the DataFrame built by CatalogStore.to_frame, as in the books CSV file
+_FRAME_COLUMNS = ['title', 'author', 'is_loaned', 'copies', 'genre', 'year',
+                  'available', 'waiting_list', 'borrow_count', 'popularity_score']
+
+# Fixed-width numeric columns, with the dtypes of the shared schema
+_NUMERIC_COLUMNS = {
+    'year': np.dtype(BOOKS_SCHEMA['year']),
+    'copies': np.dtype(BOOKS_SCHEMA['copies']),
+    'borrow_count': np.dtype(BOOKS_SCHEMA['borrow_count']),
+    'popularity_score': np.dtype(BOOKS_SCHEMA['popularity_score']),
+    'loaned_count': np.dtype(BOOKS_SCHEMA['available']),
+}
+
+# Every array with one entry per row position
+_ROW_ARRAYS = ('titles', 'authors', 'genres', 'waiting_lists', 'offsets', 'flag_capacity', 'free_hint',
+               'loaned_hint', 'alive', 'views', *_NUMERIC_COLUMNS)
+
+# The frame columns a change to a book can touch
+MUTABLE_COLUMNS = ('is_loaned', 'copies', 'available', 'waiting_list', 'borrow_count', 'popularity_score')
+
+
+class CatalogStore:
+    """
+    The canonical in-memory catalog, stored as a struct of NumPy arrays.
+
+    Every book is one row position across the column arrays. The loan flags of
+    all copies live in one flat boolean array; a book's copies are the slice
+    'loan_flags[offset:offset + copies]'. Book objects handed out by the store
+    are BookView instances that read and write these arrays directly, so there
+    is no second copy of the catalog to keep in sync. The DataFrame used for
+    saving, paging and the GUI is produced on demand by to_frame.
+
+    Each book keeps two search hints, copy indexes below which no copy is free
+    and no copy is loaned. Checkouts take the lowest free copy, so the hint
+    moves with them and finding the next one rarely scans more than a copy.
+
+    Removed books are tombstoned, and blocks that had to grow are moved to the
+    end of the flag array, until compact packs the store. There is one view
+    per row, so compact can move every view to its book's new row. Every change
+    gives 'version' a new unique value, also when changes to different books
+    race in several threads, and the rows it touched are recorded until
+    take_changes collects them, so a DataFrame of the catalog can be updated
+    row by row.
+    """
+
+    def __init__(self, capacity=16):
+        """
+        Initializes an empty store.
+
+        Args:
+            capacity (int): Number of books to allocate room for.
+        """
+        capacity = max(int(capacity), 1)
+        self.size = 0
+        self.version = 0
+        self._versions = itertools.count(1)
+        self.titles = np.empty(capacity, dtype=object)
+        self.authors = np.empty(capacity, dtype=object)
+        self.genres = np.empty(capacity, dtype=object)
+        self.waiting_lists = np.empty(capacity, dtype=object)
+        for name, dtype in _NUMERIC_COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.offsets = np.zeros(capacity, dtype=np.int64)
+        self.flag_capacity = np.zeros(capacity, dtype=np.int64)
+        self.free_hint = np.zeros(capacity, dtype=np.int64)
+        self.loaned_hint = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.views = np.empty(capacity, dtype=object)
+        self.loan_flags = np.zeros(capacity, dtype=bool)
+        self.flag_size = 0
+        self.removed = 0
+        # Flags of removed books and of blocks that were moved, reclaimed by compact
+        self.wasted_flags = 0
+        self.positions = {}
+        self.columns = list(_FRAME_COLUMNS)
+        # Rows changed and rows removed since the last take_changes; None means unknown
+        self._changed = set()
+        self._removed_rows = []
+        self._changes_lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, books_df):
+        """
+        Build a store from a books DataFrame in the shared schema.
+
+        Args:
+            books_df (pd.DataFrame): DataFrame with compact 'is_loaned' strings.
+
+        Returns:
+            CatalogStore: The new store.
+        """
+        count = len(books_df)
+        store = cls(count)
+        if count == 0:
+            return store
+        store.columns = [column for column in books_df.columns if column in _FRAME_COLUMNS]
+
+        store.titles[:count] = books_df['title'].to_numpy(dtype=object)
+        store.authors[:count] = books_df['author'].to_numpy(dtype=object)
+        store.genres[:count] = books_df['genre'].to_numpy(dtype=object)
+        for name in ('year', 'copies', 'borrow_count'):
+            getattr(store, name)[:count] = books_df[name].to_numpy(dtype=np.int64, na_value=0)
+
+        # Scatter the copy matrix into one flat array: row i owns copies[i] flags
+        copies = store.copies[:count].astype(np.int64)
+        matrix = loan_matrix(books_df['is_loaned'].to_numpy())
+        width = matrix.shape[1]
+        if width < int(copies.max()):
+            matrix = np.pad(matrix, ((0, 0), (0, int(copies.max()) - width)))
+        in_range = np.arange(matrix.shape[1]) < copies[:, None]
+        store.loan_flags = np.ascontiguousarray(matrix[in_range])
+        store.flag_size = len(store.loan_flags)
+        store.offsets[:count] = np.cumsum(copies) - copies
+        store.flag_capacity[:count] = copies
+        store.loaned_count[:count] = matrix.sum(axis=1, where=in_range)
+
+        waiting_lists = books_df['waiting_list'] if 'waiting_list' in books_df.columns else [()] * count
+        for position, waiting_list in enumerate(waiting_lists):
+            store.waiting_lists[position] = WaitingList(waiting_list)
+        store.popularity_score[:count] = store.borrow_count[:count] + np.fromiter(
+            map(len, store.waiting_lists[:count]), dtype=np.int64, count=count
+        )
+        store.alive[:count] = True
+        store.size = count
+        for position, key in enumerate(zip(store.titles[:count], store.authors[:count])):
+            store.positions.setdefault(key, position)
+        return store
+
+    def __len__(self):
+        return self.size - self.removed
+
+    def _grow(self, size):
+        """
+        Make room for 'size' books, doubling the capacity of every column.
+        """
+        capacity = len(self.alive)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in _ROW_ARRAYS:
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=object) if column.dtype == object else np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def _allocate_flags(self, count):
+        """
+        Reserve 'count' loan flags at the end of the flat array.
+
+        Returns:
+            int: The offset of the first reserved flag.
+        """
+        offset = self.flag_size
+        if offset + count > len(self.loan_flags):
+            grown = np.zeros(max(offset + count, 2 * len(self.loan_flags)), dtype=bool)
+            grown[:offset] = self.loan_flags[:offset]
+            self.loan_flags = grown
+        self.flag_size = offset + count
+        return offset
+
+    def append(self, title, author, genre, year, copies, loaned=(), waiting_list=(), borrow_count=0):
+        """
+        Append a book.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            genre (str): The genre of the book.
+            year (int): The publication year.
+            copies (int): The number of copies.
+            loaned (iterable): IDs of the loaned copies.
+            waiting_list (iterable): The users waiting for the book.
+            borrow_count (int): The borrow count.
+
+        Returns:
+            int: The row position of the new book.
+        """
+        position = self.size
+        self._grow(position + 1)
+        copies = int(copies)
+        offset = self._allocate_flags(copies)
+        flags = self.loan_flags[offset:offset + copies]
+        flags[:] = False
+        for copy_id in loaned:
+            if 1 <= copy_id <= copies:
+                flags[copy_id - 1] = True
+
+        waiting_list = WaitingList(waiting_list)
+        self.titles[position] = title
+        self.authors[position] = author
+        self.genres[position] = genre
+        self.year[position] = int(year)
+        self.copies[position] = copies
+        self.offsets[position] = offset
+        self.flag_capacity[position] = copies
+        self.reset_hints(position)
+        self.loaned_count[position] = int(flags.sum())
+        self.borrow_count[position] = int(borrow_count)
+        self.waiting_lists[position] = waiting_list
+        self.popularity_score[position] = int(borrow_count) + len(waiting_list)
+        self.alive[position] = True
+        self.size += 1
+        self.positions.setdefault((title, author), position)
+        self.touch(position)
+        return position
+
+    def append_book(self, book):
+        """
+        Append a Book object.
+
+        Args:
+            book (Book): The book to append.
+
+        Returns:
+            int: The row position of the new book.
+        """
+        loaned = [copy_id for copy_id, status in book.is_loaned.items() if status == "yes"]
+        return self.append(book.title, book.author, book.genre, book.year, book.copies,
+                           loaned, book.waiting_list, book.borrow_count)
+
+    def update_from(self, book):
+        """
+        Copy the mutable state of a Book object into its row.
+
+        Args:
+            book (Book): The changed book.
+
+        Returns:
+            bool: True if the book is in the store, False otherwise.
+        """
+        position = self.position_of(book.title, book.author)
+        if position is None:
+            return False
+        self.set_copies(position, book.copies)
+        offset = self.offsets[position]
+        flags = self.loan_flags[offset:offset + int(book.copies)]
+        flags[:] = [status == "yes" for status in book.is_loaned.values()]
+        self.reset_hints(position)
+        self.loaned_count[position] = int(flags.sum())
+        self.borrow_count[position] = int(book.borrow_count)
+        self.waiting_lists[position] = WaitingList(book.waiting_list)
+        self.popularity_score[position] = int(book.popularity_score)
+        self.touch(position)
+        return True
+
+    def remove(self, title, author):
+        """
+        Remove a book. Its row is tombstoned, so other row positions do not change.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            bool: True if the book existed, False otherwise.
+        """
+        position = self.positions.pop((title, author), None)
+        if position is None:
+            return False
+        self.alive[position] = False
+        self.removed += 1
+        self.wasted_flags += int(self.flag_capacity[position])
+        with self._changes_lock:
+            self._removed_rows.append(position)
+        self.touch(position)
+        return True
+
+    def position_of(self, title, author):
+        """
+        Returns the row position of a book, or None if it is not in the store.
+        """
+        return self.positions.get((title, author))
+
+    def view(self, position):
+        """
+        Returns the Book-like view over one row. Every row has a single view.
+        """
+        view = self.views[position]
+        if view is None:
+            view = self.views[position] = BookView(self, position)
+        return view
+
+    def get(self, title, author):
+        """
+        Returns the view of a book, or None if it is not in the store.
+        """
+        position = self.positions.get((title, author))
+        return self.view(position) if position is not None else None
+
+    def owns(self, book):
+        """
+        Returns True if 'book' is a view over this store.
+        """
+        return isinstance(book, BookView) and book._store is self
+
+    def touch(self, position=None):
+        """
+        Record a change, e.g. one made to a waiting list outside the store's setters.
+
+        Args:
+            position (int): The row that changed. If None, any row may have changed.
+        """
+        # The row is recorded before the version changes, so whoever sees the
+        # new version also finds the row in take_changes
+        with self._changes_lock:
+            if position is None:
+                self._changed = None
+            elif self._changed is not None:
+                self._changed.add(position)
+        # next() on a counter is atomic, unlike 'version += 1'
+        self.version = next(self._versions)
+
+    def take_changes(self):
+        """
+        Collect the rows changed and removed since the last call.
+
+        Returns:
+            tuple: The set of changed row positions, or None if any row may have
+            changed, and the list of removed row positions.
+        """
+        with self._changes_lock:
+            changed, removed = self._changed, self._removed_rows
+            self._changed, self._removed_rows = set(), []
+        return changed, removed
+
+    def needs_compaction(self):
+        """
+        Returns True if removed books or moved flag blocks take up room that compact would reclaim.
+        """
+        return bool(self.removed or self.wasted_flags)
+
+    def compact(self):
+        """
+        Drop removed books and pack the flag blocks back into catalog order.
+
+        The views of the remaining books are moved to their new rows, so the
+        objects handed out stay valid. A view of a removed book gets a store
+        of its own that keeps the book's last state. Callers must keep other
+        threads away from the store while it is compacted.
+
+        Returns:
+            np.ndarray: The new position of every old row, -1 for removed books.
+        """
+        count = self.size
+        alive = self.alive[:count]
+        rows = np.flatnonzero(alive)
+        for position in np.flatnonzero(~alive):
+            view = self.views[position]
+            if view is not None:
+                view._store, view._position = self._detached(position), 0
+
+        # Gather the flags of the remaining books into consecutive blocks
+        copies = self.copies[rows].astype(np.int64)
+        offsets = np.cumsum(copies) - copies
+        flag_index = np.repeat(self.offsets[rows] - offsets, copies) + np.arange(int(copies.sum()))
+        loan_flags = self.loan_flags[flag_index]
+        self.loan_flags = loan_flags if len(loan_flags) else np.zeros(1, dtype=bool)
+        self.flag_size = len(loan_flags)
+
+        for name in _ROW_ARRAYS:
+            column = getattr(self, name)
+            packed = np.empty(max(len(rows), 1), dtype=column.dtype)
+            packed[len(rows):] = None if column.dtype == object else 0
+            packed[:len(rows)] = column[rows]
+            setattr(self, name, packed)
+        self.offsets[:len(rows)] = offsets
+        self.flag_capacity[:len(rows)] = copies
+        self.size = len(rows)
+        self.removed = 0
+        self.wasted_flags = 0
+
+        moved = np.full(count, -1, dtype=np.int64)
+        moved[rows] = np.arange(len(rows))
+        self.positions = {key: int(moved[position]) for key, position in self.positions.items()}
+        for position, view in enumerate(self.views[:self.size]):
+            if view is not None:
+                view._position = position
+        with self._changes_lock:
+            if self._removed_rows:
+                # Removals nobody has collected cannot be told apart any more
+                self._changed, self._removed_rows = None, []
+            elif self._changed is not None:
+                self._changed = {int(moved[position]) for position in self._changed if moved[position] >= 0}
+        return moved
+
+    def _detached(self, position):
+        """
+        Copy one row into a store of its own, for a view of a removed book.
+        """
+        offset, copies = int(self.offsets[position]), int(self.copies[position])
+        loaned = np.flatnonzero(self.loan_flags[offset:offset + copies]) + 1
+        store = CatalogStore(1)
+        store.append(self.titles[position], self.authors[position], self.genres[position], self.year[position],
+                     copies, loaned.tolist(), self.waiting_lists[position].to_list(), self.borrow_count[position])
+        store.popularity_score[0] = self.popularity_score[position]
+        store.views[0] = self.views[position]
+        return store
+
+    def set_copies(self, position, copies):
+        """
+        Change the number of copies of a book. New copies are available.
+        A block that has to grow is moved to the end of the flat flag array.
+        """
+        copies = int(copies)
+        old_copies = int(self.copies[position])
+        offset = int(self.offsets[position])
+        if copies > self.flag_capacity[position]:
+            self.wasted_flags += int(self.flag_capacity[position])
+            new_offset = self._allocate_flags(copies)
+            self.loan_flags[new_offset:new_offset + old_copies] = self.loan_flags[offset:offset + old_copies]
+            self.offsets[position] = offset = new_offset
+            self.flag_capacity[position] = copies
+        if copies > old_copies:
+            self.loan_flags[offset + old_copies:offset + copies] = False
+            self.free_hint[position] = min(int(self.free_hint[position]), old_copies)
+        self.copies[position] = copies
+        self.loaned_count[position] = int(self.loan_flags[offset:offset + copies].sum())
+        self.touch(position)
+
+    def is_loaned(self, position, copy_id):
+        return bool(self.loan_flags[self.offsets[position] + copy_id - 1])
+
+    def set_loaned(self, position, copy_id, loaned):
+        """
+        Set the loan state of one copy and keep the loaned-copy counter in step.
+        """
+        index = self.offsets[position] + copy_id - 1
+        if self.loan_flags[index] == loaned:
+            return
+        self.loan_flags[index] = loaned
+        # The changed copy is the only one that can fall below the other state's hint
+        copy_index = copy_id - 1
+        if loaned:
+            self.loaned_count[position] += 1
+            if copy_index < self.loaned_hint[position]:
+                self.loaned_hint[position] = copy_index
+        else:
+            self.loaned_count[position] -= 1
+            if copy_index < self.free_hint[position]:
+                self.free_hint[position] = copy_index
+        self.touch(position)
+
+    def reset_hints(self, position):
+        """
+        Forget the search hints of a book after its flags were rewritten in bulk.
+        """
+        self.free_hint[position] = 0
+        self.loaned_hint[position] = 0
+
+    def first_copy(self, position, loaned):
+        """
+        Find the lowest copy of a book in a given state.
+
+        Returns:
+            int: The ID of the copy, or None if no copy is in that state.
+        """
+        copies = int(self.copies[position])
+        loaned_count = int(self.loaned_count[position])
+        if loaned_count == (0 if loaned else copies):
+            return None
+        if loaned_count == (copies if loaned else 0):
+            return 1
+        hints = self.loaned_hint if loaned else self.free_hint
+        offset = int(self.offsets[position])
+        start = min(int(hints[position]), copies)
+        flags = self.loan_flags[offset + start:offset + copies]
+        if not len(flags):
+            return None
+        # The copy at the hint is usually the one; scan the rest only when it is not
+        index = 0 if flags[0] == loaned else int(np.argmax(flags if loaned else ~flags))
+        if flags[index] != loaned:
+            return None
+        index += start
+        hints[position] = index
+        return index + 1
+
+    def live_positions(self):
+        """
+        Returns the row positions of the books that were not removed, in catalog order.
+        """
+        return np.flatnonzero(self.alive[:self.size])
+
+    def column_values(self, rows):
+        """
+        Read the mutable frame columns of some rows, without building a DataFrame.
+
+        Args:
+            rows (array-like): Row positions.
+
+        Returns:
+            dict: A NumPy array per column in MUTABLE_COLUMNS, in the order of 'rows'.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = self._columns(rows)
+        return {column: columns[column] for column in MUTABLE_COLUMNS}
+
+    def to_frame(self, rows=None):
+        """
+        Build the books DataFrame in the shared schema.
+
+        While no book was removed, the numeric columns of the whole catalog wrap
+        slices of the store's arrays without copying them, so the frame reflects
+        later in-place changes to those columns. 'version' tells when to rebuild it.
+
+        Args:
+            rows (array-like): Row positions to include. Defaults to every book
+                that was not removed.
+
+        Returns:
+            pd.DataFrame: The catalog.
+        """
+        if rows is None:
+            rows = slice(0, self.size) if not self.removed else self.live_positions()
+        else:
+            rows = np.asarray(rows, dtype=np.int64)
+        columns = self._columns(rows)
+        books_df = pd.DataFrame({column: columns[column] for column in self.columns}, copy=False)
+        return apply_schema(books_df)
+
+    def _columns(self, rows):
+        """
+        Returns the frame columns of the given rows as NumPy arrays.
+        """
+        copies = self.copies[rows]
+
+        # Gather every book's flag block into a matrix and encode it as loan-state strings
+        offsets = self.offsets[rows]
+        width = int(copies.max()) if len(copies) else 0
+        index = offsets[:, None] + np.arange(width)
+        in_range = np.arange(width) < copies[:, None].astype(np.int64)
+        matrix = self.loan_flags[np.where(in_range, index, 0)] & in_range
+
+        columns = {
+            'title': self.titles[rows],
+            'author': self.authors[rows],
+            'is_loaned': loan_codes_from_matrix(matrix, copies.astype(np.int64)),
+            'copies': copies,
+            'genre': self.genres[rows],
+            'year': self.year[rows],
+            'available': (copies - self.loaned_count[rows]).astype(_NUMERIC_COLUMNS['loaned_count']),
+            'waiting_list': np.empty(len(copies), dtype=object),
+            'borrow_count': self.borrow_count[rows],
+            'popularity_score': self.popularity_score[rows],
+        }
+        for row, waiting_list in enumerate(self.waiting_lists[rows]):
+            columns['waiting_list'][row] = waiting_list.to_list()
+        return columns
+
+
+class BookView(BaseBook):
+    """
+    A Book backed by one row of a CatalogStore. Reads and writes go straight to the store's arrays.
+    """
+
+    __slots__ = ("_store", "_position")
+
+    def __init__(self, store, position):
+        self._store = store
+        self._position = position
+
+    @property
+    def title(self):
+        return self._store.titles[self._position]
+
+    @property
+    def author(self):
+        return self._store.authors[self._position]
+
+    @property
+    def genre(self):
+        return self._store.genres[self._position]
+
+    @property
+    def year(self):
+        return int(self._store.year[self._position])
+
+    @property
+    def copies(self):
+        return int(self._store.copies[self._position])
+
+    @copies.setter
+    def copies(self, copies):
+        self._store.set_copies(self._position, copies)
+
+    @property
+    def available(self):
+        return int(self._store.copies[self._position]) - int(self._store.loaned_count[self._position])
+
+    @property
+    def borrow_count(self):
+        return int(self._store.borrow_count[self._position])
+
+    @borrow_count.setter
+    def borrow_count(self, borrow_count):
+        self._store.borrow_count[self._position] = borrow_count
+        self._store.touch(self._position)
+
+    @property
+    def popularity_score(self):
+        return int(self._store.popularity_score[self._position])
+
+    @popularity_score.setter
+    def popularity_score(self, popularity_score):
+        self._store.popularity_score[self._position] = popularity_score
+        self._store.touch(self._position)
+
+    @property
+    def waiting_list(self):
+        return self._store.waiting_lists[self._position]
+
+    @waiting_list.setter
+    def waiting_list(self, waiting_list):
+        self._store.waiting_lists[self._position] = WaitingList(waiting_list)
+        self._store.touch(self._position)
+
+    def _replace_loan_state(self, is_loaned):
+        store, position = self._store, self._position
+        copies = self.copies
+        offset = store.offsets[position]
+        flags = store.loan_flags[offset:offset + copies]
+        flags[:] = False
+        for copy_id, status in is_loaned.items():
+            if status == "yes" and 1 <= int(copy_id) <= copies:
+                flags[int(copy_id) - 1] = True
+        store.reset_hints(position)
+        store.loaned_count[position] = int(flags.sum())
+        store.touch(position)
+
+    def first_free_copy(self):
+        return self._store.first_copy(self._position, loaned=False)
+
+    def first_loaned_copy(self):
+        return self._store.first_copy(self._position, loaned=True)
+
+    def _is_copy_loaned(self, copy_id):
+        return self._store.is_loaned(self._position, copy_id)
+
+    def _set_loaned(self, copy_id, loaned):
+        self._store.set_loaned(self._position, copy_id, loaned)
@@ -0,0 +1,168 @@
+import json
+import os
+
+
+class BookJournal:
+    """
+    An append-only write-ahead journal for book mutations.
+
+    Every change to the catalog is written as one compact JSON line instead of
+    rewriting the whole books file. On startup the journal is replayed on top of
+    the last snapshot, and a checkpoint folds it back into the catalog file.
+    """
+
+    PUT = "put"
+    DELETE = "del"
+
+    def __init__(self, file_path: str, sync: bool = False):
+        """
+        Initializes the journal next to the catalog file.
+
+        Args:
+            file_path (str): Path to the journal file.
+            sync (bool): If True, fsync after every record so it survives a power loss.
+        """
+        self.file_path = file_path
+        self.sync = sync
+        self.pending = 0
+        self._handle = None
+
+    @staticmethod
+    def path_for(catalog_path: str) -> str:
+        """
+        Returns the journal path that belongs to a catalog file.
+
+        Args:
+            catalog_path (str): Path to the catalog (snapshot) file.
+
+        Returns:
+            str: Path to the journal file.
+        """
+        return f"{catalog_path}.journal"
+
+    def append(self, record: dict):
+        """
+        Appends one mutation record to the journal.
+
+        Args:
+            record (dict): The record to append. Must be JSON serializable.
+        """
+        self.extend([record])
+
+    def extend(self, records):
+        """
+        Appends several mutation records with a single write and flush.
+
+        Args:
+            records (list): The records to append. Must be JSON serializable.
+        """
+        if not records:
+            return
+        if self._handle is None:
+            self.repair()
+            self._handle = open(self.file_path, "a", encoding="utf-8")
+        self._handle.write("".join(
+            json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n" for record in records
+        ))
+        self._handle.flush()
+        if self.sync:
+            os.fsync(self._handle.fileno())
+        self.pending += len(records)
+
+    def append_put(self, row: dict):
+        """
+        Records the full state of a single book.
+
+        Args:
+            row (dict): The book's persistent fields.
+        """
+        self.append({"op": self.PUT, "row": row})
+
+    def append_puts(self, rows):
+        """
+        Records the full state of several books at once.
+
+        Args:
+            rows (list): The books' persistent fields.
+        """
+        self.extend([{"op": self.PUT, "row": row} for row in rows])
+
+    def append_delete(self, title: str, author: str):
+        """
+        Records the removal of a book.
+
+        Args:
+            title (str): The title of the removed book.
+            author (str): The author of the removed book.
+        """
+        self.append({"op": self.DELETE, "title": title, "author": author})
+
+    def read_records(self):
+        """
+        Reads all records currently in the journal.
+
+        A torn last line (e.g. after a crash in the middle of a write) is ignored.
+
+        Returns:
+            list: The journal records in the order they were written.
+        """
+        if not os.path.exists(self.file_path):
+            return []
+
+        records = []
+        with open(self.file_path, "r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+        return records
+
+    def repair(self):
+        """
+        Cuts a torn last line off the journal, so records appended after a crash
+        start on a line of their own instead of continuing the torn one, which
+        would hide them from read_records.
+
+        Returns:
+            int: The number of bytes cut off.
+        """
+        if self._handle is not None or not os.path.exists(self.file_path):
+            return 0
+        with open(self.file_path, "rb+") as handle:
+            data = handle.read()
+            end = 0
+            for line in data.splitlines(keepends=True):
+                try:
+                    if line.strip():
+                        json.loads(line)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                end += len(line)
+            if end == len(data):
+                if data and not data.endswith(b"\n"):
+                    # The last record is complete but its line break was not written
+                    handle.write(b"\n")
+                return 0
+            handle.truncate(end)
+        return len(data) - end
+
+    def truncate(self):
+        """
+        Empties the journal after its records were folded into the catalog file.
+        """
+        self.close()
+        if os.path.exists(self.file_path):
+            os.remove(self.file_path)
+        self.pending = 0
+
+    def close(self):
+        """
+        Closes the underlying file handle.
+        """
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
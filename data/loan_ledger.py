@@ -0,0 +1,282 @@
+import os
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.schema import BOOKS_SCHEMA
+
+SECONDS_PER_DAY = 86400
+# Copy IDs take the low bits of a loan's key, below the book number, as wide as the 'copies' column
+COPY_ID_BITS = np.dtype(BOOKS_SCHEMA['copies']).itemsize * 8
+
+
+def _seconds(moment) -> int:
+    """
+    Converts a datetime or a number of seconds since the epoch to whole seconds. None means now.
+    """
+    if moment is None:
+        return int(time.time())
+    if isinstance(moment, datetime):
+        return int(moment.timestamp())
+    return int(moment)
+
+
+class LoanLedger:
+    """
+    Active loans with their due dates, stored as columnar NumPy arrays.
+
+    Every loan is one row across the book, copy_id, user, loaned_at and due_at
+    arrays; books and users are stored as small integer numbers. Timestamps are
+    seconds since the epoch. Rows of returned loans are reused by later loans,
+    so the arrays stay as long as the peak number of active loans. An overdue
+    query is one comparison over the due_at column, without visiting any book
+    or copy.
+    """
+
+    ARRAYS = ("book", "copy_id", "user", "loaned_at", "due_at")
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Initializes an empty ledger.
+
+        Args:
+            capacity (int): Number of loans to allocate room for.
+        """
+        capacity = max(int(capacity), 1)
+        self.books = []          # book number -> (title, author)
+        self.book_numbers = {}   # (title, author) -> book number
+        self.users = []          # user number -> user ID
+        self.user_numbers = {}   # user ID -> user number
+        self.book = np.zeros(capacity, dtype=np.int32)
+        self.copy_id = np.zeros(capacity, dtype=BOOKS_SCHEMA['copies'])
+        self.user = np.zeros(capacity, dtype=np.int32)
+        self.loaned_at = np.zeros(capacity, dtype=np.int64)
+        self.due_at = np.zeros(capacity, dtype=np.int64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.size = 0            # Rows in use, active or free
+        self.rows = {}           # book number << COPY_ID_BITS | copy ID -> row
+        self.free = []           # Rows of returned loans
+        # Loans of different books may be opened from different threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(catalog_path: str) -> str:
+        """
+        Returns the ledger path that belongs to a catalog file.
+        """
+        return f"{catalog_path}.ledger.npz"
+
+    @staticmethod
+    def _number(names, numbers, name):
+        number = numbers.get(name)
+        if number is None:
+            number = numbers[name] = len(names)
+            names.append(name)
+        return number
+
+    def _grow(self, size):
+        capacity = len(self.book)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in self.ARRAYS + ("active",):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def open(self, title: str, author: str, copy_id: int, user_id, loaned_at=None,
+             due_at=None, loan_days: int = 14) -> int:
+        """
+        Records a loan. A copy that is still recorded as loaned is loaned again.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            copy_id (int): The ID of the copy.
+            user_id: The ID of the user. It is kept as a string, the type the ledger file holds.
+            loaned_at: When the copy was loaned, as a datetime or seconds. Defaults to now.
+            due_at: When the copy is due. Defaults to 'loan_days' after 'loaned_at'.
+            loan_days (int): The loan period.
+
+        Returns:
+            int: The due timestamp.
+        """
+        if not 0 <= copy_id < 1 << COPY_ID_BITS:
+            raise ValueError(f"Copy ID out of range: {copy_id}")
+        loaned_at = _seconds(loaned_at)
+        due_at = loaned_at + loan_days * SECONDS_PER_DAY if due_at is None else _seconds(due_at)
+        with self._lock:
+            book = self._number(self.books, self.book_numbers, (title, author))
+            key = book << COPY_ID_BITS | copy_id
+            row = self.rows.get(key)
+            if row is None:
+                if self.free:
+                    row = self.free.pop()
+                else:
+                    self._grow(self.size + 1)
+                    row = self.size
+                    self.size += 1
+                self.rows[key] = row
+            self.book[row] = book
+            self.copy_id[row] = copy_id
+            self.user[row] = self._number(self.users, self.user_numbers, str(user_id))
+            self.loaned_at[row] = loaned_at
+            self.due_at[row] = due_at
+            self.active[row] = True
+            return due_at
+
+    def close(self, title: str, author: str, copy_id: int):
+        """
+        Records that a copy was returned.
+
+        Returns:
+            The ID of the user who held the copy, or None if no loan was recorded.
+        """
+        with self._lock:
+            book = self.book_numbers.get((title, author))
+            row = self.rows.pop(book << COPY_ID_BITS | copy_id, None) if book is not None else None
+            if row is None:
+                return None
+            self.active[row] = False
+            self.free.append(row)
+            return self.users[self.user[row]]
+
+    def retain(self, is_loaned) -> int:
+        """
+        Drops the loans of copies that are no longer loaned.
+
+        Args:
+            is_loaned (callable): Check (title, author, copy_id) -> bool.
+
+        Returns:
+            int: The number of loans dropped.
+        """
+        with self._lock:
+            loans = [(self.books[self.book[row]], int(self.copy_id[row])) for row in self.rows.values()]
+        stale = [(key, copy_id) for key, copy_id in loans if not is_loaned(*key, copy_id)]
+        for (title, author), copy_id in stale:
+            self.close(title, author, copy_id)
+        return len(stale)
+
+    def due_of(self, title: str, author: str, copy_id: int):
+        """
+        Returns the due timestamp of a loaned copy, or None.
+        """
+        book = self.book_numbers.get((title, author))
+        row = self.rows.get(book << COPY_ID_BITS | copy_id) if book is not None else None
+        return int(self.due_at[row]) if row is not None else None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def overdue_rows(self, as_of=None) -> np.ndarray:
+        """
+        Finds the loans that are overdue at a moment, with one vectorized scan.
+
+        Args:
+            as_of: The moment, as a datetime or seconds. Defaults to now.
+
+        Returns:
+            np.ndarray: Row numbers of the overdue loans.
+        """
+        as_of = _seconds(as_of)
+        with self._lock:
+            return np.flatnonzero(self.active[:self.size] & (self.due_at[:self.size] < as_of))
+
+    def overdue(self, as_of=None) -> pd.DataFrame:
+        """
+        Lists the loans that are overdue at a moment, most overdue first.
+
+        Args:
+            as_of: The moment, as a datetime or seconds. Defaults to now.
+
+        Returns:
+            pd.DataFrame: Columns title, author, copy_id, user_id, loaned_at and due_at.
+        """
+        rows = self.overdue_rows(as_of)
+        rows = rows[np.argsort(self.due_at[rows], kind="stable")]
+        books = self.book[rows]
+        users = self.user[rows]
+        return pd.DataFrame({
+            "title": np.array([title for title, _ in self.books], dtype=object)[books],
+            "author": np.array([author for _, author in self.books], dtype=object)[books],
+            "copy_id": self.copy_id[rows],
+            "user_id": np.array(self.users, dtype=object)[users],
+            "loaned_at": self.loaned_at[rows],
+            "due_at": self.due_at[rows],
+        })
+
+    def overdue_counts(self, as_of=None) -> dict:
+        """
+        Counts the overdue loans of every user at a moment.
+
+        Args:
+            as_of: The moment, as a datetime or seconds. Defaults to now.
+
+        Returns:
+            dict: User ID -> number of overdue loans, for users with any.
+        """
+        counts = np.bincount(self.user[self.overdue_rows(as_of)], minlength=len(self.users))
+        return {self.users[user]: int(counts[user]) for user in np.flatnonzero(counts)}
+
+    def save(self, file_path: str):
+        """
+        Writes the active loans to a NumPy archive, replacing it atomically.
+        Nothing is written for an empty ledger that has no file yet.
+
+        Args:
+            file_path (str): Path to the ledger file.
+        """
+        with self._lock:
+            rows = np.flatnonzero(self.active[:self.size])
+            arrays = {name: getattr(self, name)[rows] for name in self.ARRAYS}
+            titles = np.array([title for title, _ in self.books], dtype=str)
+            authors = np.array([author for _, author in self.books], dtype=str)
+            users = np.array(self.users, dtype=str)
+        if not len(rows) and not os.path.exists(file_path):
+            return
+        temporary_path = f"{file_path}.tmp"
+        with open(temporary_path, "wb") as handle:
+            np.savez(handle, titles=titles, authors=authors, users=users, **arrays)
+        os.replace(temporary_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str, is_loaned=None):
+        """
+        Reads a ledger written by save. A missing file gives an empty ledger.
+
+        Args:
+            file_path (str): Path to the ledger file.
+            is_loaned (callable): Optional check (title, author, copy_id) -> bool. Loans
+                of copies that are no longer loaned in the catalog are dropped.
+
+        Returns:
+            LoanLedger: The ledger.
+        """
+        if not os.path.exists(file_path):
+            return cls()
+        with np.load(file_path) as archive:
+            arrays = {name: archive[name] for name in cls.ARRAYS}
+            books = list(zip(archive["titles"].tolist(), archive["authors"].tolist()))
+            users = archive["users"].tolist()
+
+        if is_loaned is not None:
+            keep = np.fromiter((is_loaned(*books[book], copy_id) for book, copy_id
+                                in zip(arrays["book"].tolist(), arrays["copy_id"].tolist())),
+                               dtype=bool, count=len(arrays["book"]))
+            arrays = {name: values[keep] for name, values in arrays.items()}
+
+        count = len(arrays["book"])
+        ledger = cls(count)
+        ledger.books, ledger.users = books, users
+        ledger.book_numbers = {book: number for number, book in enumerate(books)}
+        ledger.user_numbers = {user: number for number, user in enumerate(users)}
+        for name, values in arrays.items():
+            getattr(ledger, name)[:count] = values
+        ledger.active[:count] = True
+        ledger.size = count
+        keys = arrays["book"].astype(np.int64) << COPY_ID_BITS | arrays["copy_id"].astype(np.int64)
+        ledger.rows = dict(zip(keys.tolist(), range(count)))
+        return ledger
@@ -0,0 +1,172 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Compact on-disk encoding of per-copy loan state: one character per copy,
+# e.g. "YYN" means copies 1 and 2 are loaned and copy 3 is available.
+LOANED = "Y"
+FREE = "N"
+
+_LOANED_BYTE = ord(LOANED)
+_FREE_BYTE = ord(FREE)
+
+_LEGACY_ENTRY = re.compile(r"""(\d+)\s*:\s*['"](yes|no)['"]""")
+_LEGACY_DICT = re.compile(r"""\{\s*(?:\d+\s*:\s*['"](?:yes|no)['"]\s*(?:,\s*)?)*\}""")
+
+
+def encode_is_loaned(is_loaned, num_copies=None):
+    """
+    Encode an 'is_loaned' dictionary as a compact loan-state string.
+
+    Args:
+        is_loaned (dict): Mapping of copy ID to 'yes' / 'no'.
+        num_copies (int): Number of copies. Defaults to the size of the dictionary.
+
+    Returns:
+        str: The encoded loan state, e.g. "YYN".
+    """
+    if num_copies is None:
+        num_copies = len(is_loaned)
+    return "".join(
+        LOANED if is_loaned.get(copy_id) == "yes" else FREE for copy_id in range(1, num_copies + 1)
+    )
+
+
+def decode_is_loaned(code):
+    """
+    Decode a compact loan-state string into an 'is_loaned' dictionary.
+
+    Args:
+        code (str): The encoded loan state, e.g. "YYN".
+
+    Returns:
+        dict: Mapping of copy ID to 'yes' / 'no'.
+    """
+    return {copy_id: "yes" if status == LOANED else "no" for copy_id, status in enumerate(code, start=1)}
+
+
+def parse_loan_column(values, copies):
+    """
+    Parse a whole column of raw 'is_loaned' values into compact loan-state strings.
+
+    Supported formats are the compact encoding ("YYN"), 'yes' / 'no' for all copies,
+    the legacy dictionary text ("{1: 'yes', 2: 'no'}"), dictionaries and missing
+    values (all copies available). Every value is expanded or truncated to the
+    number of copies of its row. The legacy text is parsed with a regular
+    expression, never evaluated.
+
+    Args:
+        values (sequence): The raw 'is_loaned' values.
+        copies (sequence): The number of copies of each row.
+
+    Returns:
+        np.ndarray: The compact loan-state string of each row.
+
+    Raises:
+        ValueError: If a value is in none of the supported formats.
+    """
+    values = pd.Series(values, dtype=object).to_numpy()
+    copies = np.asarray(copies, dtype=np.int64)
+    count = len(values)
+    if count == 0:
+        return np.array([], dtype=object)
+    width = int(copies.max())
+    loaned = np.zeros((count, width), dtype=bool)
+
+    # Dictionaries become their legacy text form; missing values mean all copies are free
+    missing = pd.isna(values)
+    text = np.char.strip(values.astype(str))
+    lower = np.char.lower(text)
+
+    all_free = (lower == "no") | missing
+    all_loaned = lower == "yes"
+
+    chars = text.view(np.uint32).reshape(count, -1)
+    compact = np.isin(chars, (_LOANED_BYTE, _FREE_BYTE, 0)).all(axis=1) & ~missing
+    legacy = np.char.startswith(lower, "{") & ~missing
+
+    for row in np.flatnonzero(legacy):
+        if _LEGACY_DICT.fullmatch(lower[row]) is None:
+            legacy[row] = False
+            continue
+        for copy_id, status in _LEGACY_ENTRY.findall(lower[row]):
+            if 1 <= int(copy_id) <= width:
+                loaned[row, int(copy_id) - 1] = status == "yes"
+
+    unknown = ~(all_free | all_loaned | compact | legacy)
+    if unknown.any():
+        raise ValueError(f"Unexpected is_loaned value: {values[np.flatnonzero(unknown)[0]]}")
+
+    loaned[all_loaned] = True
+    code_width = min(chars.shape[1], width)
+    loaned[compact, :code_width] = chars[compact, :code_width] == _LOANED_BYTE
+
+    return loan_codes_from_matrix(loaned, copies)
+
+
+def find_copy(code, loaned):
+    """
+    Find the first copy in a given state, using a C-level scan of the loan-state string.
+
+    Args:
+        code (str): The compact loan state, e.g. "YYN".
+        loaned (bool): True to find the first loaned copy, False for the first available one.
+
+    Returns:
+        int: The ID of the copy, or None if no copy is in that state.
+    """
+    index = code.find(LOANED if loaned else FREE)
+    return index + 1 if index >= 0 else None
+
+
+def with_copy_state(code, copy_id, loaned):
+    """
+    Return a loan-state string with the state of one copy changed.
+
+    Args:
+        code (str): The compact loan state, e.g. "YYN".
+        copy_id (int): The ID of the copy.
+        loaned (bool): The new state of the copy.
+
+    Returns:
+        str: The updated loan state.
+    """
+    return code[:copy_id - 1] + (LOANED if loaned else FREE) + code[copy_id:]
+
+
+def loan_codes_from_matrix(loaned, copies):
+    """
+    Build compact loan-state strings from a boolean copy matrix.
+
+    Args:
+        loaned (np.ndarray): Boolean matrix with one row per book and one column per copy.
+        copies (np.ndarray): The number of copies of each row.
+
+    Returns:
+        np.ndarray: The compact loan-state string of each row.
+    """
+    count, width = loaned.shape
+    if width == 0:
+        return np.full(count, "", dtype=object)
+
+    matrix = np.where(loaned, _LOANED_BYTE, _FREE_BYTE).astype(np.uint8)
+    matrix[np.arange(width) >= copies[:, None]] = 0  # Trailing NUL bytes are dropped by numpy
+    return matrix.view(f"S{width}").ravel().astype(str).astype(object)
+
+
+def loan_matrix(codes):
+    """
+    Decode a column of compact loan-state strings into a boolean copy matrix.
+
+    Args:
+        codes (sequence): The compact loan-state strings.
+
+    Returns:
+        np.ndarray: Boolean matrix, True where a copy is loaned.
+    """
+    codes = np.asarray(codes, dtype=str)
+    if len(codes) == 0:
+        return np.zeros((0, 0), dtype=bool)
+    width = max(int(np.char.str_len(codes).max()), 1)
+    matrix = np.frombuffer(codes.astype(f"S{width}").tobytes(), dtype=np.uint8)
+    return matrix.reshape(len(codes), width) == _LOANED_BYTE
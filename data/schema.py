@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+from data.loan_state import FREE
+
+# Compact dtypes of the books DataFrame, shared by every loader, writer and the GUI.
+# 'is_loaned' holds the compact loan-state string ("YYN"), see data.loan_state.
+BOOKS_SCHEMA = {
+    'title': 'str',
+    'author': 'category',
+    'genre': 'category',
+    'year': 'int16',  # Signed: ancient works have negative years
+    'copies': 'uint32',
+    'is_loaned': 'str',
+    'available': 'uint32',
+    'borrow_count': 'uint32',
+    'popularity_score': 'uint32',
+    'waiting_list': 'object',
+}
+
+# Copy IDs run from 1 to 'copies', so every per-copy structure shares this limit
+MAX_COPIES = int(np.iinfo(BOOKS_SCHEMA['copies']).max)
+
+# Nullable variants, used when a numeric column has missing values
+_NULLABLE = {'int16': 'Int16', 'uint16': 'UInt16', 'uint32': 'UInt32'}
+
+
+def apply_schema(books_df):
+    """
+    Cast the known columns of a books DataFrame to their compact dtypes.
+    Unknown columns are left as they are.
+
+    Args:
+        books_df (pd.DataFrame): The books DataFrame.
+
+    Returns:
+        pd.DataFrame: The DataFrame with compact dtypes.
+    """
+    dtypes = {}
+    for column, dtype in BOOKS_SCHEMA.items():
+        if column not in books_df.columns or books_df[column].dtype == dtype:
+            continue
+        if dtype in _NULLABLE and books_df[column].isna().any():
+            dtype = _NULLABLE[dtype]
+        dtypes[column] = dtype
+    return books_df.astype(dtypes) if dtypes else books_df
+
+
+def empty_books_frame():
+    """
+    Build an empty books DataFrame with every column of the shared schema.
+
+    Returns:
+        pd.DataFrame: A frame without rows.
+    """
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in BOOKS_SCHEMA.items()})
+
+
+def new_book_row(title, author, genre, year, copies, is_loaned=None, waiting_list=None, borrow_count=0):
+    """
+    Build a one-row DataFrame for a new book in the shared schema.
+
+    Args:
+        title (str): The title of the book.
+        author (str): The author of the book.
+        genre (str): The genre of the book.
+        year (int): The publication year.
+        copies (int): The number of copies.
+        is_loaned (str): Compact loan state. Defaults to all copies available.
+        waiting_list (list): The waiting list. Defaults to an empty list.
+        borrow_count (int): The borrow count.
+
+    Returns:
+        pd.DataFrame: The new row.
+    """
+    if is_loaned is None:
+        is_loaned = FREE * int(copies)
+    waiting_list = list(waiting_list) if waiting_list is not None else []
+    row = pd.DataFrame([{
+        'title': title,
+        'author': author,
+        'genre': genre,
+        'year': int(year),
+        'copies': int(copies),
+        'is_loaned': is_loaned,
+        'available': is_loaned.count(FREE),
+        'waiting_list': None,
+        'borrow_count': int(borrow_count),
+        'popularity_score': int(borrow_count) + len(waiting_list),
+    }])
+    row.at[0, 'waiting_list'] = waiting_list
+    return apply_schema(row)
+
+
+def ensure_category(books_df, column, value):
+    """
+    Make sure a categorical column can hold a value, adding it as a new category if needed.
+
+    Args:
+        books_df (pd.DataFrame): The books DataFrame. Changed in place.
+        column (str): The column name.
+        value: The value about to be written.
+    """
+    series = books_df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+        books_df[column] = series.cat.add_categories([value])
+
+
+def concat_books(books_df, new_rows):
+    """
+    Append rows to a books DataFrame without losing the categorical dtypes.
+
+    Args:
+        books_df (pd.DataFrame): The books DataFrame.
+        new_rows (pd.DataFrame): The rows to append.
+
+    Returns:
+        pd.DataFrame: The combined DataFrame with a fresh RangeIndex.
+    """
+    if books_df is None or books_df.empty:
+        return apply_schema(new_rows.reset_index(drop=True))
+
+    new_rows = new_rows.copy()
+    books_df = books_df.copy(deep=False)
+    for column in books_df.columns:
+        if column in new_rows.columns and isinstance(books_df[column].dtype, pd.CategoricalDtype):
+            categories = books_df[column].cat.categories
+            missing = pd.Index(new_rows[column].dropna().unique()).difference(categories)
+            if len(missing):
+                books_df[column] = books_df[column].cat.add_categories(missing)
+            new_rows[column] = new_rows[column].astype(books_df[column].dtype)
+    return apply_schema(pd.concat([books_df, new_rows], ignore_index=True))
+
+
+def memory_usage(books_df):
+    """
+    Return the deep memory usage of a books DataFrame in bytes.
+
+    Args:
+        books_df (pd.DataFrame): The books DataFrame.
+
+    Returns:
+        int: Memory usage in bytes, including the objects referenced by object columns.
+    """
+    return int(np.sum(books_df.memory_usage(deep=True)))
@@ -0,0 +1,221 @@
+import ast
+import gc
+import os
+import sys
+import numpy as np
+import pandas as pd
+from data.loan_state import parse_loan_column
+
+SNAPSHOT_EXTENSION = ".npy"
+
+
+def is_snapshot_path(file_path):
+    """
+    Check whether a catalog path refers to a binary snapshot rather than a CSV file.
+
+    Args:
+        file_path (str): Path to the catalog file.
+
+    Returns:
+        bool: True if the path has the snapshot extension.
+    """
+    return str(file_path).lower().endswith(SNAPSHOT_EXTENSION)
+
+
+def _encode_waiting_lists(values):
+    """
+    Encode a column of waiting lists as per-row counts plus one flat array of
+    entries. Entries that are not strings (e.g. contact dicts) are stored as
+    Python literals and flagged.
+    """
+    from data.books import parse_waiting_list_column
+
+    lists = parse_waiting_list_column(values).tolist()
+    counts = np.fromiter((len(entries) for entries in lists), dtype=np.int32, count=len(lists))
+    entries = [entry for waiting_list in lists for entry in waiting_list]
+    literal = np.fromiter((not isinstance(entry, str) for entry in entries), dtype=bool, count=len(entries))
+    text = np.array([entry if isinstance(entry, str) else repr(entry) for entry in entries], dtype=str)
+    return counts, {"waiting_entries": text, "waiting_literal": literal}
+
+
+def _decode_waiting_lists(counts, extras):
+    """
+    Rebuild the waiting lists from their counts and flat entries. Only the rows
+    with entries are visited, so a catalog with few waiting lists loads at the
+    cost of allocating its empty lists.
+    """
+    # Allocating a million lists would otherwise trigger many pointless garbage collections
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        lists = [[] for _ in range(len(counts))]
+    finally:
+        if collecting:
+            gc.enable()
+    rows = np.flatnonzero(counts)
+    if not len(rows):
+        return lists
+    entries = extras["waiting_entries"].tolist()
+    for position in np.flatnonzero(extras["waiting_literal"]).tolist():
+        entries[position] = ast.literal_eval(entries[position])
+    offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64))).tolist()
+    for row in rows.tolist():
+        lists[row] = entries[offsets[row]:offsets[row + 1]]
+    return lists
+
+
+def _write_extras(handle, extras):
+    """
+    Append named arrays after the records array of a snapshot: first the
+    array of their names, then the arrays in that order.
+    """
+    np.lib.format.write_array(handle, np.array(list(extras), dtype=str), allow_pickle=False)
+    for array in extras.values():
+        np.lib.format.write_array(handle, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _read_extras(file_path):
+    """
+    Read the named arrays that follow the records array of a snapshot.
+    Snapshots written before they existed have none.
+    """
+    with open(file_path, "rb") as handle:
+        version = np.lib.format.read_magic(handle)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(handle)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(handle)
+        handle.seek(int(np.prod(shape)) * dtype.itemsize, os.SEEK_CUR)
+        if not handle.read(1):
+            return {}
+        handle.seek(-1, os.SEEK_CUR)
+        names = np.lib.format.read_array(handle, allow_pickle=False).tolist()
+        return {name: np.lib.format.read_array(handle, allow_pickle=False) for name in names}
+
+
+def save_snapshot(books_df, file_path, metadata=None):
+    """
+    Save a books DataFrame as a binary columnar snapshot.
+
+    The snapshot is a NumPy structured array: numeric columns keep their dtype,
+    'is_loaned' is stored in its compact encoding, 'waiting_list' as the number
+    of entries of every row and every other column as fixed-width text. The
+    flat waiting-list entries and the masks of missing text values follow the
+    array in the same file, so it stays a single, memory-mappable .npy file.
+    The file is written next to the target and then renamed over it, so
+    readers that still map the old file are not affected.
+
+    Args:
+        books_df (pd.DataFrame): The DataFrame to save.
+        file_path (str): Path to the snapshot file.
+        metadata (dict): Optional text values to store with the snapshot, see snapshot_metadata.
+    """
+    columns = {}
+    extras = {}
+    if metadata:
+        extras["metadata"] = np.array([[str(key), str(value)] for key, value in metadata.items()], dtype=str)
+    for column in books_df.columns:
+        values = books_df[column]
+        if column == 'is_loaned':
+            columns[column] = parse_loan_column(values, books_df['copies']).astype(str)
+        elif column == 'waiting_list':
+            columns[column], waiting = _encode_waiting_lists(values)
+            extras.update(waiting)
+        elif pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+            missing = values.isna().to_numpy()
+            columns[column] = values.to_numpy(dtype="float64", na_value=np.nan) if missing.any() else values.to_numpy()
+        else:
+            missing = values.isna().to_numpy()
+            if missing.any():
+                extras[f"missing:{column}"] = missing
+            columns[column] = np.array(["" if gap else str(value) for value, gap in zip(values, missing)], dtype=str)
+
+    records = np.empty(len(books_df), dtype=[(name, array.dtype) for name, array in columns.items()])
+    for name, array in columns.items():
+        records[name] = array
+
+    temp_path = f"{file_path}.tmp{SNAPSHOT_EXTENSION}"
+    with open(temp_path, "wb") as handle:
+        np.lib.format.write_array(handle, records, allow_pickle=False)
+        _write_extras(handle, extras)
+    os.replace(temp_path, file_path)
+
+
+def snapshot_metadata(file_path):
+    """
+    Read the metadata stored with a snapshot by save_snapshot.
+
+    Args:
+        file_path (str): Path to the snapshot file.
+
+    Returns:
+        dict: The metadata, empty if there is none.
+    """
+    metadata = _read_extras(file_path).get("metadata")
+    return dict(metadata.tolist()) if metadata is not None else {}
+
+
+def load_snapshot(file_path, mmap=True):
+    """
+    Load a binary columnar snapshot into a DataFrame.
+
+    The records are memory-mapped copy-on-write: numeric columns are views of
+    the mapping and are only read from disk when touched, and changes to the
+    DataFrame never write through to the file.
+
+    Args:
+        file_path (str): Path to the snapshot file.
+        mmap (bool): If False, the records are read into memory instead, so the
+            file can be replaced or removed while the DataFrame is in use.
+
+    Returns:
+        pd.DataFrame: The books DataFrame, including the derived columns.
+    """
+    records = np.load(file_path, mmap_mode="c" if mmap else None, allow_pickle=False)
+    books_df = pd.DataFrame({name: records[name] for name in records.dtype.names}, copy=False)
+    extras = _read_extras(file_path)
+    for name, mask in extras.items():
+        if name.startswith("missing:"):
+            column = name.split(":", 1)[1]
+            books_df[column] = books_df[column].mask(mask)
+    if 'waiting_list' in books_df.columns:
+        counts = records['waiting_list']
+        if counts.dtype.kind == 'U':
+            # Snapshots written before waiting lists were flattened store their text
+            from data.books import parse_waiting_list_column
+            books_df['waiting_list'] = parse_waiting_list_column(books_df['waiting_list'])
+        else:
+            books_df['waiting_list'] = pd.Series(_decode_waiting_lists(counts, extras), index=books_df.index, dtype=object)
+    return books_df
+
+
+def convert_csv_to_snapshot(csv_path, snapshot_path=None):
+    """
+    Convert a books CSV file into a binary snapshot.
+
+    Args:
+        csv_path (str): Path to the source CSV file.
+        snapshot_path (str): Path to the snapshot. Defaults to the CSV path with the snapshot extension.
+
+    Returns:
+        str: Path to the written snapshot.
+    """
+    from data.books import load_books_from_file
+
+    if snapshot_path is None:
+        snapshot_path = os.path.splitext(csv_path)[0] + SNAPSHOT_EXTENSION
+
+    books_df = load_books_from_file(csv_path)
+    if books_df is None or len(books_df) == 0:
+        raise ValueError(f"No books could be loaded from {csv_path}")
+
+    save_snapshot(books_df, snapshot_path)
+    print(f"Converted {len(books_df)} books from {csv_path} to {snapshot_path}.")
+    return snapshot_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m data.snapshot <books.csv> [books.npy]")
+        sys.exit(1)
+    convert_csv_to_snapshot(*sys.argv[1:])
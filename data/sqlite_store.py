@@ -0,0 +1,324 @@
+import ast
+import json
+import sqlite3
+import numpy as np
+import pandas as pd
+from data.loan_state import LOANED, parse_loan_column, loan_codes_from_matrix
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    genre TEXT,
+    year INTEGER,
+    copies INTEGER NOT NULL DEFAULT 0,
+    borrow_count INTEGER NOT NULL DEFAULT 0,
+    waiting_list TEXT NOT NULL DEFAULT '[]'
+);
+-- A lookup index only: a catalog may list the same title and author twice
+DROP INDEX IF EXISTS idx_books_title_author;
+CREATE INDEX IF NOT EXISTS idx_books_title_author_lookup ON books (title, author);
+CREATE TABLE IF NOT EXISTS loans (
+    book_id INTEGER NOT NULL REFERENCES books (id) ON DELETE CASCADE,
+    copy_id INTEGER NOT NULL,
+    is_loaned INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (book_id, copy_id)
+) WITHOUT ROWID;
+"""
+
+_BOOK_COLUMNS = "id, title, author, genre, year, copies, borrow_count, waiting_list"
+
+# Single-book operations act on the first of any duplicate rows, as the DataFrame does
+_FIRST_BOOK_ID = "SELECT id FROM books WHERE title = ? AND author = ? ORDER BY id LIMIT 1"
+
+
+def is_sqlite_path(file_path):
+    """
+    Check whether a catalog path refers to a SQLite database.
+
+    Args:
+        file_path (str): Path to the catalog file.
+
+    Returns:
+        bool: True if the path has one of the SQLite extensions.
+    """
+    return str(file_path).lower().endswith(SQLITE_EXTENSIONS)
+
+
+def _waiting_list_to_json(value):
+    """
+    Convert a waiting list (a list or its text form) to JSON text.
+    """
+    if isinstance(value, str):
+        value = ast.literal_eval(value) if value.strip() else []
+    return json.dumps(list(value), ensure_ascii=False)
+
+
+class SQLiteBookStore:
+    """
+    A SQLite storage engine for the books catalog.
+
+    Books live in one table with a unique index on (title, author), and the loan
+    state of every copy is a row of its own in the 'loans' table, so a borrow or
+    a return is a single-row UPDATE.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Opens (and if needed creates) the database.
+
+        Args:
+            db_path (str): Path to the SQLite database file.
+        """
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def count_books(self) -> int:
+        """
+        Returns the number of books in the catalog.
+        """
+        return self.connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def read_frame(self, where: str = "", params=(), limit: int = None, offset: int = 0) -> pd.DataFrame:
+        """
+        Reads books into a DataFrame in the layout produced by load_books_from_file.
+
+        Only the selected books and their loan rows are read.
+
+        Args:
+            where (str): Optional SQL condition on the books table, e.g. "genre = ?".
+            params (tuple): Parameters for the condition.
+            limit (int): Maximum number of books to read.
+            offset (int): Number of books to skip.
+
+        Returns:
+            pd.DataFrame: The selected books.
+        """
+        id_query = "SELECT id FROM books"
+        if where:
+            id_query += f" WHERE {where}"
+        id_query += " ORDER BY id"
+        params = tuple(params)
+        if limit is not None:
+            id_query += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+
+        books_df = pd.read_sql_query(
+            f"SELECT {_BOOK_COLUMNS} FROM books WHERE id IN ({id_query}) ORDER BY id", self.connection, params=params
+        )
+        loans = self.connection.execute(
+            f"SELECT book_id, copy_id FROM loans WHERE is_loaned = 1 AND book_id IN ({id_query})", params
+        ).fetchall()
+        return self._with_loan_columns(books_df, loans)
+
+    def get_book_row(self, title: str, author: str):
+        """
+        Reads a single book through the (title, author) index.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            dict: The book's row, or None if it does not exist.
+        """
+        books_df = self.read_frame("title = ? AND author = ?", (title, author), limit=1)
+        if books_df.empty:
+            return None
+        return books_df.iloc[0].to_dict()
+
+    def _with_loan_columns(self, books_df: pd.DataFrame, loans) -> pd.DataFrame:
+        """
+        Adds 'is_loaned', 'available' and 'popularity_score' from the loaned copies of the books.
+        """
+        ids = books_df["id"].to_numpy(dtype=np.int64)
+        copies = books_df["copies"].to_numpy(dtype=np.int64)
+        width = int(copies.max()) if len(copies) else 0
+        loaned = np.zeros((len(ids), width), dtype=bool)
+
+        if loans:
+            loans = np.asarray(loans, dtype=np.int64)
+            positions = np.searchsorted(ids, loans[:, 0])
+            in_range = loans[:, 1] <= copies[positions]
+            loaned[positions[in_range], loans[in_range, 1] - 1] = True
+
+        codes = loan_codes_from_matrix(loaned, copies)
+        books_df = books_df.drop(columns="id")
+        books_df["is_loaned"] = codes
+        books_df["available"] = copies - loaned.sum(axis=1)
+        books_df["waiting_list"] = [json.loads(value) for value in books_df["waiting_list"]]
+        books_df["popularity_score"] = books_df["borrow_count"] + books_df["waiting_list"].apply(len)
+        return books_df
+
+    def write_frame(self, books_df: pd.DataFrame):
+        """
+        Replaces the whole catalog with the contents of a DataFrame in one transaction.
+
+        Args:
+            books_df (pd.DataFrame): The books DataFrame.
+        """
+        codes = parse_loan_column(books_df["is_loaned"], books_df["copies"])
+        waiting_lists = books_df["waiting_list"] if "waiting_list" in books_df.columns else [[]] * len(books_df)
+        borrow_counts = books_df["borrow_count"] if "borrow_count" in books_df.columns else [0] * len(books_df)
+
+        book_rows = [
+            (book_id, str(title), str(author), str(genre), int(year), int(copies), int(borrow_count),
+             _waiting_list_to_json(waiting_list))
+            for book_id, (title, author, genre, year, copies, borrow_count, waiting_list) in enumerate(zip(
+                books_df["title"], books_df["author"], books_df["genre"], books_df["year"],
+                books_df["copies"], borrow_counts, waiting_lists,
+            ), start=1)
+        ]
+        loan_rows = [
+            (book_id, copy_id, int(status == LOANED))
+            for book_id, code in enumerate(codes, start=1)
+            for copy_id, status in enumerate(code, start=1)
+        ]
+
+        with self.connection:
+            self.connection.execute("DELETE FROM loans")
+            self.connection.execute("DELETE FROM books")
+            self.connection.executemany(
+                f"INSERT INTO books ({_BOOK_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", book_rows
+            )
+            self.connection.executemany(
+                "INSERT INTO loans (book_id, copy_id, is_loaned) VALUES (?, ?, ?)", loan_rows
+            )
+
+    def insert_book(self, book):
+        """
+        Inserts a new book and one loan row per copy.
+
+        Args:
+            book (Book): The book to insert.
+        """
+        with self.connection:
+            self._insert_book(book)
+
+    def _insert_book(self, book):
+        cursor = self.connection.execute(
+            "INSERT INTO books (title, author, genre, year, copies, borrow_count, waiting_list) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (book.title, book.author, book.genre, int(book.year), int(book.copies),
+             int(book.borrow_count), _waiting_list_to_json(book.waiting_list)),
+        )
+        self.connection.executemany(
+            "INSERT INTO loans (book_id, copy_id, is_loaned) VALUES (?, ?, ?)",
+            [(cursor.lastrowid, int(copy_id), int(status == "yes")) for copy_id, status in book.is_loaned.items()],
+        )
+
+    def update_book(self, book):
+        """
+        Writes the changed fields of an existing book in one transaction.
+
+        Only loan rows whose state actually changed are updated, so a borrow or a
+        return touches a single row of the 'loans' table.
+
+        Args:
+            book (Book): The changed book.
+
+        Returns:
+            bool: True if the book exists, False otherwise.
+        """
+        with self.connection:
+            return self._update_book(book)
+
+    def _update_book(self, book):
+        row = self.connection.execute(_FIRST_BOOK_ID, (book.title, book.author)).fetchone()
+        if row is None:
+            return False
+        book_id = row[0]
+
+        self.connection.execute(
+            "UPDATE books SET genre = ?, year = ?, copies = ?, borrow_count = ?, waiting_list = ? WHERE id = ?",
+            (book.genre, int(book.year), int(book.copies), int(book.borrow_count),
+             _waiting_list_to_json(book.waiting_list), book_id),
+        )
+
+        stored = dict(self.connection.execute(
+            "SELECT copy_id, is_loaned FROM loans WHERE book_id = ?", (book_id,)
+        ).fetchall())
+        for copy_id, status in book.is_loaned.items():
+            loaned = int(status == "yes")
+            if int(copy_id) not in stored:
+                self.connection.execute(
+                    "INSERT INTO loans (book_id, copy_id, is_loaned) VALUES (?, ?, ?)",
+                    (book_id, int(copy_id), loaned),
+                )
+            elif stored[int(copy_id)] != loaned:
+                self.connection.execute(
+                    "UPDATE loans SET is_loaned = ? WHERE book_id = ? AND copy_id = ?",
+                    (loaned, book_id, int(copy_id)),
+                )
+        self.connection.execute(
+            "DELETE FROM loans WHERE book_id = ? AND copy_id > ?", (book_id, int(book.copies))
+        )
+        return True
+
+    def write_books(self, changed=(), new=()):
+        """
+        Writes a batch of changed and new books in a single transaction.
+
+        Args:
+            changed (iterable): Existing books whose fields changed.
+            new (iterable): Books to insert.
+        """
+        with self.connection:
+            for book in changed:
+                self._update_book(book)
+            for book in new:
+                self._insert_book(book)
+
+    def set_loan_state(self, book, copy_id: int) -> bool:
+        """
+        Writes a borrow or a return of a single copy in one transaction: one
+        UPDATE of the copy's loan row and one of the book's counters.
+
+        Args:
+            book (Book): The changed book.
+            copy_id (int): The ID of the copy that was loaned or returned.
+
+        Returns:
+            bool: True if the copy exists, False otherwise (nothing is written).
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                f"UPDATE loans SET is_loaned = ? WHERE copy_id = ? AND book_id = ({_FIRST_BOOK_ID})",
+                (int(book.is_loaned[copy_id] == "yes"), int(copy_id), book.title, book.author),
+            )
+            if cursor.rowcount != 1:
+                return False
+            self.connection.execute(
+                f"UPDATE books SET borrow_count = ?, waiting_list = ? WHERE id = ({_FIRST_BOOK_ID})",
+                (int(book.borrow_count), _waiting_list_to_json(book.waiting_list), book.title, book.author),
+            )
+        return True
+
+    def delete_book(self, title: str, author: str) -> bool:
+        """
+        Deletes a book and its loan rows.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            bool: True if the book existed, False otherwise.
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                f"DELETE FROM books WHERE id = ({_FIRST_BOOK_ID})", (title, author)
+            )
+        return cursor.rowcount == 1
@@ -0,0 +1,97 @@
+import atexit
+import threading
+import time
+
+
+class WriteBehindFlusher:
+    """
+    Coalesces bursts of catalog mutations into background flushes.
+
+    Callers only report that the catalog became dirty. A daemon thread flushes
+    once the first pending mutation is 'interval_ms' old or 'max_pending'
+    mutations have accumulated, whichever comes first. Pending changes are
+    always flushed on stop() and at interpreter exit.
+    """
+
+    def __init__(self, flush, interval_ms: int = 500, max_pending: int = 100):
+        """
+        Initializes and starts the flusher thread.
+
+        Args:
+            flush (callable): Writes the catalog to storage. Called without arguments.
+            interval_ms (int): Maximum age of a pending mutation before it is flushed.
+            max_pending (int): Number of pending mutations that triggers an immediate flush.
+        """
+        self._flush = flush
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self.pending = 0
+        self.flush_count = 0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="books-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def mark_dirty(self):
+        """
+        Reports one mutation. Returns immediately; the write happens in the background.
+        """
+        with self._condition:
+            self.pending += 1
+            self._condition.notify()
+
+    def _run(self):
+        """
+        Waits for mutations and flushes them in batches.
+        """
+        while True:
+            with self._condition:
+                while self.pending == 0 and not self._stopped:
+                    self._condition.wait()
+                if self.pending == 0:
+                    return
+
+                deadline = time.monotonic() + self.interval
+                while self.pending < self.max_pending and not self._stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self.pending = 0
+
+            self._write()
+
+    def _write(self):
+        """
+        Runs the flush callback, one flush at a time.
+        """
+        with self._flush_lock:
+            try:
+                self._flush()
+                self.flush_count += 1
+            except Exception as e:
+                print(f"Error flushing the catalog in the background: {e}")
+
+    def flush(self):
+        """
+        Flushes pending mutations right away on the caller's thread.
+        """
+        with self._condition:
+            if self.pending == 0:
+                return
+            self.pending = 0
+        self._write()
+
+    def stop(self):
+        """
+        Stops the background thread after a final flush of pending mutations.
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+        atexit.unregister(self.stop)
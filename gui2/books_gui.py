@@ -1,28 +1,37 @@
+import ast
 import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
-from data.books import DataManager, load_books_from_file  # Import the existing DataManager class
+from data.books import DataManager, PAGE_SIZE, load_books_from_file, save_books_to_file  # Import the existing DataManager class
+from data.loan_state import find_copy, with_copy_state
+from data.schema import new_book_row
 from logs.actions import log_error, log_info
-from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByGenre, SearchByYear
+from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByGenre, SearchByYear, SearchByKeywords
 from services.library_manager import LibraryManager
 
 
 class BooksGUI:
-    def __init__(self, root, csv_file):
+    def __init__(self, root, csv_file, write_behind=False):
         """
         Initialize the Books Management GUI.
 
         Args:
             root (tk.Tk): The Tkinter window for books management.
             csv_file (str): Path to the CSV file for the library.
+            write_behind (bool): If True, every change is saved automatically by a
+                background thread instead of only when "Save to CSV" is clicked.
         """
         self.root = root
         self.root.title("Books Management")
         self.csv_file = csv_file
+        # The tree shows one page of books at a time
+        self.page = 0
 
         # Load books into DataManager
         load_books_from_file(self.csv_file)
         self.manager = DataManager.get_instance()
+        if write_behind:
+            self.manager.enable_write_behind(self.csv_file)
 
         # Load books from the CSV file
      #   self.load_books()
@@ -92,23 +101,39 @@ class BooksGUI:
         tk.Button(self.button_frame, text="Return Book", command=self.return_book).pack(side=tk.LEFT, padx=5, pady=5)
         tk.Button(self.button_frame, text="Search Books", command=self.search_books).pack(side=tk.LEFT, padx=5, pady=5)
         tk.Button(self.button_frame, text="Save to CSV", command=self.save_to_csv).pack(side=tk.LEFT, padx=5, pady=5)
+        tk.Button(self.button_frame, text="Next Page", command=lambda: self.show_page(self.page + 1)).pack(side=tk.RIGHT, padx=5, pady=5)
+        tk.Button(self.button_frame, text="Previous Page", command=lambda: self.show_page(self.page - 1)).pack(side=tk.RIGHT, padx=5, pady=5)
+        self.page_label = tk.Label(self.button_frame)
+        self.page_label.pack(side=tk.RIGHT, padx=5, pady=5)
 
         # Refresh the treeview with the current data
         self.refresh_tree()
 
+    def show_page(self, page):
+        """
+        Show another page of books, if it exists.
+        """
+        pages = max((self.manager.count_books() + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+        if 0 <= page < pages:
+            self.page = page
+            self.refresh_tree()
+
     def refresh_tree(self):
         """
-        Refresh the treeview with the processed data from DataManager.
+        Refresh the treeview with the current page of books from DataManager.
         """
         # Clear the existing rows in the treeview
         for row in self.tree.get_children():
             self.tree.delete(row)
 
-        # Retrieve the processed data from DataManager
-        books_df = self.manager.get_data()
+        # Retrieve only the shown page, which a database catalog reads on its own
+        count = self.manager.count_books()
+        self.page = min(self.page, max((count - 1) // PAGE_SIZE, 0))
+        books_df = self.manager.get_page(self.page * PAGE_SIZE, PAGE_SIZE)
+        self.page_label.config(text=f"Page {self.page + 1} of {max((count + PAGE_SIZE - 1) // PAGE_SIZE, 1)}")
 
         # Insert each row into the treeview, including the new columns
-        for idx, (_, row) in enumerate(books_df.iterrows(), start=1):
+        for idx, (_, row) in enumerate(books_df.iterrows(), start=self.page * PAGE_SIZE + 1):
             self.tree.insert("", tk.END, values=(
                 idx, row["title"], row["author"], row["genre"], row["year"],
                 row["copies"], row["is_loaned"], row["available"],
@@ -134,32 +159,14 @@ class BooksGUI:
                 return
 
             try:
-                # יצירת מילון עבור is_loaned
-                is_loaned_dict = {i + 1: "no" for i in range(int(copies))}
-
                 # אתחול יתר השדות בערכים מתאימים כברירת מחדל
                 genre = "Uncategorized"  # קטגוריה כללית כברירת מחדל
-                waiting_list = "[]"  # רשימת המתנה ריקה
-                borrow_count = 0  # הספר עדיין לא הושאל
-                popularity_score = 0  # ניקוד פופולריות ראשוני
-
-                # הוספת הספר החדש ל-DataFrame
-                new_row = pd.DataFrame([{
-                    "title": title,
-                    "author": author,
-                    "genre": genre,
-                    "year": int(year),
-                    "copies": int(copies),
-                    "is_loaned": str(is_loaned_dict),  # מילון המייצג את מצב ההשאלה
-                    "available": int(copies),  # כל העותקים זמינים בהתחלה
-                    "borrow_count": borrow_count,  # הספר עדיין לא הושאל
-                    "popularity_score": popularity_score,  # ניקוד פופולריות ראשוני
-                    "waiting_list": waiting_list  # רשימת המתנה ריקה
-                }])
-
-                books_df = self.manager.get_data()
-                books_df = pd.concat([books_df, new_row], ignore_index=True)
-                self.manager.initialize_data(books_df)
+
+                # הוספת הספר החדש ל-DataFrame, כל העותקים זמינים בהתחלה
+                new_row = new_book_row(title, author, genre, int(year), int(copies))
+
+                self.manager.append_rows(new_row)
+                self.manager.mark_dirty()
                 self.refresh_tree()
                 add_window.destroy()
                 messagebox.showinfo("Success", "Book added successfully!")
@@ -250,45 +257,51 @@ class BooksGUI:
 
             # Proceed with borrowing logic if all inputs are valid
             try:
-                books_df = self.manager.get_data()
-                book_row = books_df[(books_df["title"] == book_title) & (books_df["author"] == book_author)]
-                if book_row.empty:
+                # The row is read and written back under the DataManager's lock, so a background
+                # save never sees half of it. Only this book's row is read, also from a database
+                copy_id = None
+                with self.manager.lock:
+                    row = self.manager.get_book_row(book_title, book_author)
+                    waiting = row is not None and row["available"] <= 0
+                    if waiting:
+                        waiting_list = row["waiting_list"]
+                        if isinstance(waiting_list, str):
+                            waiting_list = ast.literal_eval(waiting_list)  # במקרה של מחרוזת, נפרש אותה כערך ליטרלי
+                        row["waiting_list"] = list(waiting_list) + [{"name": name, "phone": phone, "email": email}]
+                        self.manager.update_book_row(row)
+                        self.manager.mark_dirty()
+                    elif row is not None:
+                        # Borrow the first available copy; 'available' and the popularity score follow
+                        loan_code = row["is_loaned"]
+                        copy_id = find_copy(loan_code, loaned=False)
+                        if copy_id is not None:
+                            row["is_loaned"] = with_copy_state(loan_code, copy_id, loaned=True)
+                            row["borrow_count"] += 1
+                            self.manager.update_book_row(row)
+                            self.manager.mark_dirty()
+
+                if row is None:
                     messagebox.showerror("Error", f"Book '{book_title}' by {book_author} not found in the library.")
                     log_error(f"Borrow book failed: Book '{book_title}' not found.")
                     return
 
-                row_index = book_row.index[0]
-
                 # Check if there are available copies
-                if books_df.at[row_index, "available"] <= 0:
+                if waiting:
+                    self.refresh_tree()
                     messagebox.showinfo("Waiting List",
                                         f"No copies available for '{book_title}'. You have been added to the waiting list.")
-                    waiting_list = eval(books_df.at[row_index, "waiting_list"])
-                    waiting_list.append({"name": name, "phone": phone, "email": email})
-                    books_df.at[row_index, "waiting_list"] = str(waiting_list)
-                    self.manager.initialize_data(books_df)
-                    self.refresh_tree()
                     log_info(f"User '{name}' added to waiting list for book '{book_title}'.")
                     user_window.destroy()
                     return
 
-                # Update available copies and borrow the book
-                is_loaned_dict = eval(books_df.at[row_index, "is_loaned"])
-                for copy_id, status in is_loaned_dict.items():
-                    if status == "no":
-                        is_loaned_dict[copy_id] = "yes"
-                        books_df.at[row_index, "is_loaned"] = str(is_loaned_dict)
-                        books_df.at[row_index, "available"] -= 1
-                        books_df.at[row_index, "borrow_count"] += 1
-                        books_df.at[row_index, "popularity_score"] += 1
-                        self.manager.initialize_data(books_df)
-                        self.refresh_tree()
-                        messagebox.showinfo("Success",
-                                            f"Book '{book_title}' (Copy ID: {copy_id}) borrowed successfully!")
-                        log_info(
-                            f"Book '{book_title}' (Copy ID: {copy_id}) borrowed by user '{name}', phone: {phone}, email: {email}.")
-                        user_window.destroy()
-                        return
+                if copy_id is not None:
+                    self.refresh_tree()
+                    messagebox.showinfo("Success",
+                                        f"Book '{book_title}' (Copy ID: {copy_id}) borrowed successfully!")
+                    log_info(
+                        f"Book '{book_title}' (Copy ID: {copy_id}) borrowed by user '{name}', phone: {phone}, email: {email}.")
+                    user_window.destroy()
+                    return
 
             except Exception as e:
                 log_error(f"Borrow book failed for '{book_title}'. Error: {e}")
@@ -314,47 +327,46 @@ class BooksGUI:
         book_author = self.tree.item(selected_item, "values")[2]  # מחבר הספר
 
         try:
-            # קבלת נתוני הספרים
-            books_df = self.manager.get_data()
-            book_row = books_df[(books_df["title"] == book_title) & (books_df["author"] == book_author)]
-            if book_row.empty:
-                messagebox.showerror("Error", f"Book '{book_title}' by {book_author} not found.")
-                log_error(f"Return book failed: Book '{book_title}' not found.")
-                return
-
-            row_index = book_row.index[0]
-
-            # טיפול בעמודת is_loaned (נניח שהיא כבר במבנה מילון)
-            is_loaned_dict = books_df.at[row_index, "is_loaned"]  # הערך כבר במבנה מילון
-            if isinstance(is_loaned_dict, str):
-                is_loaned_dict = eval(is_loaned_dict)  # במקרה של מחרוזת, נבצע eval (בדיקת ביטחון בלבד)
-
-            for copy_id, status in is_loaned_dict.items():
-                if status == "yes":  # מציאת עותק מושאל
-                    is_loaned_dict[copy_id] = "no"  # סימון העותק כפנוי
-                    books_df.at[row_index, "is_loaned"] = is_loaned_dict
-
-                    # עדכון עותקים זמינים
-                    books_df.at[row_index, "available"] += 1
+            # The row is changed under the DataManager's lock, so a background save never sees half of it
+            copy_id, next_user = None, None
+            with self.manager.lock:
+                # קריאת שורת הספר בלבד
+                row = self.manager.get_book_row(book_title, book_author)
+                if row is not None:
+                    # טיפול בעמודת is_loaned (מחרוזת מצב ההשאלה, למשל "YYN")
+                    loan_code = row["is_loaned"]
+                    copy_id = find_copy(loan_code, loaned=True)  # מציאת העותק המושאל הראשון
+
+                if copy_id is not None:
+                    row["is_loaned"] = with_copy_state(loan_code, copy_id, loaned=False)  # סימון העותק כפנוי
 
                     # טיפול ברשימת המתנה (אם קיימת)
-                    waiting_list = books_df.at[row_index, "waiting_list"]
+                    waiting_list = row["waiting_list"]
                     if isinstance(waiting_list, str):
-                        waiting_list = eval(waiting_list)  # במקרה של מחרוזת, נבצע eval
-
+                        waiting_list = ast.literal_eval(waiting_list)  # במקרה של מחרוזת, נפרש אותה כערך ליטרלי
                     if waiting_list:
-                        next_user = waiting_list.pop(0)
-                        books_df.at[row_index, "waiting_list"] = waiting_list
-                        messagebox.showinfo("Waiting List",
-                                            f"The book is now available for the next user in the waiting list: {next_user}.")
-                        log_info(f"User {next_user} notified for book '{book_title}'.")
-
-                    # שמירת הנתונים ועדכון תצוגה
-                    self.manager.initialize_data(books_df)
-                    self.refresh_tree()
-                    messagebox.showinfo("Success", f"Book '{book_title}' (Copy ID: {copy_id}) returned successfully!")
-                    log_info(f"Book '{book_title}' returned successfully. Copy ID: {copy_id}.")
-                    return
+                        next_user = waiting_list[0]
+                        row["waiting_list"] = list(waiting_list[1:])
+
+                    # שמירת הנתונים; העותקים הזמינים מחושבים מחדש
+                    self.manager.update_book_row(row)
+                    self.manager.mark_dirty()
+
+            if row is None:
+                messagebox.showerror("Error", f"Book '{book_title}' by {book_author} not found.")
+                log_error(f"Return book failed: Book '{book_title}' not found.")
+                return
+
+            if copy_id is not None:
+                # עדכון תצוגה
+                self.refresh_tree()
+                if next_user is not None:
+                    messagebox.showinfo("Waiting List",
+                                        f"The book is now available for the next user in the waiting list: {next_user}.")
+                    log_info(f"User {next_user} notified for book '{book_title}'.")
+                messagebox.showinfo("Success", f"Book '{book_title}' (Copy ID: {copy_id}) returned successfully!")
+                log_info(f"Book '{book_title}' returned successfully. Copy ID: {copy_id}.")
+                return
 
             # אם אין עותקים מושאלים
             messagebox.showerror("Error", f"All copies of '{book_title}' are already available.")
@@ -381,7 +393,7 @@ class BooksGUI:
         search_type_var = tk.StringVar(value="name")  # ברירת מחדל: חיפוש לפי שם
         tk.Label(search_window, text="Select search type:").pack(pady=5)
         search_type_dropdown = ttk.Combobox(search_window, textvariable=search_type_var)
-        search_type_dropdown['values'] = ["name", "author", "genre", "year"]
+        search_type_dropdown['values'] = ["name", "author", "genre", "year", "keywords"]
         search_type_dropdown.pack(pady=5)
 
         # טבלה להצגת תוצאות החיפוש
@@ -422,6 +434,8 @@ class BooksGUI:
                 strategy = SearchByGenre()
             elif search_type == "year":
                 strategy = SearchByYear()
+            elif search_type == "keywords":
+                strategy = SearchByKeywords()
             else:
                 messagebox.showerror("Error", f"Invalid search type: {search_type}")
                 return
@@ -462,8 +476,7 @@ class BooksGUI:
         Save the current data to the CSV file.
         """
         try:
-            books_df = self.manager.get_data()
-            books_df.to_csv(self.csv_file, index=False)
+            save_books_to_file(self.csv_file)
             messagebox.showinfo("Success", "Library data saved to CSV successfully!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save data: {e}")
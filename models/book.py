@@ -1,23 +1,68 @@
-class Book:
-    def __init__(self, title, author, genre, year, copies, is_loaned_status="no"):
-        self.title = title
-        self.author = author
-        self.genre = genre
-        self.year = year
-        self.copies = copies
+from collections.abc import Mapping, MutableMapping
+from models.waiting_list import WaitingList
 
-        # Initialize the is_loaned dictionary for all copies
-        self.is_loaned = {i + 1: is_loaned_status for i in range(copies)}
 
-        # Calculate borrow_count based on initial is_loaned_status
-        self.borrow_count = sum(1 for status in self.is_loaned.values() if status == "yes")
+class LoanStatusView(MutableMapping):
+    """
+    A live {copy_id: "yes"/"no"} view of a book's per-copy loan state.
 
-        # Calculate the available copies based on is_loaned
-        self.available = sum(1 for status in self.is_loaned.values() if status == "no")
+    It behaves like the dictionary Book.is_loaned used to be: it can be read,
+    iterated, compared with a dict and assigned per copy, and every assignment
+    goes straight to the book's loan state and loaned-copy counter.
+    """
 
-        # Initialize the waiting list and popularity score
-        self.waiting_list = []
-        self.popularity_score = self.borrow_count + len(self.waiting_list)
+    __slots__ = ("_book",)
+
+    def __init__(self, book):
+        self._book = book
+
+    def __getitem__(self, copy_id):
+        if not 1 <= copy_id <= self._book.copies:
+            raise KeyError(copy_id)
+        return "yes" if self._book._is_copy_loaned(copy_id) else "no"
+
+    def __setitem__(self, copy_id, status):
+        if not 1 <= copy_id <= self._book.copies:
+            raise KeyError(copy_id)
+        self._book._set_loaned(copy_id, status == "yes")
+
+    def __delitem__(self, copy_id):
+        raise TypeError("Copies cannot be deleted from is_loaned; change 'copies' instead.")
+
+    def __iter__(self):
+        return iter(range(1, self._book.copies + 1))
+
+    def __len__(self):
+        return self._book.copies
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class BaseBook:
+    """
+    Behaviour shared by Book and by views over a row of a catalog store.
+
+    Subclasses provide the storage: 'copies', 'available', 'borrow_count',
+    'waiting_list', 'popularity_score', first_free_copy, first_loaned_copy,
+    _is_copy_loaned, _set_loaned and _replace_loan_state.
+    """
+
+    __slots__ = ()
+
+    @property
+    def is_loaned(self):
+        """
+        The loan state as a live {copy_id: "yes"/"no"} mapping.
+        """
+        return LoanStatusView(self)
+
+    @is_loaned.setter
+    def is_loaned(self, is_loaned: Mapping):
+        """
+        Replace the loan state from a {copy_id: "yes"/"no"} mapping. Copy IDs outside 1..copies are ignored.
+        """
+        self._replace_loan_state(is_loaned)
 
     def borrow(self, user_id: str):
         """
@@ -26,12 +71,12 @@ class Book:
         Args:
             user_id (str): The ID of the user borrowing the book.
         """
-        for copy_id, status in self.is_loaned.items():
-            if status == "no":
-                self.is_loaned[copy_id] = "yes"
-                self.borrow_count += 1
-                self.popularity_score = self.borrow_count + len(self.waiting_list)
-                return f"Copy {copy_id} loaned successfully."
+        copy_id = self.first_free_copy()
+        if copy_id is not None:
+            self._set_loaned(copy_id, True)
+            self.borrow_count += 1
+            self.popularity_score = self.borrow_count + len(self.waiting_list)
+            return f"Copy {copy_id} loaned successfully."
 
         self.waiting_list.append(user_id)
         self.popularity_score = self.borrow_count + len(self.waiting_list)
@@ -44,8 +89,8 @@ class Book:
         Args:
             copy_id (int): The ID of the copy being returned.
         """
-        if self.is_loaned.get(copy_id) == "yes":
-            self.is_loaned[copy_id] = "no"
+        if 1 <= copy_id <= self.copies and self._is_copy_loaned(copy_id):
+            self._set_loaned(copy_id, False)
             return f"Copy {copy_id} returned successfully."
 
         return f"Copy {copy_id} was not loaned."
@@ -61,11 +106,120 @@ class Book:
             "year": self.year,
             "copies": self.copies,
             "borrow_count": self.borrow_count,
-            "is_loaned": self.is_loaned,
-            "waiting_list": self.waiting_list,
+            "is_loaned": dict(self.is_loaned.items()),
+            "waiting_list": self.waiting_list.to_list(),
             "popularity_score": self.popularity_score,
         }
 
+    def __str__(self):
+        return (f"Title: {self.title}, Author: {self.author}, Copies: {self.copies}, "
+                f"Available: {self.available}, Loaned: {self.is_loaned}, Genre: {self.genre}, Year: {self.year}")
+
+
+class Book(BaseBook):
+    """
+    A book with a number of copies, each either loaned or available.
+
+    The loan state of all copies is kept as one integer bitmask (bit i set means
+    copy i + 1 is loaned) together with a count of loaned copies, so 'available'
+    is O(1). 'is_loaned' still exposes the state as a {copy_id: "yes"/"no"} mapping.
+    """
+
+    __slots__ = ("title", "author", "genre", "year", "_copies", "_loaned", "_loaned_count",
+                 "borrow_count", "_waiting_list", "popularity_score")
+
+    def __init__(self, title, author, genre, year, copies, is_loaned_status="no"):
+        self.title = title
+        self.author = author
+        self.genre = genre
+        self.year = year
+        self._copies = copies
+
+        # Initialize the loan state of all copies
+        self._loaned = (1 << copies) - 1 if is_loaned_status == "yes" else 0
+        self._loaned_count = copies if is_loaned_status == "yes" else 0
+
+        # Calculate borrow_count based on initial is_loaned_status
+        self.borrow_count = self._loaned_count
+
+        # Initialize the waiting list and popularity score
+        self.waiting_list = []
+        self.popularity_score = self.borrow_count + len(self.waiting_list)
+
+    @property
+    def copies(self):
+        return self._copies
+
+    @copies.setter
+    def copies(self, copies):
+        """
+        Change the number of copies. New copies are available; state of removed copies is dropped.
+        """
+        self._copies = copies
+        self._loaned &= (1 << copies) - 1
+        self._loaned_count = self._loaned.bit_count()
+
+    @property
+    def waiting_list(self):
+        """
+        The users waiting for a copy, as a WaitingList.
+        """
+        return self._waiting_list
+
+    @waiting_list.setter
+    def waiting_list(self, waiting_list):
+        """
+        Replace the waiting list. Lists are wrapped in a WaitingList.
+        """
+        self._waiting_list = waiting_list if isinstance(waiting_list, WaitingList) else WaitingList(waiting_list)
+
+    @property
+    def available(self):
+        """
+        The number of available copies.
+        """
+        return self._copies - self._loaned_count
+
+    def _replace_loan_state(self, is_loaned: Mapping):
+        mask = 0
+        for copy_id, status in is_loaned.items():
+            if status == "yes" and 1 <= int(copy_id) <= self._copies:
+                mask |= 1 << (int(copy_id) - 1)
+        self._loaned = mask
+        self._loaned_count = mask.bit_count()
+
+    def first_free_copy(self):
+        """
+        Find the lowest available copy with a find-first-set on the inverted bitmask.
+
+        Returns:
+            int: The ID of the copy, or None if every copy is loaned.
+        """
+        free = ~self._loaned & ((1 << self._copies) - 1)
+        return (free & -free).bit_length() if free else None
+
+    def first_loaned_copy(self):
+        """
+        Find the lowest loaned copy with a find-first-set on the bitmask.
+
+        Returns:
+            int: The ID of the copy, or None if no copy is loaned.
+        """
+        return (self._loaned & -self._loaned).bit_length() if self._loaned else None
+
+    def _is_copy_loaned(self, copy_id: int) -> bool:
+        return bool(self._loaned >> (copy_id - 1) & 1)
+
+    def _set_loaned(self, copy_id: int, loaned: bool):
+        """
+        Set the loan state of one copy and keep the loaned-copy counter in step.
+        """
+        bit = 1 << (copy_id - 1)
+        if bool(self._loaned & bit) == loaned:
+            return
+        self._loaned ^= bit
+        self._loaned_count += 1 if loaned else -1
+
     @classmethod
     def from_dict(cls, data: dict):
         """
@@ -83,9 +237,6 @@ class Book:
         book.waiting_list = data["waiting_list"]
         book.popularity_score = data["popularity_score"]
         return book
-    def __str__(self):
-        return (f"Title: {self.title}, Author: {self.author}, Copies: {self.copies}, "
-                f"Available: {self.available}, Loaned: {self.is_loaned}, Genre: {self.genre}, Year: {self.year}")
 
 #FIXME לבדוק האם הפונקציות קיימות במקומות אחרים- זה לא המקום שלהם
 ##################################################################################
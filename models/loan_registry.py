@@ -0,0 +1,163 @@
+import csv
+import os
+import threading
+
+
+class LoanRegistry:
+    """
+    Who holds which copy, indexed both ways.
+
+    A loan is a (title, author, copy_id) held by a user. The holder of a copy
+    and the copies a user holds of one book are dictionary lookups, and a
+    user's current loans are listed without looking at any other user or book,
+    so none of these depend on the size of the catalog.
+    """
+
+    __slots__ = ("_holders", "_loans", "_lock")
+
+    FIELDS = ["user_id", "title", "author", "copy_id"]
+
+    def __init__(self):
+        self._holders = {}  # (title, author, copy_id) -> user_id
+        self._loans = {}    # user_id -> {(title, author): [copy_id, ...]}
+        # Loans of different books may be recorded from different threads
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def path_for(catalog_path: str) -> str:
+        """
+        Returns the registry path that belongs to a catalog file.
+        """
+        return f"{catalog_path}.loans"
+
+    def record(self, user_id, title: str, author: str, copy_id: int):
+        """
+        Records that a user borrowed a copy.
+
+        Args:
+            user_id: The ID of the user.
+            title (str): The title of the book.
+            author (str): The author of the book.
+            copy_id (int): The ID of the copy.
+        """
+        with self._lock:
+            previous = self._holders.get((title, author, copy_id))
+            if previous is not None:
+                self._forget(previous, title, author, copy_id)
+            self._holders[(title, author, copy_id)] = user_id
+            self._loans.setdefault(user_id, {}).setdefault((title, author), []).append(copy_id)
+
+    def release(self, title: str, author: str, copy_id: int):
+        """
+        Records that a copy was returned.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            copy_id (int): The ID of the copy.
+
+        Returns:
+            The ID of the user who held the copy, or None if nobody was recorded.
+        """
+        with self._lock:
+            user_id = self._holders.pop((title, author, copy_id), None)
+            if user_id is not None:
+                self._forget(user_id, title, author, copy_id)
+            return user_id
+
+    def retain(self, is_loaned) -> int:
+        """
+        Drops the loans of copies that are no longer loaned.
+
+        Args:
+            is_loaned (callable): Check (title, author, copy_id) -> bool.
+
+        Returns:
+            int: The number of loans dropped.
+        """
+        stale = [key for key in list(self._holders) if not is_loaned(*key)]
+        for title, author, copy_id in stale:
+            self.release(title, author, copy_id)
+        return len(stale)
+
+    def _forget(self, user_id, title, author, copy_id):
+        books = self._loans[user_id]
+        copies = books[(title, author)]
+        copies.remove(copy_id)
+        if not copies:
+            del books[(title, author)]
+            if not books:
+                del self._loans[user_id]
+
+    def holder_of(self, title: str, author: str, copy_id: int):
+        """
+        Returns the ID of the user holding a copy, or None.
+        """
+        return self._holders.get((title, author, copy_id))
+
+    def copy_held_by(self, user_id, title: str, author: str):
+        """
+        Returns the copy of a book a user borrowed first, or None if the user holds none.
+        """
+        copies = self._loans.get(user_id, {}).get((title, author))
+        return copies[0] if copies else None
+
+    def loans_of(self, user_id) -> list:
+        """
+        Returns a user's current loans.
+
+        Args:
+            user_id: The ID of the user.
+
+        Returns:
+            list: (title, author, copy_id) tuples.
+        """
+        with self._lock:
+            return [(title, author, copy_id)
+                    for (title, author), copies in self._loans.get(user_id, {}).items()
+                    for copy_id in copies]
+
+    def __len__(self):
+        return len(self._holders)
+
+    def save(self, file_path: str):
+        """
+        Writes the registry to a CSV file, replacing it atomically. Nothing is
+        written for an empty registry that has no file yet.
+
+        Args:
+            file_path (str): Path to the registry file.
+        """
+        with self._lock:
+            rows = [(user_id, title, author, copy_id) for (title, author, copy_id), user_id in self._holders.items()]
+        if not rows and not os.path.exists(file_path):
+            return
+        temporary_path = f"{file_path}.tmp"
+        with open(temporary_path, "w", newline="", encoding="utf-8") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(self.FIELDS)
+            writer.writerows(rows)
+        os.replace(temporary_path, file_path)
+
+    @classmethod
+    def load(cls, file_path: str, is_loaned=None):
+        """
+        Reads a registry written by save. A missing file gives an empty registry.
+
+        Args:
+            file_path (str): Path to the registry file.
+            is_loaned (callable): Optional check (title, author, copy_id) -> bool. Loans
+                of copies that are no longer loaned in the catalog are dropped.
+
+        Returns:
+            LoanRegistry: The registry.
+        """
+        registry = cls()
+        if not os.path.exists(file_path):
+            return registry
+        with open(file_path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                copy_id = int(row["copy_id"])
+                if is_loaned is None or is_loaned(row["title"], row["author"], copy_id):
+                    registry.record(row["user_id"], row["title"], row["author"], copy_id)
+        return registry
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+
+class SearchCache:
+    """
+    A bounded least-recently-used cache of search results.
+
+    Entries are keyed by the strategy, the criteria and the catalog version
+    they were computed at. Every catalog mutation bumps the version, so an
+    entry of an older catalog is never found again; it only waits to be
+    evicted. Counters of hits, misses and evictions show how well the cache
+    serves the repeated queries.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize (int): The number of results to keep. 0 disables the cache.
+        """
+        self.maxsize = max(int(maxsize), 0)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Returns the result cached under a key and marks it as recently used,
+        or None if there is none.
+        """
+        with self._lock:
+            result = self.entries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """
+        Caches a result, evicting the least recently used ones beyond maxsize.
+        """
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self.entries[key] = result
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every cached result. The counters are kept.
+        """
+        with self._lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters and the number of cached results.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "size": len(self.entries)}
@@ -0,0 +1,202 @@
+import bisect
+import re
+import threading
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text) -> list:
+    """
+    Splits a text into normalized tokens: case-folded runs of letters and digits.
+
+    Args:
+        text: The text. Values that are not strings are converted first.
+
+    Returns:
+        list: The tokens, in order.
+    """
+    if text is None or text != text:  # None or NaN
+        return []
+    return _TOKEN.findall(str(text).casefold())
+
+
+class SearchIndex:
+    """
+    An inverted index from normalized tokens to book IDs, per searchable field.
+
+    Every book gets an ID when it is added; the posting list of a token is the
+    set of IDs of the books whose field contains it. A query is answered by
+    intersecting the posting lists of its tokens, so it costs time in the
+    number of matches instead of the size of the catalog. Every query token
+    matches as a prefix ("prog" finds "Programming"), through a sorted
+    vocabulary per field, so results can be shown while a word is typed.
+
+    Books are added and removed one at a time as the catalog changes, without
+    rebuilding the index.
+    """
+
+    FIELDS = ("title", "author", "genre")
+
+    # Vocabulary words of a query token whose posting lists are sampled to estimate its matches
+    SAMPLED_WORDS = 1024
+    # Vocabulary words of a query token up to which candidates are filtered by posting lists
+    MAX_MEMBERSHIP_WORDS = 8
+
+    def __init__(self):
+        self.keys = []       # book ID -> (title, author), None once removed
+        self.ids = {}        # (title, author) -> book ID
+        self.values = []     # book ID -> the indexed field values
+        self.postings = {field: {} for field in self.FIELDS}     # field -> token -> set of IDs
+        self.vocabulary = {field: [] for field in self.FIELDS}   # field -> sorted tokens
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, books_df):
+        """
+        Builds an index of the books in a DataFrame.
+
+        Args:
+            books_df (pd.DataFrame): The books, with title, author and genre columns.
+
+        Returns:
+            SearchIndex: The index.
+        """
+        index = cls()
+        if books_df is None or len(books_df) == 0:
+            return index
+        columns = [books_df[field].tolist() if field in books_df.columns else [None] * len(books_df)
+                   for field in cls.FIELDS]
+        for values in zip(*columns):
+            index._add(values)
+        for field in cls.FIELDS:
+            index.vocabulary[field] = sorted(index.postings[field])
+        return index
+
+    def _add(self, values, keep_sorted=False):
+        key = (values[0], values[1])
+        if key in self.ids:
+            self._remove(key)
+        book_id = len(self.keys)
+        self.keys.append(key)
+        self.values.append(values)
+        self.ids[key] = book_id
+        for field, value in zip(self.FIELDS, values):
+            postings = self.postings[field]
+            for token in tokenize(value):
+                ids = postings.get(token)
+                if ids is None:
+                    ids = postings[token] = set()
+                    if keep_sorted:
+                        bisect.insort(self.vocabulary[field], token)
+                ids.add(book_id)
+
+    def _remove(self, key):
+        book_id = self.ids.pop(key, None)
+        if book_id is None:
+            return False
+        for field, value in zip(self.FIELDS, self.values[book_id]):
+            postings = self.postings[field]
+            for token in tokenize(value):
+                ids = postings.get(token)
+                if ids is None:
+                    continue
+                ids.discard(book_id)
+                if not ids:
+                    del postings[token]
+                    vocabulary = self.vocabulary[field]
+                    position = bisect.bisect_left(vocabulary, token)
+                    # While from_frame is adding books the vocabulary is not built yet
+                    if position < len(vocabulary) and vocabulary[position] == token:
+                        del vocabulary[position]
+        self.keys[book_id] = None
+        self.values[book_id] = None
+        return True
+
+    def add(self, title: str, author: str, genre: str = None):
+        """
+        Indexes a book. A book that is already indexed is indexed again.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            genre (str): The genre of the book.
+        """
+        with self._lock:
+            self._add((title, author, genre), keep_sorted=True)
+
+    def remove(self, title: str, author: str) -> bool:
+        """
+        Removes a book from the index.
+
+        Returns:
+            bool: True if the book was indexed, False otherwise.
+        """
+        with self._lock:
+            return self._remove((title, author))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _words(self, field, token):
+        """
+        Returns the vocabulary words of a field that start with 'token'.
+        """
+        vocabulary = self.vocabulary[field]
+        start = bisect.bisect_left(vocabulary, token)
+        end = bisect.bisect_left(vocabulary, token + "\U0010ffff", start)
+        return vocabulary[start:end]
+
+    def _cost(self, words):
+        """
+        Estimates the size of the union of the posting lists of (field, word) pairs,
+        extrapolating from a sample if there are many.
+        """
+        sample = words[:self.SAMPLED_WORDS]
+        return sum(len(self.postings[field][word]) for field, word in sample) * len(words) / len(sample)
+
+    def _matches_token(self, book_id, fields, token):
+        values = self.values[book_id]
+        return any(word.startswith(token)
+                   for field in fields
+                   for word in tokenize(values[self.FIELDS.index(field)]))
+
+    def search(self, query: str, fields=None) -> list:
+        """
+        Finds the books that match every token of a query in one of the given fields.
+
+        The token with the smallest posting lists gives the candidates. Every
+        other token then only filters them, through its posting lists if they
+        are few, else by checking the candidates' own words, so a short prefix
+        such as "a" next to a rarer word does not union a large part of the catalog.
+
+        Args:
+            query (str): The query, e.g. "pragmatic prog".
+            fields (iterable): Fields to match in. Defaults to all indexed fields.
+
+        Returns:
+            list: (title, author) keys of the matching books, in the order they were added.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        fields = tuple(fields) if fields else self.FIELDS
+        with self._lock:
+            terms = []
+            for token in tokens:
+                words = [(field, word) for field in fields for word in self._words(field, token)]
+                if not words:
+                    return []
+                terms.append((self._cost(words), token, words))
+            terms.sort(key=lambda term: term[0])
+
+            _, _, words = terms[0]
+            matches = set().union(*(self.postings[field][word] for field, word in words))
+            for _, token, words in terms[1:]:
+                if not matches:
+                    break
+                if len(words) <= self.MAX_MEMBERSHIP_WORDS:
+                    lists = [self.postings[field][word] for field, word in words]
+                    matches = {book_id for book_id in matches if any(book_id in ids for ids in lists)}
+                else:
+                    matches = {book_id for book_id in matches if self._matches_token(book_id, fields, token)}
+            return [self.keys[book_id] for book_id in sorted(matches)]
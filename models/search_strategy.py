@@ -1,5 +1,11 @@
+import re
+import weakref
 import pandas as pd
 from abc import ABC, abstractmethod
+from data.books import DataManager
+from models.search_cache import SearchCache
+from models.search_index import SearchIndex
+from models.trigram_index import TrigramIndex, is_literal, is_plain
 
 # Abstract base class for search strategy
 class SearchStrategy(ABC):
@@ -15,6 +21,14 @@ class SearchStrategy(ABC):
         """
         pass
 
+    def cache_key(self):
+        """
+        Returns what identifies the results of this strategy for a criteria, or
+        None if they must not be cached. Strategies with settings that change
+        their results include them.
+        """
+        return type(self).__name__
+
 
 class SearchByName(SearchStrategy):
     def search(self, books_df, criteria):
@@ -69,17 +83,161 @@ class SearchByYearRange(SearchStrategy):
             return pd.DataFrame()
 
 
+class SearchByKeywords(SearchStrategy):
+    """
+    Token search through an inverted index instead of scanning the columns.
+    Every word of the criteria must start a word of the title, author or genre,
+    e.g. "pragmatic prog", and the matching rows are returned in catalog order.
+    """
+
+    def __init__(self, fields=None, index=None):
+        """
+        Args:
+            fields (iterable): Fields to match in. Defaults to title, author and genre.
+            index (SearchIndex): The index to use. Defaults to the DataManager's index
+                when searching its catalog, otherwise an index of the given DataFrame.
+        """
+        self.fields = fields
+        self.index = index
+
+    def cache_key(self):
+        if self.index is not None:
+            # A separate index does not follow the catalog version
+            return None
+        return type(self).__name__, tuple(self.fields) if self.fields else None
+
+    def search(self, books_df, criteria):
+        data_manager = DataManager.get_instance()
+        catalog = books_df is data_manager.get_data()
+        if self.index is not None:
+            index = self.index
+        elif catalog:
+            index = data_manager.get_search_index()
+        else:
+            index = SearchIndex.from_frame(books_df)
+
+        keys = index.search(criteria, self.fields)
+        if catalog:
+            positions = (data_manager.get_row_position(title, author) for title, author in keys)
+            return books_df.iloc[sorted(position for position in positions if position is not None)]
+        matches = pd.MultiIndex.from_arrays([books_df["title"], books_df["author"]]).isin(keys)
+        return books_df[matches]
+
+class SearchByTrigrams(SearchStrategy):
+    """
+    Substring search through a trigram index. Returns the same rows as the
+    column scan of SearchByName (column "title"), SearchByAuthor ("author") or
+    SearchByGenre ("genre"), so it can replace them: "gats" still finds
+    "The Great Gatsby". Only the rows whose trigrams all match are checked.
+    Criteria the index cannot narrow down, such as regular expressions and
+    strings shorter than three characters, are answered by the scan.
+    """
+
+    SCANS = {"title": SearchByName, "author": SearchByAuthor, "genre": SearchByGenre}
+
+    def __init__(self, column="title"):
+        """
+        Args:
+            column (str): The column to search: "title", "author" or "genre".
+        """
+        if column not in self.SCANS:
+            raise ValueError(f"Unsupported search column: {column}")
+        self.column = column
+        self.scan = self.SCANS[column]()
+        # Index of the last DataFrame searched that is not the DataManager's catalog
+        self._frame = None
+        self._frame_index = None
+
+    def cache_key(self):
+        return type(self).__name__, self.column
+
+    def _frame_index_for(self, books_df):
+        if self._frame is None or self._frame() is not books_df:
+            self._frame_index = TrigramIndex.from_frame(books_df, columns=(self.column,), keys=range(len(books_df)))
+            self._frame = weakref.ref(books_df)
+        return self._frame_index
+
+    def search(self, books_df, criteria):
+        if not isinstance(criteria, str) or len(criteria) < 3 or not is_literal(criteria) or not is_plain(criteria):
+            return self.scan.search(books_df, criteria)
+
+        matches = re.compile(criteria, re.IGNORECASE).search
+        data_manager = DataManager.get_instance()
+        if books_df is data_manager.get_data():
+            keys = data_manager.get_trigram_index().search(self.column, criteria, matches)
+            positions = (data_manager.get_row_position(title, author) for title, author in keys)
+            return books_df.iloc[sorted(position for position in positions if position is not None)]
+        positions = self._frame_index_for(books_df).search(self.column, criteria, matches)
+        return books_df.iloc[positions]
+
+
+def _criteria_key(criteria):
+    """
+    Returns a hashable form of search criteria, or None if they have none.
+    """
+    if isinstance(criteria, dict):
+        criteria = tuple(sorted(criteria.items(), key=lambda item: str(item[0])))
+    try:
+        hash(criteria)
+    except TypeError:
+        return None
+    return type(criteria).__name__, criteria
+
 
 # Manager class for handling different search strategies
 class SearchManager:
-    def __init__(self, strategy: SearchStrategy):
+    # Results of searches of the DataManager's catalog, shared by all managers
+    cache = SearchCache()
+
+    def __init__(self, strategy: SearchStrategy, cache: SearchCache = None):
+        """
+        Args:
+            strategy (SearchStrategy): The search strategy.
+            cache (SearchCache): The result cache to use. Defaults to the shared one.
+        """
         self.strategy = strategy
+        if cache is not None:
+            self.cache = cache
 
     def set_strategy(self, strategy: SearchStrategy):
         self.strategy = strategy
 
     def search(self, books_df, criteria):
-        return self.strategy.search(books_df, criteria)
+        """
+        Searches with the current strategy. Results of searches of the
+        DataManager's catalog are cached under the strategy, the criteria and
+        the catalog version, so a repeated query is answered without searching
+        until the catalog changes.
+
+        Args:
+            books_df (pd.DataFrame): The books DataFrame.
+            criteria: The search criteria, as expected by the strategy.
+
+        Returns:
+            pd.DataFrame: The matching books.
+        """
+        data_manager = DataManager.get_instance()
+        if books_df is None or books_df is not data_manager.get_data():
+            return self.strategy.search(books_df, criteria)
+        strategy_key = self.strategy.cache_key()
+        criteria_key = _criteria_key(criteria)
+        if strategy_key is None or criteria_key is None:
+            return self.strategy.search(books_df, criteria)
+
+        # The version is read first, so a result computed while the catalog changes is never served
+        key = (strategy_key, criteria_key, data_manager.version)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.strategy.search(books_df, criteria)
+            self.cache.put(key, result)
+        # Callers get their own copy-on-write view, so changing it leaves the cached result intact
+        return result.copy(deep=False)
+
+    def cache_stats(self) -> dict:
+        """
+        Returns the hit, miss and eviction counters of the result cache.
+        """
+        return self.cache.stats()
 
     def search_multiple(self, books_df, **kwargs):
         """
@@ -0,0 +1,237 @@
+import threading
+from array import array
+import numpy as np
+
+# Characters with a special meaning in the regular expressions str.contains uses
+_REGEX_CHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+def trigrams(text: str) -> set:
+    """
+    Returns the distinct lower-case three-character substrings of a text.
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def is_plain(text: str) -> bool:
+    """
+    Returns True if lower-casing a text keeps every character aligned and agrees
+    with case folding, so its trigrams can be compared with those of other texts.
+    """
+    return len(text.lower()) == len(text) and text.lower() == text.casefold()
+
+
+def is_literal(pattern: str) -> bool:
+    """
+    Returns True if a search pattern has no regular expression syntax.
+    """
+    return not _REGEX_CHARACTERS.intersection(pattern)
+
+
+class TrigramIndex:
+    """
+    A trigram index over text columns that narrows down substring searches.
+
+    The posting list of a trigram holds the IDs of the books whose column
+    contains it, as a compact array of increasing integers. A query's
+    candidates are the intersection of the posting lists of its trigrams; only
+    those candidates are then checked against the query exactly, so results
+    are the same as a scan's. Books are indexed under any hashable key.
+
+    Books are added and removed one at a time without rebuilding the index.
+    Removed books are only marked; their IDs stay in the posting lists and are
+    skipped. Values whose characters change length or meaning when lower-cased
+    cannot be matched by trigram and are always checked exactly.
+    """
+
+    def __init__(self, columns=("title", "author", "genre")):
+        """
+        Args:
+            columns (tuple): The indexed columns.
+        """
+        self.columns = tuple(columns)
+        self.keys = []       # book ID -> key, None once removed
+        self.ids = {}        # key -> book ID
+        self.values = []     # book ID -> column values
+        self.postings = {column: {} for column in self.columns}     # column -> trigram -> IDs
+        self.unplain = {column: array("q") for column in self.columns}  # column -> IDs always checked
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, books_df, columns=("title", "author", "genre"), keys=None):
+        """
+        Builds an index of the rows of a DataFrame.
+
+        Args:
+            books_df (pd.DataFrame): The books.
+            columns (tuple): The columns to index. Missing columns are indexed as empty.
+            keys (iterable): One key per row. Defaults to the (title, author) pairs.
+
+        Returns:
+            TrigramIndex: The index.
+        """
+        index = cls(columns)
+        if books_df is None or len(books_df) == 0:
+            return index
+        if keys is None:
+            keys = zip(books_df["title"].tolist(), books_df["author"].tolist())
+        index.keys = list(keys)
+        for book_id, key in enumerate(index.keys):
+            previous = index.ids.get(key)
+            if previous is not None:
+                index.keys[previous] = None
+            index.ids[key] = book_id
+        values = [books_df[column].tolist() if column in books_df.columns else [None] * len(books_df)
+                  for column in index.columns]
+        index.values = list(zip(*values))
+        for book_id, key in enumerate(index.keys):
+            if key is None:
+                index.values[book_id] = None
+        for column, column_values in zip(index.columns, values):
+            index._index_column(column, column_values)
+        return index
+
+    def _index_column(self, column, column_values):
+        """
+        Builds the posting lists of a column in bulk. The column is joined into
+        one string whose code points give every trigram as a 63-bit integer, so
+        finding, deduplicating and grouping the trigrams are array operations.
+        """
+        texts = []
+        for book_id, value in enumerate(column_values):
+            if isinstance(value, str) and is_plain(value) and "\x00" not in value:
+                texts.append(value)
+            else:
+                if isinstance(value, str):
+                    self.unplain[column].append(book_id)
+                texts.append("")
+        points = np.frombuffer("\x00".join(texts).lower().encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+        if len(points) < 3:
+            return
+
+        codes = points[:-2] << 42 | points[1:-1] << 21 | points[2:]
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), [len(text) + 1 for text in texts])[:len(codes)]
+        # Trigrams that span two values contain the separator
+        inside = (points[:-2] != 0) & (points[1:-1] != 0) & (points[2:] != 0)
+        codes, rows = codes[inside], rows[inside]
+        order = np.argsort(codes, kind="stable")
+        codes, rows = codes[order], rows[order]
+        # A trigram that occurs twice in one value lists the book once
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        codes, rows = codes[first], rows[first]
+        if not len(codes):
+            return
+
+        bounds = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1], [True])))
+        postings = self.postings[column]
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            code = int(codes[start])
+            trigram = chr(code >> 42) + chr(code >> 21 & 0x1FFFFF) + chr(code & 0x1FFFFF)
+            posting = postings[trigram] = array("q")
+            posting.frombytes(rows[start:end].tobytes())
+
+    def _add(self, key, row):
+        if key in self.ids:
+            self._remove(key)
+        book_id = len(self.keys)
+        self.keys.append(key)
+        self.values.append(row)
+        self.ids[key] = book_id
+        for column, value in zip(self.columns, row):
+            if not isinstance(value, str):
+                continue
+            if not is_plain(value):
+                self.unplain[column].append(book_id)
+                continue
+            postings = self.postings[column]
+            for trigram in trigrams(value):
+                ids = postings.get(trigram)
+                if ids is None:
+                    ids = postings[trigram] = array("q")
+                ids.append(book_id)
+
+    def _remove(self, key):
+        book_id = self.ids.pop(key, None)
+        if book_id is None:
+            return False
+        self.keys[book_id] = None
+        self.values[book_id] = None
+        return True
+
+    def add(self, key, row):
+        """
+        Indexes a book. A key that is already indexed is indexed again.
+
+        Args:
+            key: The book's key, e.g. (title, author).
+            row (tuple): The book's values of the indexed columns.
+        """
+        with self._lock:
+            self._add(key, tuple(row))
+
+    def remove(self, key) -> bool:
+        """
+        Removes a book from the index.
+
+        Returns:
+            bool: True if the book was indexed, False otherwise.
+        """
+        with self._lock:
+            return self._remove(key)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def candidates(self, column: str, pattern: str):
+        """
+        Returns the IDs of the books whose column may contain a pattern, or None
+        if the pattern's trigrams cannot narrow the search down.
+        """
+        grams = trigrams(pattern)
+        if not grams or not is_plain(pattern):
+            return None
+        postings = self.postings[column]
+        lists = []
+        for trigram in grams:
+            ids = postings.get(trigram)
+            if ids is None:
+                lists = []
+                break
+            lists.append(np.frombuffer(ids, dtype=np.int64))
+        lists.sort(key=len)
+
+        found = lists[0] if lists else np.empty(0, dtype=np.int64)
+        for ids in lists[1:]:
+            if not len(found):
+                break
+            # Posting lists are sorted, so membership is a binary search
+            positions = np.searchsorted(ids, found)
+            positions[positions == len(ids)] = 0
+            found = found[ids[positions] == found]
+        unplain = np.frombuffer(self.unplain[column], dtype=np.int64)
+        return np.union1d(found, unplain) if len(unplain) else found
+
+    def search(self, column: str, pattern: str, matches) -> list:
+        """
+        Finds the books whose column value satisfies an exact check.
+
+        Args:
+            column (str): The column to search.
+            pattern (str): The substring the value must contain, used to pick candidates.
+            matches (callable): The exact check, value -> bool.
+
+        Returns:
+            list: Keys of the matching books, in the order they were added.
+        """
+        position = self.columns.index(column)
+        with self._lock:
+            found = self.candidates(column, pattern)
+            ids = range(len(self.keys)) if found is None else found.tolist()
+            keys = []
+            for book_id in ids:
+                row = self.values[book_id]
+                if row is not None and isinstance(row[position], str) and matches(row[position]):
+                    keys.append(self.keys[book_id])
+            return keys
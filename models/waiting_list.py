@@ -0,0 +1,145 @@
+from collections import deque
+
+
+class WaitingList:
+    """
+    A first-come, first-served queue of users waiting for a book.
+
+    Enqueue, dequeue, membership tests and cancelling a reservation are all O(1)
+    (amortized). A deque holds the entries in order and a counter tracks who is
+    waiting. Cancelled entries stay in the deque and are skipped when they reach
+    the front; the deque is compacted once they make up most of it.
+
+    Entries are user IDs or, in the GUI, dictionaries with the user's details.
+    The list form (to_list, iteration, repr) is the same as the plain list the
+    waiting list used to be, so the stored column format does not change.
+    """
+
+    __slots__ = ("_queue", "_waiting", "_cancelled", "_size")
+
+    def __init__(self, entries=()):
+        """
+        Initializes the waiting list.
+
+        Args:
+            entries (iterable): Initial entries, first in line first.
+        """
+        self._queue = deque()
+        self._waiting = {}    # key -> number of live entries
+        self._cancelled = {}  # key -> number of cancelled entries still in the deque
+        self._size = 0
+        for entry in entries:
+            self.append(entry)
+
+    @staticmethod
+    def _key(entry):
+        """
+        Returns a hashable key for an entry; dictionaries are keyed by their items.
+        """
+        return tuple(sorted(entry.items())) if isinstance(entry, dict) else entry
+
+    @staticmethod
+    def _decrement(counter, key):
+        if counter[key] == 1:
+            del counter[key]
+        else:
+            counter[key] -= 1
+
+    def append(self, entry):
+        """
+        Adds an entry to the end of the line.
+
+        Args:
+            entry: The user ID (or user details) to enqueue.
+        """
+        key = self._key(entry)
+        self._queue.append(entry)
+        self._waiting[key] = self._waiting.get(key, 0) + 1
+        self._size += 1
+
+    def popleft(self):
+        """
+        Removes and returns the entry at the front of the line.
+
+        Returns:
+            The first entry.
+
+        Raises:
+            IndexError: If the waiting list is empty.
+        """
+        while self._queue:
+            entry = self._queue.popleft()
+            key = self._key(entry)
+            if key in self._cancelled:
+                self._decrement(self._cancelled, key)
+                continue
+            self._decrement(self._waiting, key)
+            self._size -= 1
+            return entry
+        raise IndexError("pop from an empty waiting list")
+
+    def peek(self):
+        """
+        Returns the entry at the front of the line without removing it, or None.
+        """
+        return next(iter(self), None)
+
+    def cancel(self, entry) -> bool:
+        """
+        Cancels the earliest reservation of a user.
+
+        Args:
+            entry: The user ID (or user details) whose reservation is cancelled.
+
+        Returns:
+            bool: True if the user was waiting, False otherwise.
+        """
+        key = self._key(entry)
+        if key not in self._waiting:
+            return False
+        self._decrement(self._waiting, key)
+        self._cancelled[key] = self._cancelled.get(key, 0) + 1
+        self._size -= 1
+        if len(self._queue) > 2 * self._size + 32:
+            self._compact()
+        return True
+
+    def _compact(self):
+        """
+        Drops the cancelled entries from the deque.
+        """
+        self._queue = deque(iter(self))
+        self._cancelled.clear()
+
+    def to_list(self):
+        """
+        Returns the waiting entries as a list, first in line first.
+        """
+        return list(iter(self))
+
+    def __iter__(self):
+        # The earliest entries of a cancelled key are the cancelled ones, as in popleft
+        skip = dict(self._cancelled)
+        for entry in self._queue:
+            if skip:
+                key = self._key(entry)
+                if key in skip:
+                    self._decrement(skip, key)
+                    continue
+            yield entry
+
+    def __contains__(self, entry):
+        return self._key(entry) in self._waiting
+
+    def __len__(self):
+        return self._size
+
+    def __eq__(self, other):
+        if isinstance(other, WaitingList):
+            return self.to_list() == other.to_list()
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.to_list())
@@ -1,51 +1,376 @@
-from data.books import load_books_from_file, save_books_to_file
+import contextlib
+import os
+import threading
+import time
+import pandas as pd
+from data.books import (
+    DataManager,
+    load_books_from_file,
+    row_to_book,
+    persist_book,
+    persist_books,
+    persist_book_removal,
+    checkpoint_books_file,
+)
+from data.barcode_index import BarcodeIndex
+from data.catalog_store import CatalogStore
+from data.journal import BookJournal
+from data.loan_ledger import LoanLedger
+from data.schema import MAX_COPIES
 from models.book import Book
 from models.book_decorator import BookDecorator
+from models.loan_registry import LoanRegistry
 from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByGenre, SearchByYear
 from services.auth_manager import AuthManager
 from services.notification_manager import NotificationManager
+from services.striped_lock import StripedLock
 from logs.actions import log_info, log_error
 from data.users import User
 
+# Holder recorded for loans whose borrower is not known, see _restore_missing_loans
+UNKNOWN_HOLDER = "unknown"
+
 
 class LibraryManager:
     """
     Manages the library's books, borrowing process, and popular books.
     """
 
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, use_journal: bool = False, checkpoint_interval: int = 1000,
+                 write_behind: bool = False, flush_interval_ms: int = 500, columnar: bool = True,
+                 thread_safe: bool = False, lock_stripes: int = 64, loan_days: int = 14):
         """
         Initializes the LibraryManager with books loaded from the specified CSV file.
 
         Args:
             file_path (str): Path to the CSV file.
+            use_journal (bool): If True, mutations are appended to a write-ahead journal
+                instead of rewriting the whole CSV file on every operation.
+            checkpoint_interval (int): Number of journal records after which the journal
+                is folded back into the CSV file.
+            write_behind (bool): If True, mutations only mark the catalog as dirty and a
+                background thread saves the CSV file in batches.
+            flush_interval_ms (int): Maximum delay of a background save in write-behind mode.
+            columnar (bool): If True, the catalog is held in a CatalogStore that backs both
+                the DataManager's DataFrame and the Book objects, which are views over it.
+                If False, every book is a separate Book object.
+            thread_safe (bool): If True, operations may be called from several threads.
+                Operations on the same book are serialized through striped locks keyed by
+                (title, author); adding and removing books holds every stripe.
+            lock_stripes (int): Number of locks in thread-safe mode.
+            loan_days (int): Number of days after which a loaned copy is due.
         """
         self.strategy = SearchByName()
         self.file_path = file_path
         print(f"Initializing LibraryManager with file: {file_path}")
 
-        self.books = load_books_from_file(self.file_path)
-        if self.books is None:
+        books_df = load_books_from_file(self.file_path)
+        if books_df is None:
             raise ValueError(f"Failed to load books from file: {self.file_path}")
 
-        self.decorators = {(book.title, book.author): BookDecorator(book) for book in self.books}
+        # Primary index: (title, author) -> Book, in catalog order. It holds every
+        # book, so a database catalog is read in full here
+        data_manager = DataManager.get_instance()
+        if data_manager.catalog_unread():
+            books_df = data_manager.get_data()
+        self.index = {}
+        self.store = None
+        if columnar:
+            self.store = CatalogStore.from_frame(books_df)
+            data_manager.attach_store(self.store)
+            for key, position in self.store.positions.items():
+                self.index[key] = self.store.view(position)
+        else:
+            for row in (books_df.to_dict("records") if len(books_df) else []):
+                book = row_to_book(row)
+                self.index[(book.title, book.author)] = book
+
+        if use_journal:
+            data_manager.enable_journal(self.file_path, checkpoint_interval=checkpoint_interval)
+        else:
+            data_manager.disable_journal()
+        if write_behind:
+            data_manager.enable_write_behind(self.file_path, interval_ms=flush_interval_ms)
+        else:
+            data_manager.disable_write_behind()
+
+        self.locks = StripedLock(lock_stripes) if thread_safe else None
+
+        # Who holds which copy, and the due dates of the loans. Every loan and return is appended
+        # to the loan journal together with the catalog change; checkpoints fold the journal into
+        # the registry and ledger files
+        self.checkpoint_interval = checkpoint_interval
+        self.loan_days = loan_days
+        self.loan_journal = BookJournal(BookJournal.path_for(LoanRegistry.path_for(self.file_path)))
+        self._loan_events = []
+        self._loan_events_lock = threading.Lock()
+        self.loans = LoanRegistry.load(LoanRegistry.path_for(self.file_path))
+        self.ledger = LoanLedger.load(LoanLedger.path_for(self.file_path))
+        self._replay_loan_journal()
+        self.loans.retain(self._is_copy_loaned)
+        self.ledger.retain(self._is_copy_loaned)
+        self._restore_missing_loans(books_df)
+
+        # Barcode of every copy, loaded on first use, see barcodes
+        self._barcodes = None
+
+        # Decorators are built on first use, see get_decorator
+        self.decorators = {}
         auth_manager = AuthManager("data/users.csv")
-        self.users = auth_manager.users_file
+        self.users = [
+            {"name": username, "email": ""} for username in pd.read_csv(auth_manager.users_file)["username"]
+        ]
         self.notification_manager = NotificationManager(self.users)
 
+    @property
+    def barcodes(self) -> BarcodeIndex:
+        """
+        The barcode index. It is loaded, brought in line with the catalog and its
+        file written when barcodes are first used, so a library that never
+        scans a copy creates no index file. Must not be first used while
+        holding a book's lock.
+        """
+        if self._barcodes is None:
+            with self._locked():
+                if self._barcodes is None:
+                    barcodes = BarcodeIndex.load(BarcodeIndex.path_for(self.file_path))
+                    # The catalog may have changed since the index was last used
+                    for title, author in [key for key in barcodes.copies if key not in self.index]:
+                        barcodes.remove(title, author)
+                    barcodes.assign_many((key, book.copies) for key, book in self.index.items())
+                    self._barcodes = barcodes
+        return self._barcodes
+
+    def _locked(self, *keys):
+        """
+        Returns a context manager that serializes operations on the given books,
+        or on the whole catalog if no book is given. Does nothing unless thread-safe.
+
+        Args:
+            keys (tuple): (title, author) keys of the books.
+        """
+        if self.locks is None:
+            return contextlib.nullcontext()
+        return self.locks.holding(keys) if keys else self.locks.holding_all()
+
+    def _is_copy_loaned(self, title: str, author: str, copy_id: int) -> bool:
+        book = self.index.get((title, author))
+        return book is not None and 1 <= copy_id <= book.copies and book.is_loaned[copy_id] == 'yes'
+
+    @property
+    def books(self):
+        """
+        All books, in catalog order.
+        """
+        return list(self.index.values())
+
+    def get_book(self, title: str, author: str):
+        """
+        Looks up a book through the (title, author) index.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            Book: The book, or None if it is not in the library.
+        """
+        return self.index.get((title, author))
+
+    def get_decorator(self, title: str, author: str):
+        """
+        Returns the BookDecorator of a book, building it on first use.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+
+        Returns:
+            BookDecorator: The decorator, or None if the book is not in the library.
+        """
+        key = (title, author)
+        if key not in self.decorators:
+            book = self.index.get(key)
+            if book is None:
+                return None
+            self.decorators[key] = BookDecorator(pd.DataFrame([book.to_dict()]))
+        return self.decorators[key]
+
+    def search_books(self, criteria, strategy=None):
+        """
+        Searches the catalog.
+
+        Args:
+            criteria: The search criteria, as expected by the strategy.
+            strategy (SearchStrategy): The strategy to use. Defaults to self.strategy.
+
+        Returns:
+            pd.DataFrame: The matching books.
+        """
+        books_df = DataManager.get_instance().get_data()
+        if books_df is None or len(books_df) == 0:
+            return pd.DataFrame()
+        return SearchManager(strategy or self.strategy).search(books_df, criteria)
+
+    def loans_of(self, user_id: str) -> list:
+        """
+        Returns the copies a user currently holds, through the loan registry.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            list: (title, author, copy_id) tuples.
+        """
+        return self.loans.loans_of(user_id)
+
+    def overdue_loans(self, as_of=None) -> pd.DataFrame:
+        """
+        Lists the loans that are overdue, most overdue first.
+
+        Args:
+            as_of: The moment to check, as a datetime or seconds since the epoch. Defaults to now.
+
+        Returns:
+            pd.DataFrame: Columns title, author, copy_id, user_id, loaned_at and due_at.
+        """
+        return self.ledger.overdue(as_of)
+
+    def overdue_counts(self, as_of=None) -> dict:
+        """
+        Counts every user's overdue loans.
+
+        Args:
+            as_of: The moment to check, as a datetime or seconds since the epoch. Defaults to now.
+
+        Returns:
+            dict: User ID -> number of overdue loans, for users with any.
+        """
+        return self.ledger.overdue_counts(as_of)
+
+    def _replay_loan_journal(self):
+        """
+        Applies the loans and returns journaled since the registry was last saved.
+        """
+        torn = self.loan_journal.repair()
+        if torn:
+            log_error(f"Discarded a torn record of {torn} bytes at the end of {self.loan_journal.file_path}.")
+        records = self.loan_journal.read_records()
+        for record in records:
+            if record["op"] == "loan":
+                self.loans.record(record["user_id"], record["title"], record["author"], record["copy_id"])
+                self.ledger.open(record["title"], record["author"], record["copy_id"], record["user_id"],
+                                 loaned_at=record.get("loaned_at"), due_at=record.get("due_at"),
+                                 loan_days=self.loan_days)
+            else:
+                self.loans.release(record["title"], record["author"], record["copy_id"])
+                self.ledger.close(record["title"], record["author"], record["copy_id"])
+        self.loan_journal.pending = len(records)
+
+    def _restore_missing_loans(self, books_df):
+        """
+        Gives every copy the catalog shows as loaned a ledger row, so it can be
+        reported overdue. Copies without one were loaned while the ledger was
+        not kept; they are taken to be loaned when the catalog file was last
+        written, the latest moment the loan can have been made.
+        """
+        if books_df is None or len(books_df) == 0:
+            return
+        lending = (books_df["available"].to_numpy() < books_df["copies"].to_numpy()).nonzero()[0]
+        keys = zip(books_df["title"].iloc[lending].tolist(), books_df["author"].iloc[lending].tolist())
+        loaned_at = int(os.path.getmtime(self.file_path)) if os.path.exists(self.file_path) else None
+        restored = 0
+        for key in keys:
+            book = self.index.get(key)
+            if book is None:
+                continue
+            for copy_id, state in book.is_loaned.items():
+                if state == 'yes' and self.ledger.due_of(*key, copy_id) is None:
+                    holder = self.loans.holder_of(*key, copy_id)
+                    self.ledger.open(*key, copy_id, holder if holder is not None else UNKNOWN_HOLDER,
+                                     loaned_at=loaned_at, loan_days=self.loan_days)
+                    restored += 1
+        if restored:
+            log_info(f"Restored {restored} loans missing from the loan ledger, due {self.loan_days} days "
+                      f"after the catalog was last saved.")
+
+    def _add_loan_event(self, event: dict):
+        with self._loan_events_lock:
+            self._loan_events.append(event)
+
+    def _journal_loans(self):
+        """
+        Appends the loans and returns recorded since the last call to the loan journal,
+        with one write. Called right before the catalog change is persisted.
+        """
+        with self._loan_events_lock:
+            events, self._loan_events = self._loan_events, []
+            self.loan_journal.extend(events)
+            checkpoint_due = self.loan_journal.pending >= self.checkpoint_interval
+        if checkpoint_due:
+            self._save_loans()
+
+    def _save_loans(self):
+        with self._loan_events_lock:
+            self.loans.save(LoanRegistry.path_for(self.file_path))
+            self.ledger.save(LoanLedger.path_for(self.file_path))
+            # Both files now hold every journaled loan
+            self.loan_journal.truncate()
+
+    def checkpoint(self):
+        """
+        Folds the journal back into the CSV file by writing a full snapshot,
+        saves the loan registry and ledger and compacts the catalog store.
+        """
+        self._compact_store()
+        checkpoint_books_file(self.file_path)
+        self._save_loans()
+
+    def close(self):
+        """
+        Writes any pending background changes, stops the write-behind thread,
+        saves the loan registry and ledger and compacts the catalog store and
+        the barcode index.
+        """
+        DataManager.get_instance().disable_write_behind()
+        self._compact_store()
+        self._save_loans()
+        if self._barcodes is not None and self._barcodes.retired:
+            self._barcodes.compact()
+
+    def _compact_store(self):
+        """
+        Drops removed books from the catalog store and packs its loan flags.
+        Every book is locked meanwhile, as the store's rows move.
+        """
+        data_manager = DataManager.get_instance()
+        if self.store is not None and data_manager.store is self.store:
+            with self._locked():
+                data_manager.compact_store()
+
+    def _copies_fit(self, title: str, author: str, copies: int) -> bool:
+        """
+        Checks a book's number of copies against MAX_COPIES, the limit of the
+        'copies' column, the barcode index and the loan ledger.
+        """
+        if not 0 <= copies <= MAX_COPIES:
+            log_error(f"'{title}' by {author} cannot have {copies} copies; the limit is {MAX_COPIES}.")
+            return False
+        return True
+
     def add_book(self, book: Book, additional_copies: int = 0) -> bool:
-        for existing_book in self.books:
-            if existing_book.title == book.title and existing_book.author == book.author:
+        with self._locked():
+            existing_book = self.index.get((book.title, book.author))
+            copies = book.copies if existing_book is None else existing_book.copies + additional_copies
+            if not self._copies_fit(book.title, book.author, copies):
+                return False
+            if existing_book is not None:
+                # New copies start out available
                 existing_book.copies += additional_copies
-                existing_book.available += additional_copies
-                for i in range(existing_book.copies - additional_copies + 1, existing_book.copies + 1):
-                    existing_book.is_loaned[i] = 'no'
-
-                if existing_book.available > existing_book.copies:
-                    log_error(f"Inconsistent state for book '{existing_book.title}' by {existing_book.author}.")
-                    existing_book.available = existing_book.copies
 
-                save_books_to_file(self.file_path)
+                persist_book(existing_book, self.file_path)
+                if self._barcodes is not None:
+                    self._barcodes.assign(existing_book.title, existing_book.author, existing_book.copies)
 
                 log_info(f"Added {additional_copies} copies to '{existing_book.title}' by {existing_book.author}.")
                 self.notification_manager.notify_all(
@@ -53,74 +378,412 @@ class LibraryManager:
                 )
                 return True
 
-        book.is_loaned = {i + 1: 'no' for i in range(book.copies)}
-        book.available = book.copies
-        book.borrow_count = 0
-        book.popularity_score = book.borrow_count + len(book.waiting_list)
-        book.waiting_list = []
-        self.books.append(book)
+            book.is_loaned = {i + 1: 'no' for i in range(book.copies)}
+            book.borrow_count = 0
+            book.popularity_score = book.borrow_count + len(book.waiting_list)
+            book.waiting_list = []
+            self.index[(book.title, book.author)] = book
+            self.decorators.pop((book.title, book.author), None)
+            persist_book(book, self.file_path, is_new=True)
+            if self._barcodes is not None:
+                self._barcodes.assign(book.title, book.author, book.copies)
+            if self.store is not None:
+                # From now on the book lives in the store
+                self.index[(book.title, book.author)] = self.store.get(book.title, book.author)
+            log_info(f"New book '{book.title}' by {book.author} added successfully.")
+            self.notification_manager.notify_all(f"New book added: '{book.title}' by {book.author}")
+            return True
 
-        self.decorators[(book.title, book.author)] = BookDecorator(book)
-        save_books_to_file(self.file_path)
-        log_info(f"New book '{book.title}' by {book.author} added successfully.")
-        self.notification_manager.notify_all(f"New book added: '{book.title}' by {book.author}")
-        return True
+    def add_books(self, books) -> list:
+        """
+        Adds a batch of books, e.g. a new shipment.
+
+        New titles are added and copies of titles already in the library are
+        added to them, as in add_book. The catalog is persisted once and a
+        single notification announces the whole shipment.
+
+        Args:
+            books (iterable): Book objects, or (Book, additional_copies) tuples
+                for titles that may already be in the library.
+
+        Returns:
+            list: One result per item, True if the book or its copies were added.
+        """
+        books = list(books)
+        with self._locked():
+            results, changed, new, restocked = [], {}, {}, {}
+            for item in books:
+                book, additional_copies = item if isinstance(item, tuple) else (item, 0)
+                key = (book.title, book.author)
+                existing_book = self.index.get(key)
+                copies = book.copies if existing_book is None else existing_book.copies + additional_copies
+                if not self._copies_fit(book.title, book.author, copies):
+                    results.append(False)
+                    continue
+                if existing_book is not None:
+                    # New copies start out available
+                    existing_book.copies += additional_copies
+                    if key not in new:
+                        changed[key] = existing_book
+                        restocked[key] = True
+                    results.append(True)
+                    continue
+
+                book.is_loaned = {i + 1: 'no' for i in range(book.copies)}
+                book.borrow_count = 0
+                book.waiting_list = []
+                book.popularity_score = 0
+                self.index[key] = new[key] = book
+                self.decorators.pop(key, None)
+                results.append(True)
+
+            persist_books(changed.values(), new.values(), file_path=self.file_path)
+            if self._barcodes is not None:
+                self._barcodes.assign_many((key, book.copies) for key, book in {**changed, **new}.items())
+            if self.store is not None:
+                # From now on the new books live in the store
+                for key in new:
+                    self.index[key] = self.store.get(*key)
+
+            log_info(f"Batch add: {len(new)} new books, copies added to {len(restocked)} books.")
+            messages = []
+            if new:
+                messages.append(f"New books added: {_describe_books(new)}")
+            if restocked:
+                messages.append(f"Additional copies available: {_describe_books(restocked)}")
+            if messages:
+                self.notification_manager.notify_all(". ".join(messages) + ".")
+            return results
 
     def remove_book(self, title: str, author: str) -> bool:
-        for book in self.books:
-            if book.title == title and book.author == author:
+        with self._locked():
+            book = self.index.get((title, author))
+            if book is not None:
                 if book.available < book.copies:
                     log_error(f"Cannot remove book '{title}' by {author} as it has borrowed copies.")
                     return False
 
-                self.books.remove(book)
-                del self.decorators[(title, author)]
-                save_books_to_file(self.file_path)
+                del self.index[(title, author)]
+                self.decorators.pop((title, author), None)
+                persist_book_removal(title, author, self.file_path)
+                if self._barcodes is not None:
+                    self._barcodes.remove(title, author)
                 log_info(f"Book '{title}' by {author} removed successfully.")
                 self.notification_manager.notify_all(f"Book '{title}' by {author} has been removed.")
                 return True
 
-        log_error(f"Book '{title}' by {author} not found.")
-        return False
+            log_error(f"Book '{title}' by {author} not found.")
+            return False
+
+    def _lend_copy(self, book, user_id: str, copy_id: int = None):
+        """
+        Loans the first free copy of a book or puts the user on its waiting list, in memory only.
+
+        Args:
+            book (Book): The book to borrow.
+            user_id (str): The ID of the user borrowing the book.
+            copy_id (int): A free copy to loan instead of the first one.
+
+        Returns:
+            tuple: The ID of the loaned copy (None if no copy was free) and whether the book changed.
+        """
+        if copy_id is None:
+            copy_id = book.first_free_copy()
+        if copy_id is not None:
+            book.is_loaned[copy_id] = 'yes'
+            book.borrow_count += 1
+            book.popularity_score = book.borrow_count + len(book.waiting_list)
+            return copy_id, True
+
+        if user_id not in book.waiting_list:
+            book.waiting_list.append(user_id)
+            book.popularity_score = book.borrow_count + len(book.waiting_list)
+            return None, True
+        return None, False
+
+    def _record_loan(self, user_id: str, title: str, author: str, copy_id: int):
+        """
+        Records who holds a loaned copy and when it is due.
+        """
+        loaned_at = int(time.time())
+        self.loans.record(user_id, title, author, copy_id)
+        due_at = self.ledger.open(title, author, copy_id, user_id, loaned_at=loaned_at, loan_days=self.loan_days)
+        self._add_loan_event({"op": "loan", "user_id": user_id, "title": title, "author": author,
+                              "copy_id": copy_id, "loaned_at": loaned_at, "due_at": due_at})
 
     def borrow_book(self, title: str, author: str, user_id: str) -> bool:
-        for book in self.books:
-            if book.title == title and book.author == author:
-                if book.available > 0:
-                    for copy_id, status in book.is_loaned.items():
-                        if status == 'no':
-                            book.is_loaned[copy_id] = 'yes'
-                            book.available -= 1
-                            book.borrow_count += 1
-                            save_books_to_file(self.file_path)
-                            log_info(f"Book '{title}' borrowed successfully. Copy ID: {copy_id}")
-                            return True
-
-                if user_id not in book.waiting_list:
-                    book.waiting_list.append(user_id)
+        with self._locked((title, author)):
+            book = self.index.get((title, author))
+            if book is not None:
+                copy_id, changed = self._lend_copy(book, user_id)
+                if copy_id is not None:
+                    self._record_loan(user_id, title, author, copy_id)
+                    self._journal_loans()
+                    persist_book(book, self.file_path, copy_id=copy_id)
+                    log_info(f"Book '{title}' borrowed successfully. Copy ID: {copy_id}")
+                    return True
+
+                if changed:
+                    persist_book(book, self.file_path)
                     log_info(f"User {user_id} added to waiting list for '{title}'.")
                     self.notification_manager.notify_all(f"Book '{title}' by {author} is currently unavailable.")
                 return False
 
-        log_error(f"Book '{title}' by {author} not found in the library.")
-        return False
-
-    def return_book(self, title: str, author: str) -> bool:
-        for book in self.books:
-            if book.title == title and book.author == author:
-                for copy_id, status in book.is_loaned.items():
-                    if status == 'yes':  # Find the first loaned copy
-                        book.is_loaned[copy_id] = 'no'
-                        book.available += 1
-                        save_books_to_file(self.file_path)
-                        log_info(f"Book '{title}' returned successfully. Copy ID: {copy_id}")
-
-                        # Handle waiting list
-                        if book.waiting_list:
-                            next_user = book.waiting_list.pop(0)
-                            log_info(f"User {next_user} notified for book '{title}'.")
-                            self.notification_manager.notify_user(next_user, f"Book '{title}' is now available.")
-                        return True
-
-        log_error(f"Book '{title}' by {author} not found in the library.")
-        return False
+            log_error(f"Book '{title}' by {author} not found in the library.")
+            return False
+
+    def barcodes_of(self, title: str, author: str) -> list:
+        """
+        Returns the barcodes of a book's copies, by copy ID.
+        """
+        return self.barcodes.barcodes_of(title, author)
+
+    def borrow_by_barcode(self, barcode: str, user_id: str) -> bool:
+        """
+        Loans the scanned copy, e.g. at a self-service kiosk.
+
+        Args:
+            barcode (str): The barcode of the copy.
+            user_id (str): The ID of the user borrowing the copy.
+
+        Returns:
+            bool: True if the copy was loaned, False if the barcode is unknown or the copy is on loan.
+        """
+        copy = self.barcodes.lookup(barcode)
+        if copy is None:
+            log_error(f"Unknown barcode {barcode}.")
+            return False
+
+        title, author, copy_id = copy
+        with self._locked((title, author)):
+            book = self.index.get((title, author))
+            # The book may have been removed since the lookup
+            if book is None or self.barcodes.lookup(barcode) != copy:
+                log_error(f"Unknown barcode {barcode}.")
+                return False
+            if book.is_loaned[copy_id] == 'yes':
+                log_error(f"Copy {copy_id} of '{title}' is already on loan.")
+                return False
+
+            self._lend_copy(book, user_id, copy_id)
+            self._record_loan(user_id, title, author, copy_id)
+            self._journal_loans()
+            persist_book(book, self.file_path, copy_id=copy_id)
+            log_info(f"Book '{title}' borrowed successfully. Copy ID: {copy_id}")
+            return True
+
+    def return_by_barcode(self, barcode: str) -> bool:
+        """
+        Returns the scanned copy.
+
+        Args:
+            barcode (str): The barcode of the copy.
+
+        Returns:
+            bool: True if the copy was returned, False if the barcode is unknown or the copy is not on loan.
+        """
+        copy = self.barcodes.lookup(barcode)
+        if copy is None:
+            log_error(f"Unknown barcode {barcode}.")
+            return False
+        title, author, copy_id = copy
+        return self.return_book(title, author, copy_id=copy_id)
+
+    def borrow_many(self, requests) -> list:
+        """
+        Borrows a batch of books, e.g. a stack at the checkout desk.
+
+        All loans are applied in memory, the catalog is persisted once and a
+        single notification lists the books that were unavailable.
+
+        Args:
+            requests (iterable): (title, author, user_id) tuples.
+
+        Returns:
+            list: One result per request, True if a copy was loaned, as in borrow_book.
+        """
+        requests = list(requests)
+        with self._locked(*((title, author) for title, author, _ in requests)):
+            results, changed, unavailable = [], {}, {}
+            for title, author, user_id in requests:
+                book = self.index.get((title, author))
+                if book is None:
+                    log_error(f"Book '{title}' by {author} not found in the library.")
+                    results.append(False)
+                    continue
+
+                copy_id, book_changed = self._lend_copy(book, user_id)
+                if copy_id is not None:
+                    self._record_loan(user_id, title, author, copy_id)
+                if book_changed:
+                    changed[(title, author)] = book
+                    if copy_id is None:
+                        unavailable[(title, author)] = True
+                results.append(copy_id is not None)
+
+            self._journal_loans()
+            persist_books(changed.values(), file_path=self.file_path)
+            log_info(f"Batch borrow: {sum(results)} of {len(results)} requests loaned a copy, "
+                     f"{len(unavailable)} books unavailable.")
+            if unavailable:
+                self.notification_manager.notify_all(f"Currently unavailable: {_describe_books(unavailable)}.")
+            return results
+
+    def cancel_reservation(self, title: str, author: str, user_id: str) -> bool:
+        with self._locked((title, author)):
+            book = self.index.get((title, author))
+            if book is None:
+                log_error(f"Book '{title}' by {author} not found in the library.")
+                return False
+
+            if not book.waiting_list.cancel(user_id):
+                log_error(f"User {user_id} is not on the waiting list for '{title}'.")
+                return False
+
+            book.popularity_score = book.borrow_count + len(book.waiting_list)
+            persist_book(book, self.file_path)
+            log_info(f"User {user_id} removed from waiting list for '{title}'.")
+            return True
+
+    def _take_back_copy(self, book, copy_id: int = None):
+        """
+        Returns a loaned copy of a book and takes the next user off its waiting list, in memory only.
+
+        Args:
+            book (Book): The book being returned.
+            copy_id (int): The copy to return. Defaults to the first loaned copy.
+
+        Returns:
+            tuple: The ID of the returned copy (None if the copy was not loaned) and the next user, or None.
+        """
+        if copy_id is None:
+            copy_id = book.first_loaned_copy()
+        elif not (1 <= copy_id <= book.copies and book.is_loaned[copy_id] == 'yes'):
+            copy_id = None
+        if copy_id is None:
+            return None, None
+        book.is_loaned[copy_id] = 'no'
+        self.loans.release(book.title, book.author, copy_id)
+        self.ledger.close(book.title, book.author, copy_id)
+        self._add_loan_event({"op": "return", "title": book.title, "author": book.author, "copy_id": copy_id})
+
+        # Handle waiting list
+        next_user = book.waiting_list.popleft() if book.waiting_list else None
+        book.popularity_score = book.borrow_count + len(book.waiting_list)
+        return copy_id, next_user
+
+    def _copy_to_return(self, title: str, author: str, user_id: str = None, copy_id: int = None):
+        """
+        Resolves which copy a return refers to.
+
+        Returns:
+            tuple: Whether the return can go ahead and the copy ID (None for the first loaned copy).
+        """
+        if copy_id is not None or user_id is None:
+            return True, copy_id
+        copy_id = self.loans.copy_held_by(user_id, title, author)
+        if copy_id is None:
+            log_error(f"User {user_id} does not hold a copy of '{title}' by {author}.")
+            return False, None
+        return True, copy_id
+
+    def return_book(self, title: str, author: str, user_id: str = None, copy_id: int = None) -> bool:
+        """
+        Returns a copy of a book. The copy is the one given, else the one the
+        given user holds, else the first loaned copy.
+
+        Args:
+            title (str): The title of the book.
+            author (str): The author of the book.
+            user_id (str): The user returning the book.
+            copy_id (int): The copy being returned.
+
+        Returns:
+            bool: True if a copy was returned, False otherwise.
+        """
+        with self._locked((title, author)):
+            book = self.index.get((title, author))
+            if book is not None:
+                found, copy_id = self._copy_to_return(title, author, user_id, copy_id)
+                if not found:
+                    return False
+                copy_id, next_user = self._take_back_copy(book, copy_id)
+                if copy_id is not None:
+                    self._journal_loans()
+                    persist_book(book, self.file_path, copy_id=copy_id)
+                    log_info(f"Book '{title}' returned successfully. Copy ID: {copy_id}")
+
+                    if next_user is not None:
+                        log_info(f"User {next_user} notified for book '{title}'.")
+                        self.notification_manager.notify_user(next_user, f"Book '{title}' is now available.")
+                    return True
+
+                log_error(f"No loaned copy of '{title}' by {author} to return.")
+                return False
+
+            log_error(f"Book '{title}' by {author} not found in the library.")
+            return False
+
+    def return_many(self, requests) -> list:
+        """
+        Returns a batch of books, e.g. the contents of the returns bin.
+
+        All returns are applied in memory, the catalog is persisted once and
+        every user taken off a waiting list gets one notification.
+
+        Args:
+            requests (iterable): (title, author) or (title, author, user_id) tuples.
+
+        Returns:
+            list: One result per request, True if a copy was returned, as in return_book.
+        """
+        requests = list(requests)
+        with self._locked(*(request[:2] for request in requests)):
+            results, changed, next_users = [], {}, {}
+            for title, author, *holder in requests:
+                book = self.index.get((title, author))
+                if book is None:
+                    log_error(f"Book '{title}' by {author} not found in the library.")
+                    results.append(False)
+                    continue
+                found, copy_id = self._copy_to_return(title, author, *holder[:1])
+                if not found:
+                    results.append(False)
+                    continue
+                copy_id, next_user = self._take_back_copy(book, copy_id)
+                if copy_id is None:
+                    log_error(f"No loaned copy of '{title}' by {author} to return.")
+                    results.append(False)
+                    continue
+
+                changed[(title, author)] = book
+                if next_user is not None:
+                    next_users.setdefault(next_user, []).append(title)
+                results.append(True)
+
+            self._journal_loans()
+            persist_books(changed.values(), file_path=self.file_path)
+            log_info(f"Batch return: {sum(results)} of {len(results)} copies returned.")
+            for user_id, titles in next_users.items():
+                self.notification_manager.notify_user(
+                    user_id, "Now available: " + ", ".join(f"'{title}'" for title in titles) + "."
+                )
+            return results
+
+
+def _describe_books(keys, limit=10):
+    """
+    Describes a set of books for a notification, e.g. "'Dune' by Frank Herbert and 3 more".
+
+    Args:
+        keys (iterable): (title, author) tuples.
+        limit (int): Maximum number of books to name.
+
+    Returns:
+        str: The description.
+    """
+    keys = list(keys)
+    described = ", ".join(f"'{title}' by {author}" for title, author in keys[:limit])
+    if len(keys) > limit:
+        described += f" and {len(keys) - limit} more"
+    return described
@@ -26,6 +26,17 @@ class NotificationManager:
         for user in self.users:
             self._send_notification(user, message)
 
+    def notify_user(self, user_id: str, message: str):
+        """
+        Sends a notification message to a single patron, e.g. the next one on a waiting list.
+
+        Args:
+            user_id (str): The ID of the patron.
+            message (str): The notification message.
+        """
+        print(f"Notification sent to {user_id}: {message}")
+        log_info(f"Notification sent to {user_id}: {message}")
+
     def _send_notification(self, user: dict, message: str):
         """
         Simulates sending a notification to a user.
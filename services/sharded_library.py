@@ -0,0 +1,307 @@
+import multiprocessing
+import os
+import threading
+import zlib
+import pandas as pd
+from data.schema import apply_schema
+from models.book import Book
+from logs.actions import log_info, log_error
+
+# Methods a shard worker runs on its LibraryManager
+_SHARD_METHODS = {
+    "get_book", "borrow_book", "return_book", "cancel_reservation", "add_book", "remove_book",
+    "borrow_many", "return_many", "add_books", "search_books", "loans_of", "overdue_loans",
+    "overdue_counts", "checkpoint",
+}
+
+
+def shard_of(title: str, author: str, shards: int) -> int:
+    """
+    Returns the shard that owns a book. CRC-32 is used instead of hash(), which
+    differs from process to process.
+
+    Args:
+        title (str): The title of the book.
+        author (str): The author of the book.
+        shards (int): The number of shards.
+
+    Returns:
+        int: The shard index.
+    """
+    return zlib.crc32(f"{title}\x1f{author}".encode("utf-8")) % shards
+
+
+def shard_paths(file_path: str, shards: int) -> list:
+    """
+    Returns the catalog file of every shard, e.g. books.shard0of4.csv.
+
+    Args:
+        file_path (str): Path to the unsharded catalog file.
+        shards (int): The number of shards.
+    """
+    root, extension = os.path.splitext(file_path)
+    return [f"{root}.shard{shard}of{shards}{extension}" for shard in range(shards)]
+
+
+def split_catalog(file_path: str, shards: int) -> list:
+    """
+    Partitions a books CSV file into one CSV file per shard. The rows are copied
+    as they are, so every shard file is in the same format as the original.
+
+    Args:
+        file_path (str): Path to the unsharded CSV file.
+        shards (int): The number of shards.
+
+    Returns:
+        list: The paths of the shard files.
+    """
+    books_df = pd.read_csv(file_path, dtype={'title': str, 'author': str}, keep_default_na=False)
+    owners = [shard_of(title, author, shards) for title, author in zip(books_df['title'], books_df['author'])]
+    paths = shard_paths(file_path, shards)
+    for shard, path in enumerate(paths):
+        books_df[[owner == shard for owner in owners]].to_csv(path, index=False)
+    log_info(f"Split '{file_path}' into {shards} shards.")
+    return paths
+
+
+def _serve(connection, file_path, options):
+    """
+    Runs one shard: loads its LibraryManager and answers requests from the router
+    until it is told to close. Runs in a worker process.
+
+    Args:
+        connection (Connection): The worker's end of the pipe.
+        file_path (str): The shard's catalog file.
+        options (dict): Keyword arguments for LibraryManager.
+    """
+    from services.library_manager import LibraryManager
+
+    library_manager = LibraryManager(file_path, **options)
+    connection.send(("ok", None))
+    while True:
+        method, args = connection.recv()
+        if method == "close":
+            library_manager.close()
+            connection.send(("ok", None))
+            break
+        try:
+            if method not in _SHARD_METHODS:
+                raise ValueError(f"Unsupported shard method: {method}")
+            if method == "get_book":
+                book = library_manager.get_book(*args)
+                result = book.to_dict() if book is not None else None
+            else:
+                result = getattr(library_manager, method)(*args)
+            connection.send(("ok", result))
+        except Exception as e:
+            connection.send(("error", e))
+    connection.close()
+
+
+class ShardedLibrary:
+    """
+    A library partitioned by a hash of (title, author) across worker processes.
+
+    Every shard is a process with its own LibraryManager and catalog file, so
+    shards use separate cores and separate in-memory catalogs. The router sends
+    single-book calls to the owning shard over a pipe, splits batches by shard
+    and sends searches to every shard, gathering the results. Calls from
+    several threads to different shards run concurrently.
+    """
+
+    def __init__(self, file_path: str, shards: int = None, **options):
+        """
+        Starts the shard workers. If the shard files of 'file_path' do not exist
+        yet, the catalog is split into them first.
+
+        Args:
+            file_path (str): Path to the unsharded CSV file.
+            shards (int): Number of shards. Defaults to the number of CPU cores.
+            **options: Keyword arguments for each shard's LibraryManager, e.g. use_journal.
+        """
+        self.shards = shards or os.cpu_count() or 1
+        self.paths = shard_paths(file_path, self.shards)
+        if not all(os.path.exists(path) for path in self.paths):
+            split_catalog(file_path, self.shards)
+
+        # Spawned workers start clean instead of inheriting this process's threads and locks
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        self.locks = [threading.Lock() for _ in range(self.shards)]
+        for path in self.paths:
+            router_end, worker_end = context.Pipe()
+            process = context.Process(target=_serve, args=(worker_end, path, options), daemon=True)
+            process.start()
+            self.connections.append(router_end)
+            self.processes.append(process)
+        for connection in self.connections:
+            self._receive(connection)
+        log_info(f"Started {self.shards} library shards for '{file_path}'.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    @staticmethod
+    def _receive(connection):
+        return ShardedLibrary._unwrap(connection.recv())
+
+    @staticmethod
+    def _unwrap(response):
+        status, result = response
+        if status == "error":
+            log_error(f"Shard request failed: {result}")
+            raise result
+        return result
+
+    def _call(self, shard, method, *args):
+        """
+        Runs a method on one shard and waits for its result.
+        """
+        with self.locks[shard]:
+            self.connections[shard].send((method, args))
+            return self._receive(self.connections[shard])
+
+    def _scatter(self, method, shard_args):
+        """
+        Sends a method to several shards at once and gathers the results.
+
+        Args:
+            method (str): The method to run.
+            shard_args (dict): Shard index -> argument tuple.
+
+        Returns:
+            dict: Shard index -> result.
+        """
+        shards = sorted(shard_args)
+        for shard in shards:
+            self.locks[shard].acquire()
+        try:
+            for shard in shards:
+                self.connections[shard].send((method, shard_args[shard]))
+            # Read every response before raising, so no pipe is left with an unread answer
+            responses = {shard: self.connections[shard].recv() for shard in shards}
+            return {shard: self._unwrap(response) for shard, response in responses.items()}
+        finally:
+            for shard in shards:
+                self.locks[shard].release()
+
+    def _route(self, method, title, author, *args):
+        return self._call(shard_of(title, author, self.shards), method, title, author, *args)
+
+    def _route_batch(self, method, items, key):
+        """
+        Splits a batch by shard, runs the parts concurrently and returns the
+        per-item results in the original order.
+        """
+        items = list(items)
+        parts = {}
+        for position, item in enumerate(items):
+            parts.setdefault(shard_of(*key(item), self.shards), []).append(position)
+        results = self._scatter(method, {shard: ([items[p] for p in positions],) for shard, positions in parts.items()})
+
+        ordered = [None] * len(items)
+        for shard, positions in parts.items():
+            for position, result in zip(positions, results[shard]):
+                ordered[position] = result
+        return ordered
+
+    def get_book(self, title: str, author: str):
+        """
+        Returns a copy of a book's current state, or None if it is not in the library.
+        """
+        data = self._route("get_book", title, author)
+        return Book.from_dict(data) if data is not None else None
+
+    def borrow_book(self, title: str, author: str, user_id: str) -> bool:
+        return self._route("borrow_book", title, author, user_id)
+
+    def return_book(self, title: str, author: str, user_id: str = None, copy_id: int = None) -> bool:
+        return self._route("return_book", title, author, user_id, copy_id)
+
+    def cancel_reservation(self, title: str, author: str, user_id: str) -> bool:
+        return self._route("cancel_reservation", title, author, user_id)
+
+    def remove_book(self, title: str, author: str) -> bool:
+        return self._route("remove_book", title, author)
+
+    def add_book(self, book: Book, additional_copies: int = 0) -> bool:
+        return self._call(shard_of(book.title, book.author, self.shards), "add_book", book, additional_copies)
+
+    def borrow_many(self, requests) -> list:
+        return self._route_batch("borrow_many", requests, key=lambda request: request[:2])
+
+    def return_many(self, requests) -> list:
+        return self._route_batch("return_many", requests, key=lambda request: request[:2])
+
+    def add_books(self, books) -> list:
+        def key(item):
+            book = item[0] if isinstance(item, tuple) else item
+            return book.title, book.author
+        return self._route_batch("add_books", books, key=key)
+
+    def search_books(self, criteria, strategy=None):
+        """
+        Searches every shard and gathers the matches.
+
+        Args:
+            criteria: The search criteria, as expected by the strategy.
+            strategy (SearchStrategy): The strategy to use. Defaults to searching by title.
+
+        Returns:
+            pd.DataFrame: The matching books, shard by shard.
+        """
+        results = self._scatter("search_books", {shard: (criteria, strategy) for shard in range(self.shards)})
+        frames = [results[shard] for shard in range(self.shards) if len(results[shard])]
+        if not frames:
+            return pd.DataFrame()
+        return apply_schema(pd.concat(frames, ignore_index=True))
+
+    def loans_of(self, user_id: str) -> list:
+        """
+        Returns the copies a user currently holds, gathered from every shard.
+        """
+        results = self._scatter("loans_of", {shard: (user_id,) for shard in range(self.shards)})
+        return [loan for shard in range(self.shards) for loan in results[shard]]
+
+    def overdue_loans(self, as_of=None) -> pd.DataFrame:
+        """
+        Lists the overdue loans of every shard, most overdue first.
+        """
+        results = self._scatter("overdue_loans", {shard: (as_of,) for shard in range(self.shards)})
+        overdue = pd.concat([results[shard] for shard in range(self.shards)], ignore_index=True)
+        return overdue.sort_values("due_at", kind="stable", ignore_index=True)
+
+    def overdue_counts(self, as_of=None) -> dict:
+        """
+        Counts every user's overdue loans over all shards.
+        """
+        results = self._scatter("overdue_counts", {shard: (as_of,) for shard in range(self.shards)})
+        counts = {}
+        for shard in range(self.shards):
+            for user_id, count in results[shard].items():
+                counts[user_id] = counts.get(user_id, 0) + count
+        return counts
+
+    def checkpoint(self):
+        """
+        Folds every shard's journal back into its catalog file.
+        """
+        self._scatter("checkpoint", {shard: () for shard in range(self.shards)})
+
+    def close(self):
+        """
+        Stops the shard workers after they have written pending changes.
+        """
+        if not self.processes:
+            return
+        self._scatter("close", {shard: () for shard in range(self.shards)})
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.processes = []
+        log_info(f"Stopped {self.shards} library shards.")
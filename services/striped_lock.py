@@ -0,0 +1,71 @@
+import contextlib
+import threading
+
+
+class StripedLock:
+    """
+    A fixed set of locks shared by all books, picked by the hash of a book's (title, author) key.
+
+    Operations on books in different stripes run concurrently and operations on
+    the same book are serialized, without keeping a lock per book. Several
+    stripes are always acquired in index order, so holding multiple stripes
+    cannot deadlock.
+    """
+
+    def __init__(self, stripes: int = 64):
+        """
+        Initializes the locks.
+
+        Args:
+            stripes (int): Number of locks.
+        """
+        self._locks = [threading.Lock() for _ in range(max(int(stripes), 1))]
+
+    def __len__(self):
+        return len(self._locks)
+
+    def stripe_of(self, key) -> int:
+        """
+        Returns the index of the lock that guards a key.
+
+        Args:
+            key (tuple): The book's (title, author) key.
+        """
+        return hash(key) % len(self._locks)
+
+    def for_key(self, key):
+        """
+        Returns the lock that guards a key.
+
+        Args:
+            key (tuple): The book's (title, author) key.
+
+        Returns:
+            threading.Lock: The lock.
+        """
+        return self._locks[self.stripe_of(key)]
+
+    @contextlib.contextmanager
+    def holding(self, keys):
+        """
+        Holds the locks of several keys, e.g. for a batch operation.
+
+        Args:
+            keys (iterable): (title, author) keys.
+        """
+        stripes = sorted({self.stripe_of(key) for key in keys})
+        with contextlib.ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._locks[stripe])
+            yield
+
+    @contextlib.contextmanager
+    def holding_all(self):
+        """
+        Holds every lock, for operations that change the catalog's structure
+        such as adding or removing a book.
+        """
+        with contextlib.ExitStack() as stack:
+            for lock in self._locks:
+                stack.enter_context(lock)
+            yield
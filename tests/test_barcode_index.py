@@ -0,0 +1,56 @@
+import unittest
+import os
+from data.barcode_index import BarcodeIndex
+
+
+class TestBarcodeIndex(unittest.TestCase):
+    TEST_FILE = "test_index.barcodes"
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_assign_lookup_and_remove(self):
+        index = BarcodeIndex()
+        self.assertEqual(index.assign("Dune", "Frank Herbert", 2), ["0000000000", "0000000001"])
+        self.assertEqual(index.assign("Emma", "Jane Austen", 1), ["0000000002"])
+        # Only copies without a barcode get one
+        self.assertEqual(index.assign("Dune", "Frank Herbert", 3), ["0000000003"])
+
+        self.assertEqual(index.lookup("0000000003"), ("Dune", "Frank Herbert", 3))
+        self.assertEqual(index.barcodes_of("Dune", "Frank Herbert"), ["0000000000", "0000000001", "0000000003"])
+        self.assertIsNone(index.lookup("0000000004"))
+        self.assertIsNone(index.lookup("not a barcode"))
+
+        self.assertTrue(index.remove("Dune", "Frank Herbert"))
+        self.assertIsNone(index.lookup("0000000000"))
+        self.assertEqual(len(index), 1)
+        # Barcodes are never reused
+        self.assertEqual(index.assign("Dune", "Frank Herbert", 1), ["0000000004"])
+
+    def test_copy_ids_beyond_sixteen_bits(self):
+        index = BarcodeIndex()
+        barcodes = index.assign("Atlas", "Various", 70000)
+        self.assertEqual(index.lookup(barcodes[-1]), ("Atlas", "Various", 70000))
+        self.assertEqual(index.lookup(barcodes[65536]), ("Atlas", "Various", 65537))
+
+    def test_log_survives_reload_and_compaction(self):
+        index = BarcodeIndex.load(self.TEST_FILE)
+        index.assign_many([(("Dune, Part 1", "Frank Herbert"), 2), (("Emma", "Jane Austen"), 1)])
+        index.assign("Emma", "Jane Austen", 2)
+        index.remove("Dune, Part 1", "Frank Herbert")
+
+        loaded = BarcodeIndex.load(self.TEST_FILE)
+        self.assertEqual(loaded.barcodes_of("Emma", "Jane Austen"), ["0000000002", "0000000003"])
+        self.assertIsNone(loaded.lookup("0000000001"))
+        self.assertEqual(loaded.retired, 4)
+
+        loaded.compact()
+        compacted = BarcodeIndex.load(self.TEST_FILE)
+        self.assertEqual(compacted.lookup("0000000003"), ("Emma", "Jane Austen", 2))
+        self.assertEqual((len(compacted), compacted.retired), (2, 0))
+        self.assertEqual(compacted.assign("Dune", "Frank Herbert", 1), ["0000000004"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import pickle
+from models.book import Book
+
+
+class TestBook(unittest.TestCase):
+    def setUp(self):
+        self.book = Book("Clean Code", "Robert C. Martin", "Programming", 2008, 3)
+
+    def test_slots(self):
+        self.assertFalse(hasattr(self.book, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.book.category = "Programming"
+
+    def test_borrow_and_return_keep_available(self):
+        self.assertEqual(self.book.available, 3)
+        self.assertEqual(self.book.borrow("user1"), "Copy 1 loaned successfully.")
+        self.assertEqual(self.book.borrow("user2"), "Copy 2 loaned successfully.")
+        self.assertEqual(self.book.available, 1)
+
+        self.assertEqual(self.book.return_copy(1), "Copy 1 returned successfully.")
+        self.assertEqual(self.book.return_copy(1), "Copy 1 was not loaned.")
+        self.assertEqual(self.book.return_copy(7), "Copy 7 was not loaned.")
+        self.assertEqual(self.book.available, 2)
+        self.assertEqual(self.book.is_loaned, {1: "no", 2: "yes", 3: "no"})
+
+    def test_is_loaned_view_updates_state(self):
+        self.book.is_loaned[3] = "yes"
+        self.assertEqual(self.book.available, 2)
+        self.assertEqual(list(self.book.is_loaned.items()), [(1, "no"), (2, "no"), (3, "yes")])
+        with self.assertRaises(KeyError):
+            self.book.is_loaned[4] = "yes"
+
+        self.book.copies = 5
+        self.assertEqual(self.book.available, 4)
+        self.book.copies = 2
+        self.assertEqual(self.book.available, 2)
+        self.assertEqual(str(self.book.is_loaned), "{1: 'no', 2: 'no'}")
+
+    def test_waiting_list_when_all_loaned(self):
+        book = Book("Dune", "Frank Herbert", "Fiction", 1965, 1, is_loaned_status="yes")
+        self.assertEqual(book.available, 0)
+        self.assertEqual(book.borrow("user1"), "Added to waiting list.")
+        self.assertEqual(book.waiting_list, ["user1"])
+
+    def test_first_free_and_loaned_copy(self):
+        book = Book("Reference", "Editors", "Reference", 2020, 500)
+        for copy_id in range(1, 301):
+            book.is_loaned[copy_id] = "yes"
+        self.assertEqual(book.first_free_copy(), 301)
+        self.assertEqual(book.first_loaned_copy(), 1)
+
+        book.return_copy(120)
+        self.assertEqual(book.borrow("user1"), "Copy 120 loaned successfully.")
+        self.assertEqual(book.borrow("user2"), "Copy 301 loaned successfully.")
+
+        full = Book("Dune", "Frank Herbert", "Fiction", 1965, 2, is_loaned_status="yes")
+        self.assertIsNone(full.first_free_copy())
+        self.assertIsNone(self.book.first_loaned_copy())
+
+    def test_dict_round_trip(self):
+        self.book.borrow("user1")
+        data = self.book.to_dict()
+        self.assertIs(type(data["is_loaned"]), dict)
+        self.assertEqual(data["is_loaned"], {1: "yes", 2: "no", 3: "no"})
+
+        copy = Book.from_dict(data)
+        self.assertEqual(copy.to_dict(), data)
+        self.assertEqual(copy.available, 2)
+        self.assertEqual(pickle.loads(pickle.dumps(copy)).to_dict(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import os
 import pandas as pd
 from data.books import (
     DataManager,
@@ -8,7 +9,11 @@ from data.books import (
     save_books_to_file,
     row_to_book,
     update_book_in_dataframe,
+    derive_book_columns,
+    derive_loan_counters,
 )
+from data.cache import clear_cache
+from data.schema import apply_schema, new_book_row
 from models.book import Book
 
 
@@ -26,6 +31,12 @@ class TestBooksFunctions(unittest.TestCase):
         cls.data_manager = DataManager.get_instance()
         cls.data_manager.initialize_data(cls.sample_data)
 
+    @classmethod
+    def tearDownClass(cls):
+        clear_cache(cls.file_path)
+        if os.path.exists(cls.file_path):
+            os.remove(cls.file_path)
+
     def test_adjust_is_loaned(self):
         """Test if the adjust_is_loaned function properly adjusts the dictionary."""
         row = {"copies": 4, "is_loaned": {1: "no", 2: "yes"}}
@@ -98,6 +109,51 @@ class TestBooksFunctions(unittest.TestCase):
         self.assertEqual(updated_row["borrow_count"], 5)
         self.assertEqual(updated_row["is_loaned"], {1: "yes", 2: "no", 3: "no"})
 
+    def test_derive_loan_counters(self):
+        """Test the vectorized derivation of the counters on load and on a slice."""
+        books_df = derive_book_columns(pd.DataFrame([
+            {"title": "Book1", "copies": 3, "is_loaned": "YNY", "waiting_list": "['User1', 'User2']"},
+            {"title": "Book2", "copies": 2, "is_loaned": "no", "waiting_list": "[]"},
+        ]))
+        self.assertEqual(books_df["available"].tolist(), [1, 2])
+        self.assertEqual(books_df["borrow_count"].tolist(), [2, 0])
+        self.assertEqual(books_df["popularity_score"].tolist(), [4, 0])
+        self.assertEqual(books_df.iloc[0]["waiting_list"], ["User1", "User2"])
+
+        books_df.at[1, "is_loaned"] = "YY"
+        books_df.at[1, "borrow_count"] = 7
+        derive_loan_counters(books_df, [1], reset_borrow_count=False)
+        self.assertEqual(books_df["available"].tolist(), [1, 0])
+        self.assertEqual(books_df["borrow_count"].tolist(), [2, 7])
+        self.assertEqual(books_df["popularity_score"].tolist(), [4, 7])
+
+    def test_row_position_index(self):
+        """Test that the (title, author) row index follows appends and deletions."""
+        self.addCleanup(self.data_manager.initialize_data, self.data_manager.get_data())
+        books_df = apply_schema(derive_book_columns(pd.DataFrame([
+            {"title": "Book1", "author": "Author1", "copies": 1, "is_loaned": "no", "genre": "Fiction", "year": 2001},
+            {"title": "Book1", "author": "Author2", "copies": 1, "is_loaned": "no", "genre": "Fiction", "year": 2002},
+            {"title": "Book2", "author": "Author2", "copies": 2, "is_loaned": "no", "genre": "Drama", "year": 2010},
+        ])))
+        self.data_manager.initialize_data(books_df)
+        self.assertEqual(self.data_manager.get_row_position("Book1", "Author2"), 1)
+        self.assertIsNone(self.data_manager.get_row_position("Book1", "Author3"))
+
+        self.data_manager.append_rows(new_book_row("Book3", "Author3", "Poetry", 2020, 1))
+        self.assertTrue(self.data_manager.remove_row("Book1", "Author1"))
+        self.assertFalse(self.data_manager.remove_row("Book1", "Author1"))
+        data = self.data_manager.get_data()
+        for title, author in zip(data["title"], data["author"]):
+            position = self.data_manager.get_row_position(title, author)
+            self.assertEqual((data.iloc[position]["title"], data.iloc[position]["author"]), (title, author))
+        self.assertEqual(self.data_manager.get_row_position("Book3", "Author3"), 2)
+
+        book = row_to_book(data.iloc[0].to_dict())
+        book.is_loaned = {1: "yes"}
+        update_book_in_dataframe(book)
+        self.assertEqual(self.data_manager.get_data().iloc[0]["is_loaned"], "Y")
+        self.assertEqual(self.data_manager.get_data().iloc[1]["is_loaned"], "NN")
+
     def test_edge_cases(self):
         """Test edge cases for the functions."""
         # Test adjust_is_loaned with empty is_loaned and copies=0
@@ -0,0 +1,69 @@
+import unittest
+import os
+import pickle
+from unittest import mock
+import pandas as pd
+import data.books
+from data.books import load_books_from_file, save_books_to_file
+from data.cache import cache_path_for, clear_cache
+
+
+class TestCatalogCache(unittest.TestCase):
+    TEST_FILE = "test_cache_books.csv"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file without a cache.
+        """
+        pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 2, "is_loaned": "YN"},
+            {"title": "Dune", "author": "Frank Herbert", "genre": "Fiction", "year": 1965, "copies": 1, "is_loaned": "no"},
+        ]).to_csv(self.TEST_FILE, index=False)
+        clear_cache(self.TEST_FILE)
+
+    def tearDown(self):
+        clear_cache(self.TEST_FILE)
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_second_load_skips_parsing(self):
+        expected = load_books_from_file(self.TEST_FILE).copy()
+        self.assertTrue(os.path.exists(cache_path_for(self.TEST_FILE)))
+
+        with mock.patch.object(data.books, "_parse_csv", side_effect=AssertionError("parsed again")):
+            cached = load_books_from_file(self.TEST_FILE)
+        pd.testing.assert_frame_equal(cached, expected)
+
+    def test_changed_file_invalidates_cache(self):
+        load_books_from_file(self.TEST_FILE)
+        books_df = pd.read_csv(self.TEST_FILE)
+        books_df.loc[1, "is_loaned"] = "Y"
+        books_df.to_csv(self.TEST_FILE, index=False)
+
+        reloaded = load_books_from_file(self.TEST_FILE)
+        self.assertEqual(reloaded.iloc[1]["is_loaned"], "Y")
+        self.assertEqual(reloaded.iloc[1]["available"], 0)
+
+    def test_save_invalidates_cache(self):
+        books_df = load_books_from_file(self.TEST_FILE)
+        books_df.at[1, "is_loaned"] = "Y"
+        save_books_to_file(self.TEST_FILE)
+
+        self.assertEqual(load_books_from_file(self.TEST_FILE).iloc[1]["is_loaned"], "Y")
+
+    def test_cache_never_runs_code(self):
+        os.makedirs(os.path.dirname(cache_path_for(self.TEST_FILE)), exist_ok=True)
+        with open(cache_path_for(self.TEST_FILE), "wb") as handle:
+            pickle.dump(print, handle)
+
+        # A cache that is not a snapshot is ignored and the file is parsed again
+        books_df = load_books_from_file(self.TEST_FILE)
+        self.assertEqual(books_df["title"].tolist(), ["Clean Code", "Dune"])
+
+    def test_cache_can_be_disabled(self):
+        load_books_from_file(self.TEST_FILE, use_cache=False)
+        self.assertFalse(os.path.exists(cache_path_for(self.TEST_FILE)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+import numpy as np
+import pandas as pd
+from data.books import DataManager, derive_book_columns
+from data.catalog_store import CatalogStore
+from data.schema import apply_schema
+from models.book import Book
+
+
+class TestCatalogStore(unittest.TestCase):
+    def setUp(self):
+        """
+        Set up a store from a small derived catalog.
+        """
+        self.books_df = apply_schema(derive_book_columns(pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "is_loaned": "YN", "copies": 2,
+             "genre": "Programming", "year": 2008},
+            {"title": "Dune", "author": "Frank Herbert", "is_loaned": "Y", "copies": 1, "genre": "Fiction", "year": 1965},
+            {"title": "Emma", "author": "Jane Austen", "is_loaned": "no", "copies": 3, "genre": "Fiction", "year": 1815},
+        ])))
+        self.store = CatalogStore.from_frame(self.books_df)
+
+    def test_round_trip_shares_numeric_columns(self):
+        books_df = self.store.to_frame()
+        pd.testing.assert_frame_equal(books_df, self.books_df)
+        self.assertTrue(np.shares_memory(books_df["copies"].to_numpy(), self.store.copies))
+        self.assertEqual(list(self.store.offsets[:3]), [0, 2, 3])
+        self.assertEqual(self.store.flag_size, 6)
+
+    def test_views_write_to_the_store(self):
+        book = self.store.get("Emma", "Jane Austen")
+        self.assertEqual(book.borrow("user1"), "Copy 1 loaned successfully.")
+        self.assertEqual(book.available, 2)
+
+        full = self.store.get("Dune", "Frank Herbert")
+        self.assertIsNone(full.first_free_copy())
+        self.assertEqual(full.borrow("user2"), "Added to waiting list.")
+        self.assertEqual(full.return_copy(1), "Copy 1 returned successfully.")
+
+        row = self.store.to_frame().set_index("title")
+        self.assertEqual(row.at["Emma", "is_loaned"], "YNN")
+        self.assertEqual(row.at["Emma", "borrow_count"], 1)
+        self.assertEqual(row.at["Dune", "available"], 1)
+        self.assertEqual(row.at["Dune", "waiting_list"], ["user2"])
+
+    def test_growing_copies_moves_the_flag_block(self):
+        book = self.store.get("Clean Code", "Robert C. Martin")
+        book.copies = 4
+        self.assertEqual(self.store.offsets[0], 6)
+        self.assertEqual(book.is_loaned, {1: "yes", 2: "no", 3: "no", 4: "no"})
+        self.assertEqual(self.store.get("Dune", "Frank Herbert").is_loaned, {1: "yes"})
+
+    def test_first_copy_matches_a_scan_of_the_flags(self):
+        rng = np.random.default_rng(3)
+        position = self.store.append("Ulysses", "James Joyce", "Fiction", 1922, 40)
+        for _ in range(2000):
+            copies = int(self.store.copies[position])
+            action = rng.integers(10)
+            if action == 0:
+                self.store.set_copies(position, int(rng.integers(1, 60)))
+            elif action < 5:
+                copy_id = self.store.first_copy(position, loaned=False)
+                if copy_id is not None:
+                    self.store.set_loaned(position, copy_id, True)
+            else:
+                self.store.set_loaned(position, int(rng.integers(1, copies + 1)), bool(rng.integers(2)))
+            flags = self.store.loan_flags[self.store.offsets[position]:][:int(self.store.copies[position])]
+            for loaned in (False, True):
+                expected = np.flatnonzero(flags == loaned)
+                self.assertEqual(self.store.first_copy(position, loaned),
+                                 int(expected[0]) + 1 if len(expected) else None)
+
+    def test_append_remove_and_data_manager(self):
+        data_manager = DataManager.get_instance()
+        self.addCleanup(data_manager.initialize_data, data_manager.get_data())
+        self.addCleanup(data_manager.detach_store)
+        data_manager.attach_store(self.store)
+
+        self.store.append_book(Book("Ulysses", "James Joyce", "Fiction", 1922, 2, is_loaned_status="yes"))
+        self.assertTrue(self.store.remove("Dune", "Frank Herbert"))
+        self.assertFalse(self.store.remove("Dune", "Frank Herbert"))
+        books_df = data_manager.get_data()
+        self.assertEqual(books_df["title"].tolist(), ["Clean Code", "Emma", "Ulysses"])
+        self.assertEqual(books_df["is_loaned"].tolist(), ["YN", "NNN", "YY"])
+        self.assertEqual(data_manager.get_row_position("Ulysses", "James Joyce"), 2)
+        self.assertIs(data_manager.get_data(), books_df)
+
+    def test_data_manager_follows_the_store_row_by_row(self):
+        data_manager = DataManager.get_instance()
+        self.addCleanup(data_manager.initialize_data, data_manager.get_data())
+        self.addCleanup(data_manager.detach_store)
+        data_manager.attach_store(self.store)
+        self.assertEqual(data_manager.get_row_position("Dune", "Frank Herbert"), 1)
+        books_df = data_manager.get_data()
+
+        self.store.get("Emma", "Jane Austen").borrow("user1")
+        self.store.get("Dune", "Frank Herbert").borrow("user2")
+        self.assertIs(data_manager.get_data(), books_df)
+        self.assertEqual(books_df["is_loaned"].tolist(), ["YN", "Y", "YNN"])
+        self.assertEqual(books_df.at[1, "waiting_list"], ["user2"])
+
+        self.store.append_book(Book("Ulysses", "James Joyce", "Fiction", 1922, 2))
+        self.store.remove("Clean Code", "Robert C. Martin")
+        self.store.get("Ulysses", "James Joyce").borrow("user3")
+        pd.testing.assert_frame_equal(data_manager.get_data(), self.store.to_frame(), check_categorical=False)
+        self.assertEqual(data_manager.get_row_position("Ulysses", "James Joyce"), 2)
+
+    def test_compact_keeps_views_and_the_frame(self):
+        data_manager = DataManager.get_instance()
+        self.addCleanup(data_manager.initialize_data, data_manager.get_data())
+        self.addCleanup(data_manager.detach_store)
+        data_manager.attach_store(self.store)
+        emma = self.store.get("Emma", "Jane Austen")
+        dune = self.store.get("Dune", "Frank Herbert")
+        self.store.get("Clean Code", "Robert C. Martin").copies = 4
+        self.store.remove("Dune", "Frank Herbert")
+        books_df = data_manager.get_data()
+        self.assertTrue(self.store.needs_compaction())
+
+        data_manager.compact_store()
+        self.assertFalse(self.store.needs_compaction())
+        self.assertEqual(self.store.flag_size, 7)
+        self.assertEqual(list(self.store.offsets[:2]), [0, 4])
+        self.assertIs(self.store.get("Emma", "Jane Austen"), emma)
+        self.assertEqual(emma.borrow("user1"), "Copy 1 loaned successfully.")
+        self.assertEqual(dune.is_loaned, {1: "yes"})
+        self.assertIsNone(self.store.get("Dune", "Frank Herbert"))
+
+        self.assertIs(data_manager.get_data(), books_df)
+        self.assertEqual(books_df["is_loaned"].tolist(), ["YNNN", "YNN"])
+        pd.testing.assert_frame_equal(books_df, self.store.to_frame(), check_categorical=False)
+
+    def test_initialize_data_copies_rows_back_into_an_attached_store(self):
+        data_manager = DataManager.get_instance()
+        self.addCleanup(data_manager.initialize_data, data_manager.get_data())
+        self.addCleanup(data_manager.detach_store)
+        data_manager.attach_store(self.store)
+        books_df = data_manager.get_data()
+
+        # As the books window does: change the row, then hand the DataFrame back
+        books_df.at[2, "is_loaned"] = "NYN"
+        books_df.at[2, "available"] = 2
+        data_manager.initialize_data(books_df, rows=[2])
+        self.assertEqual(self.store.get("Emma", "Jane Austen").is_loaned, {1: "no", 2: "yes", 3: "no"})
+        with self.assertRaises(ValueError):
+            data_manager.initialize_data(books_df.copy())
+        self.assertIs(data_manager.store, self.store)
+
+if __name__ == "__main__":
+    unittest.main()
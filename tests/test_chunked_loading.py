@@ -0,0 +1,49 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file
+
+
+class TestChunkedLoading(unittest.TestCase):
+    TEST_FILE = "test_chunked_books.csv"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file with more rows than a single chunk.
+        """
+        pd.DataFrame([
+            {"title": f"Book{i}", "author": f"Author{i % 3}", "genre": "Fiction", "year": 1990 + i,
+             "copies": 1 + i % 4, "is_loaned": "Y" * (i % 3)}
+            for i in range(23)
+        ]).to_csv(self.TEST_FILE, index=False)
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_chunked_matches_single_pass(self):
+        expected = load_books_from_file(self.TEST_FILE, use_cache=False).copy()
+        for chunksize in (1, 5, 23, 100):
+            books_df = load_books_from_file(self.TEST_FILE, chunksize=chunksize, use_cache=False)
+            pd.testing.assert_frame_equal(books_df, expected)
+
+    def test_chunked_initializes_data_manager(self):
+        books_df = load_books_from_file(self.TEST_FILE, chunksize=4, use_cache=False)
+        self.assertIs(DataManager.get_instance().get_data(), books_df)
+        self.assertEqual(len(books_df), 23)
+        self.assertEqual(books_df.iloc[5]["is_loaned"], "YY")
+        self.assertEqual(books_df.iloc[5]["available"], 0)
+
+    def test_chunked_widens_column_types(self):
+        books_df = pd.read_csv(self.TEST_FILE)
+        books_df.loc[20, "year"] = None
+        books_df.to_csv(self.TEST_FILE, index=False)
+
+        chunked = load_books_from_file(self.TEST_FILE, chunksize=5, use_cache=False)
+        self.assertEqual(str(chunked["year"].dtype), "Int16")
+        self.assertTrue(pd.isna(chunked.iloc[20]["year"]))
+        self.assertEqual(chunked.iloc[0]["year"], 1990)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file
+from data.cache import clear_cache
+from data.journal import BookJournal
+from models.book import Book
+from services.library_manager import LibraryManager
+
+
+class TestBookJournal(unittest.TestCase):
+    TEST_FILE = "test_journal_books.csv"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file and a LibraryManager in journal mode.
+        """
+        self.books_data = pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 2, "is_loaned": "no"},
+            {"title": "Refactoring", "author": "Martin Fowler", "genre": "Programming", "year": 1999, "copies": 1, "is_loaned": "no"},
+        ])
+        self.books_data.to_csv(self.TEST_FILE, index=False)
+        self.journal_path = BookJournal.path_for(self.TEST_FILE)
+        self.library_manager = LibraryManager(self.TEST_FILE, use_journal=True, checkpoint_interval=100)
+
+    def tearDown(self):
+        DataManager.get_instance().disable_journal()
+        clear_cache(self.TEST_FILE)
+        for path in (self.TEST_FILE, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_borrow_appends_record_without_rewriting_file(self):
+        mtime = os.path.getmtime(self.TEST_FILE)
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+
+        records = BookJournal(self.journal_path).read_records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["op"], BookJournal.PUT)
+        self.assertEqual(records[0]["row"]["borrow_count"], 1)
+        self.assertEqual(os.path.getmtime(self.TEST_FILE), mtime)
+
+    def test_replay_on_startup(self):
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+        self.library_manager.add_book(Book("Code Complete", "Steve McConnell", "Programming", 2004, 3))
+        self.library_manager.remove_book("Refactoring", "Martin Fowler")
+
+        books_df = load_books_from_file(self.TEST_FILE)
+        self.assertEqual(sorted(books_df["title"]), ["Clean Code", "Code Complete"])
+        row = books_df[books_df["title"] == "Clean Code"].iloc[0]
+        self.assertEqual(row["is_loaned"], "YN")
+        self.assertEqual(row["available"], 1)
+
+    def test_books_added_to_an_empty_catalog_are_replayed(self):
+        self.books_data.head(0).to_csv(self.TEST_FILE, index=False)
+        journal = BookJournal(self.journal_path)
+        journal.append_put({"title": "Code Complete", "author": "Steve McConnell", "genre": "Programming",
+                            "year": 2004, "copies": 2, "is_loaned": "YN", "waiting_list": [], "borrow_count": 1})
+        journal.close()
+
+        books_df = load_books_from_file(self.TEST_FILE, use_cache=False)
+        self.assertEqual(books_df["title"].tolist(), ["Code Complete"])
+        self.assertEqual(books_df.iloc[0]["available"], 1)
+
+    def test_checkpoint_folds_journal_into_file(self):
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+        self.library_manager.checkpoint()
+
+        self.assertFalse(os.path.exists(self.journal_path))
+        df = pd.read_csv(self.TEST_FILE)
+        self.assertEqual(df[df["title"] == "Clean Code"].iloc[0]["borrow_count"], 1)
+
+    def test_periodic_checkpoint(self):
+        self.library_manager = LibraryManager(self.TEST_FILE, use_journal=True, checkpoint_interval=2)
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+        self.assertTrue(os.path.exists(self.journal_path))
+
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user2")
+        self.assertFalse(os.path.exists(self.journal_path))
+        df = pd.read_csv(self.TEST_FILE)
+        self.assertEqual(df[df["title"] == "Clean Code"].iloc[0]["available"], 0)
+
+    def test_torn_last_record_is_ignored(self):
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+        with open(self.journal_path, "a", encoding="utf-8") as handle:
+            handle.write('{"op":"put","row":{"title"')
+
+        records = BookJournal(self.journal_path).read_records()
+        self.assertEqual(len(records), 1)
+
+    def test_records_after_a_torn_tail_are_replayed(self):
+        journal = BookJournal(self.journal_path)
+        journal.append({"n": 1})
+        journal.close()
+        with open(self.journal_path, "a", encoding="utf-8") as handle:
+            handle.write('{"op":"put","row":{"title"')
+
+        journal = BookJournal(self.journal_path)
+        journal.append({"n": 2})
+        journal.append({"n": 3})
+        journal.close()
+        self.assertEqual(BookJournal(self.journal_path).read_records(), [{"n": 1}, {"n": 2}, {"n": 3}])
+
+        # A restart in journal mode cuts the torn tail off before new mutations are journaled
+        with open(self.journal_path, "a", encoding="utf-8") as handle:
+            handle.write('{"op":"put","row":{"title"')
+        DataManager.get_instance().enable_journal(self.TEST_FILE)
+        self.library_manager.borrow_book("Clean Code", "Robert C. Martin", "user1")
+        records = BookJournal(self.journal_path).read_records()
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[-1]["row"]["title"], "Clean Code")
+
+
+if __name__ == "__main__":
+    unittest.main()
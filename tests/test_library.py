@@ -1,7 +1,14 @@
 import unittest
 import os
+import threading
 import pandas as pd
+from unittest import mock
+import services.library_manager
+from data.books import DataManager
+from data.cache import clear_cache
+from data.schema import MAX_COPIES, new_book_row
 from models.book import Book
+from models.search_strategy import SearchByKeywords
 from services.library_manager import LibraryManager
 
 class TestLibraryManager(unittest.TestCase):
@@ -19,8 +26,10 @@ class TestLibraryManager(unittest.TestCase):
         self.library_manager = LibraryManager(self.TEST_FILE)
 
     def tearDown(self):
-        if os.path.exists(self.TEST_FILE):
-            os.remove(self.TEST_FILE)
+        clear_cache(self.TEST_FILE)
+        for path in (self.TEST_FILE, f"{self.TEST_FILE}.loans", f"{self.TEST_FILE}.loans.journal", f"{self.TEST_FILE}.ledger.npz", f"{self.TEST_FILE}.barcodes"):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_add_book(self):
         new_book = Book("Code Complete", "Steve McConnell", "Programming", 2004, 3)
@@ -29,6 +38,15 @@ class TestLibraryManager(unittest.TestCase):
         df = pd.read_csv(self.TEST_FILE)
         self.assertIn("Code Complete", df["title"].values)
 
+    def test_copies_beyond_the_limit_are_rejected(self):
+        self.assertFalse(self.library_manager.add_book(Book("Atlas", "Various", "Reference", 2000, MAX_COPIES + 1)))
+        clean_code = Book("Clean Code", "Robert C. Martin", "Programming", 2008, 1)
+        self.assertFalse(self.library_manager.add_book(clean_code, additional_copies=MAX_COPIES))
+        self.assertEqual(self.library_manager.get_book("Clean Code", "Robert C. Martin").copies, 2)
+        self.assertEqual(self.library_manager.add_books([(clean_code, MAX_COPIES), (clean_code, 1)]), [False, True])
+        self.assertIsNone(self.library_manager.get_book("Atlas", "Various"))
+        self.assertEqual(self.library_manager.get_book("Clean Code", "Robert C. Martin").copies, 3)
+
     def test_borrow_book(self):
         result = self.library_manager.borrow_book("Clean Code", "Robert C. Martin")
         self.assertTrue(result)
@@ -48,5 +66,246 @@ class TestLibraryManager(unittest.TestCase):
         df = pd.read_csv(self.TEST_FILE)
         self.assertNotIn("Clean Code", df["title"].values)
 
+    def test_index_follows_add_and_remove(self):
+        self.assertIs(self.library_manager.get_book("Clean Code", "Robert C. Martin"), self.library_manager.books[0])
+        self.assertIsNone(self.library_manager.get_book("Clean Code", "Someone Else"))
+
+        self.library_manager.add_book(Book("Code Complete", "Steve McConnell", "Programming", 2004, 3))
+        self.assertEqual(self.library_manager.get_book("Code Complete", "Steve McConnell").copies, 3)
+        self.assertEqual(self.library_manager.get_decorator("Code Complete", "Steve McConnell").get_borrow_count("Code Complete"), 0)
+
+        self.library_manager.remove_book("Code Complete", "Steve McConnell")
+        self.assertIsNone(self.library_manager.get_book("Code Complete", "Steve McConnell"))
+        self.assertIsNone(self.library_manager.get_decorator("Code Complete", "Steve McConnell"))
+        self.assertEqual([book.title for book in self.library_manager.books], ["Clean Code", "The Pragmatic Programmer"])
+
+    def test_checkpoint_compacts_the_catalog_store(self):
+        self.library_manager.add_book(Book("Code Complete", "Steve McConnell", "Programming", 2004, 3))
+        self.library_manager.remove_book("Clean Code", "Robert C. Martin")
+        book = self.library_manager.get_book("Code Complete", "Steve McConnell")
+        self.library_manager.checkpoint()
+
+        store = self.library_manager.store
+        self.assertFalse(store.needs_compaction())
+        self.assertEqual(len(store), store.size)
+        self.assertIs(self.library_manager.get_book("Code Complete", "Steve McConnell"), book)
+        self.assertTrue(self.library_manager.borrow_book("Code Complete", "Steve McConnell", "user1"))
+        self.assertEqual(pd.read_csv(self.TEST_FILE)["is_loaned"].tolist(), ["N", "YNN"])
+
+    def test_waiting_list_and_cancel_reservation(self):
+        title, author = "The Pragmatic Programmer", "Andrew Hunt"
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user1"))
+        self.assertFalse(self.library_manager.borrow_book(title, author, "user2"))
+        self.assertFalse(self.library_manager.borrow_book(title, author, "user3"))
+        self.assertFalse(self.library_manager.borrow_book(title, author, "user2"))
+        book = self.library_manager.get_book(title, author)
+        self.assertEqual(book.waiting_list, ["user2", "user3"])
+
+        self.assertTrue(self.library_manager.cancel_reservation(title, author, "user2"))
+        self.assertFalse(self.library_manager.cancel_reservation(title, author, "user2"))
+        self.assertEqual(book.popularity_score, 2)
+        self.assertTrue(self.library_manager.return_book(title, author))
+        self.assertEqual(len(book.waiting_list), 0)
+        self.assertEqual(pd.read_csv(self.TEST_FILE)["waiting_list"].tolist(), ["[]", "[]"])
+
+    def test_batch_operations_persist_and_notify_once(self):
+        notification_manager = self.library_manager.notification_manager
+        with mock.patch.object(services.library_manager, "persist_books", wraps=services.library_manager.persist_books) as persist, \
+                mock.patch.object(notification_manager, "notify_all") as notify_all, \
+                mock.patch.object(notification_manager, "notify_user") as notify_user:
+            results = self.library_manager.borrow_many([
+                ("Clean Code", "Robert C. Martin", "user1"),
+                ("Clean Code", "Robert C. Martin", "user2"),
+                ("Clean Code", "Robert C. Martin", "user3"),
+                ("The Pragmatic Programmer", "Andrew Hunt", "user1"),
+                ("The Pragmatic Programmer", "Andrew Hunt", "user4"),
+                ("Missing", "Nobody", "user1"),
+            ])
+            self.assertEqual(results, [True, True, False, True, False, False])
+            self.assertEqual(persist.call_count, 1)
+            notify_all.assert_called_once()
+
+            results = self.library_manager.return_many([
+                ("Clean Code", "Robert C. Martin"),
+                ("The Pragmatic Programmer", "Andrew Hunt"),
+                ("The Pragmatic Programmer", "Andrew Hunt"),
+            ])
+            self.assertEqual(results, [True, True, False])
+            self.assertEqual(persist.call_count, 2)
+            self.assertEqual(sorted(call.args[0] for call in notify_user.call_args_list), ["user3", "user4"])
+
+            results = self.library_manager.add_books([
+                Book("Code Complete", "Steve McConnell", "Programming", 2004, 3),
+                (Book("Clean Code", "Robert C. Martin", "Programming", 2008, 1), 2),
+            ])
+            self.assertEqual(results, [True, True])
+            self.assertEqual(persist.call_count, 3)
+            self.assertEqual(notify_all.call_count, 2)
+
+        df = pd.read_csv(self.TEST_FILE).set_index("title")
+        self.assertEqual(df.at["Clean Code", "is_loaned"], "NYNN")
+        self.assertEqual(df.at["The Pragmatic Programmer", "is_loaned"], "N")
+        self.assertEqual(df.at["Code Complete", "copies"], 3)
+
+    def test_failed_returns_say_why(self):
+        with mock.patch.object(services.library_manager, "log_error") as log_error:
+            results = self.library_manager.return_many([("Clean Code", "Robert C. Martin"), ("Missing", "Nobody")])
+            self.assertEqual(results, [False, False])
+            self.assertEqual([call.args[0] for call in log_error.call_args_list], [
+                "No loaned copy of 'Clean Code' by Robert C. Martin to return.",
+                "Book 'Missing' by Nobody not found in the library.",
+            ])
+            log_error.reset_mock()
+            self.assertFalse(self.library_manager.return_book("Clean Code", "Robert C. Martin"))
+            log_error.assert_called_once_with("No loaned copy of 'Clean Code' by Robert C. Martin to return.")
+
+    def test_thread_safe_mode_never_loans_a_copy_twice(self):
+        self.library_manager.add_book(Book("Reference", "Editors", "Reference", 2020, 120))
+        library_manager = LibraryManager(self.TEST_FILE, thread_safe=True, lock_stripes=4)
+        results = []
+
+        def desk(desk_id):
+            for i in range(20):
+                results.append(library_manager.borrow_book("Reference", "Editors", f"user{desk_id}-{i}"))
+                library_manager.borrow_book("Clean Code", "Robert C. Martin", f"user{desk_id}-{i}")
+                library_manager.return_book("Clean Code", "Robert C. Martin")
+
+        threads = [threading.Thread(target=desk, args=(desk_id,)) for desk_id in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        book = library_manager.get_book("Reference", "Editors")
+        self.assertEqual(results.count(True), 120)
+        self.assertEqual(list(book.is_loaned.values()).count("yes"), 120)
+        self.assertEqual(book.borrow_count, 120)
+        self.assertEqual(library_manager.get_book("Clean Code", "Robert C. Martin").available, 2)
+        self.assertEqual(pd.read_csv(self.TEST_FILE).set_index("title").at["Reference", "is_loaned"], "Y" * 120)
+    def test_targeted_returns_and_loans_of(self):
+        title, author = "Clean Code", "Robert C. Martin"
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user1"))
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user2"))
+        self.assertTrue(self.library_manager.borrow_book("The Pragmatic Programmer", "Andrew Hunt", "user2"))
+        self.assertEqual(self.library_manager.loans_of("user2"), [(title, author, 2), ("The Pragmatic Programmer", "Andrew Hunt", 1)])
+
+        self.assertTrue(self.library_manager.return_book(title, author, user_id="user2"))
+        self.assertEqual(self.library_manager.get_book(title, author).is_loaned, {1: "yes", 2: "no"})
+        self.assertFalse(self.library_manager.return_book(title, author, user_id="user2"))
+        self.assertFalse(self.library_manager.return_book(title, author, copy_id=2))
+        self.assertEqual(self.library_manager.return_many([("The Pragmatic Programmer", "Andrew Hunt", "user2")]), [True])
+        self.assertEqual(self.library_manager.loans_of("user2"), [])
+
+        # The registry survives a restart
+        self.library_manager.close()
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertEqual(restarted.loans_of("user1"), [(title, author, 1)])
+        self.assertTrue(restarted.return_book(title, author, copy_id=1))
+        self.assertEqual(restarted.loans_of("user1"), [])
+
+    def test_loans_survive_a_restart_without_checkpoint(self):
+        title, author = "Clean Code", "Robert C. Martin"
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user1"))
+        self.assertEqual(self.library_manager.borrow_many([(title, author, "user2"), ("The Pragmatic Programmer", "Andrew Hunt", "user2")]), [True, True])
+        self.assertTrue(self.library_manager.return_book(title, author, user_id="user1"))
+
+        # Neither checkpoint nor close is called, as in the GUI
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertEqual(restarted.loans_of("user1"), [])
+        self.assertEqual(restarted.loans_of("user2"), [(title, author, 2), ("The Pragmatic Programmer", "Andrew Hunt", 1)])
+        self.assertTrue(restarted.return_book(title, author, user_id="user2"))
+        self.assertEqual(LibraryManager(self.TEST_FILE).loans_of("user2"), [("The Pragmatic Programmer", "Andrew Hunt", 1)])
+
+        # A checkpoint folds the journal into the registry file
+        restarted.checkpoint()
+        self.assertFalse(os.path.exists(restarted.loan_journal.file_path))
+        self.assertEqual(LibraryManager(self.TEST_FILE).loans_of("user2"), [("The Pragmatic Programmer", "Andrew Hunt", 1)])
+
+    def test_barcode_index_is_written_on_first_use(self):
+        barcode_file = f"{self.TEST_FILE}.barcodes"
+        self.library_manager.add_book(Book("Code Complete", "Steve McConnell", "Programming", 2004, 2))
+        self.assertFalse(os.path.exists(barcode_file))
+
+        # Books added before the first use are labelled when the index is loaded
+        self.assertEqual(len(self.library_manager.barcodes_of("Code Complete", "Steve McConnell")), 2)
+        self.assertTrue(os.path.exists(barcode_file))
+
+    def test_checkout_and_return_by_barcode(self):
+        title, author = "Clean Code", "Robert C. Martin"
+        barcodes = self.library_manager.barcodes_of(title, author)
+        self.assertEqual(len(barcodes), 2)
+
+        self.assertTrue(self.library_manager.borrow_by_barcode(barcodes[1], "user1"))
+        self.assertFalse(self.library_manager.borrow_by_barcode(barcodes[1], "user2"))
+        self.assertFalse(self.library_manager.borrow_by_barcode("9999999999", "user2"))
+        self.assertEqual(self.library_manager.get_book(title, author).is_loaned, {1: "no", 2: "yes"})
+        self.assertEqual(self.library_manager.loans_of("user1"), [(title, author, 2)])
+
+        # New copies and books get barcodes; removed books lose theirs
+        self.library_manager.add_book(Book(title, author, "Programming", 2008, 1), additional_copies=1)
+        self.library_manager.add_books([Book("Code Complete", "Steve McConnell", "Programming", 2004, 2)])
+        self.assertEqual(len(self.library_manager.barcodes_of(title, author)), 3)
+        pragmatic = self.library_manager.barcodes_of("The Pragmatic Programmer", "Andrew Hunt")
+        self.assertTrue(self.library_manager.remove_book("The Pragmatic Programmer", "Andrew Hunt"))
+        self.assertFalse(self.library_manager.borrow_by_barcode(pragmatic[0], "user2"))
+
+        # The index is persistent
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertEqual(restarted.barcodes_of(title, author), self.library_manager.barcodes_of(title, author))
+        self.assertEqual(len(restarted.barcodes_of("Code Complete", "Steve McConnell")), 2)
+        self.assertTrue(restarted.return_by_barcode(barcodes[1]))
+        self.assertFalse(restarted.return_by_barcode(barcodes[1]))
+
+    def test_overdue_loans(self):
+        title, author = "Clean Code", "Robert C. Martin"
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user1"))
+        self.assertEqual(self.library_manager.borrow_many([(title, author, "user2"), ("The Pragmatic Programmer", "Andrew Hunt", "user1")]), [True, True])
+        due = self.library_manager.ledger.due_of(title, author, 1)
+
+        self.assertEqual(self.library_manager.overdue_counts(as_of=due - 1), {})
+        self.assertEqual(self.library_manager.overdue_counts(as_of=due + 15 * 86400), {"user1": 2, "user2": 1})
+        self.assertTrue(self.library_manager.return_book(title, author, user_id="user1"))
+        overdue = self.library_manager.overdue_loans(as_of=due + 15 * 86400)
+        self.assertEqual(sorted(overdue["user_id"]), ["user1", "user2"])
+
+        # Due dates survive a restart
+        self.library_manager.close()
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertEqual(restarted.overdue_counts(as_of=due + 15 * 86400), {"user1": 1, "user2": 1})
+
+    def test_loans_without_a_ledger_row_are_restored(self):
+        title, author = "Clean Code", "Robert C. Martin"
+        self.assertTrue(self.library_manager.borrow_book(title, author, "user1"))
+        due = self.library_manager.ledger.due_of(title, author, 1)
+
+        # Due dates are journaled with the loan
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertEqual(restarted.ledger.due_of(title, author, 1), due)
+
+        # A loan the catalog shows but the ledger lost is still reported overdue
+        os.remove(restarted.loan_journal.file_path)
+        restarted = LibraryManager(self.TEST_FILE)
+        self.assertIsNotNone(restarted.ledger.due_of(title, author, 1))
+        self.assertEqual(restarted.overdue_counts(as_of=due + 15 * 86400), {"unknown": 1})
+
+    def test_keyword_search_follows_the_catalog(self):
+        strategy = SearchByKeywords()
+        self.assertEqual(self.library_manager.search_books("prag", strategy)["title"].tolist(), ["The Pragmatic Programmer"])
+
+        # The index is updated as books are added and removed, without rebuilding it
+        index = DataManager.get_instance().get_search_index()
+        self.library_manager.add_book(Book("Programming Pearls", "Jon Bentley", "Programming", 1986, 1))
+        self.library_manager.remove_book("The Pragmatic Programmer", "Andrew Hunt")
+        self.assertIs(DataManager.get_instance().get_search_index(), index)
+        self.assertEqual(self.library_manager.search_books("prog", strategy)["title"].tolist(), ["Clean Code", "Programming Pearls"])
+
+        # Rows added directly to the DataFrame, as the books window does, are indexed too
+        data_manager = DataManager.get_instance()
+        data_manager.initialize_data(data_manager.get_data())
+        data_manager.get_search_index()
+        data_manager.append_rows(new_book_row("Pearls of Wisdom", "Anonymous", "Essays", 2001, 1))
+        self.assertEqual(SearchByKeywords().search(data_manager.get_data(), "pearls")["title"].tolist(),
+                         ["Programming Pearls", "Pearls of Wisdom"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+from datetime import datetime
+from data.loan_ledger import LoanLedger, SECONDS_PER_DAY
+
+
+class TestLoanLedger(unittest.TestCase):
+    TEST_FILE = "test_ledger.npz"
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_overdue_queries(self):
+        ledger = LoanLedger(capacity=2)
+        ledger.open("Dune", "Frank Herbert", 1, "user1", loaned_at=0, loan_days=14)
+        ledger.open("Dune", "Frank Herbert", 2, "user2", loaned_at=0, loan_days=7)
+        ledger.open("Emma", "Jane Austen", 1, "user1", loaned_at=0, loan_days=7)
+        self.assertEqual(ledger.due_of("Dune", "Frank Herbert", 1), 14 * SECONDS_PER_DAY)
+
+        overdue = ledger.overdue(as_of=10 * SECONDS_PER_DAY)
+        self.assertEqual(list(zip(overdue["title"], overdue["copy_id"], overdue["user_id"])),
+                         [("Dune", 2, "user2"), ("Emma", 1, "user1")])
+        self.assertEqual(ledger.overdue_counts(as_of=20 * SECONDS_PER_DAY), {"user1": 2, "user2": 1})
+        self.assertEqual(ledger.overdue_counts(as_of=datetime(1970, 1, 2)), {})
+
+        # Returned loans are no longer overdue and their rows are reused
+        self.assertEqual(ledger.close("Dune", "Frank Herbert", 2), "user2")
+        self.assertIsNone(ledger.close("Dune", "Frank Herbert", 2))
+        ledger.open("Emma", "Jane Austen", 2, "user3", loaned_at=0, loan_days=1)
+        self.assertEqual(ledger.size, 3)
+        self.assertEqual(ledger.overdue_counts(as_of=10 * SECONDS_PER_DAY), {"user1": 1, "user3": 1})
+
+    def test_save_and_load(self):
+        ledger = LoanLedger()
+        ledger.open("Dune, Part 1", "Frank Herbert", 1, "user1", loaned_at=0, loan_days=1)
+        ledger.open("Emma", "Jane Austen", 3, "user2", loaned_at=0, loan_days=30)
+        ledger.open("Emma", "Jane Austen", 4, "user2", loaned_at=0, loan_days=30)
+        ledger.close("Emma", "Jane Austen", 4)
+        ledger.save(self.TEST_FILE)
+
+        loaded = LoanLedger.load(self.TEST_FILE)
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.due_of("Emma", "Jane Austen", 3), 30 * SECONDS_PER_DAY)
+        self.assertEqual(loaded.overdue_counts(as_of=2 * SECONDS_PER_DAY), {"user1": 1})
+
+        reconciled = LoanLedger.load(self.TEST_FILE, is_loaned=lambda title, author, copy_id: title == "Emma")
+        self.assertEqual(reconciled.overdue_counts(as_of=40 * SECONDS_PER_DAY), {"user2": 1})
+        self.assertEqual(len(LoanLedger.load("missing.npz")), 0)
+
+    def test_user_ids_keep_their_type_across_a_save(self):
+        ledger = LoanLedger()
+        ledger.open("Dune", "Frank Herbert", 1, 42, loaned_at=0, loan_days=1)
+        self.assertEqual(ledger.overdue_counts(as_of=2 * SECONDS_PER_DAY), {"42": 1})
+        ledger.save(self.TEST_FILE)
+
+        loaded = LoanLedger.load(self.TEST_FILE)
+        self.assertEqual(loaded.overdue_counts(as_of=2 * SECONDS_PER_DAY), {"42": 1})
+        self.assertEqual(loaded.close("Dune", "Frank Herbert", 1), "42")
+
+    def test_copy_ids_beyond_sixteen_bits(self):
+        ledger = LoanLedger()
+        ledger.open("Atlas", "Various", 65537, "user1", loaned_at=0, loan_days=1)
+        ledger.open("Bible", "Various", 1, "user2", loaned_at=0, loan_days=30)
+        self.assertEqual(len(ledger), 2)
+        ledger.save(self.TEST_FILE)
+
+        loaded = LoanLedger.load(self.TEST_FILE)
+        self.assertEqual(loaded.due_of("Atlas", "Various", 65537), SECONDS_PER_DAY)
+        self.assertEqual(loaded.due_of("Bible", "Various", 1), 30 * SECONDS_PER_DAY)
+        self.assertEqual(loaded.overdue(as_of=2 * SECONDS_PER_DAY)["copy_id"].tolist(), [65537])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+from models.loan_registry import LoanRegistry
+
+
+class TestLoanRegistry(unittest.TestCase):
+    TEST_FILE = "test_registry.loans"
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_lookups_both_ways(self):
+        registry = LoanRegistry()
+        registry.record("user1", "Dune", "Frank Herbert", 2)
+        registry.record("user1", "Dune", "Frank Herbert", 1)
+        registry.record("user2", "Emma", "Jane Austen", 1)
+
+        self.assertEqual(registry.holder_of("Dune", "Frank Herbert", 1), "user1")
+        self.assertEqual(registry.copy_held_by("user1", "Dune", "Frank Herbert"), 2)
+        self.assertEqual(registry.loans_of("user1"), [("Dune", "Frank Herbert", 2), ("Dune", "Frank Herbert", 1)])
+        self.assertEqual(registry.loans_of("user3"), [])
+
+        self.assertEqual(registry.release("Dune", "Frank Herbert", 2), "user1")
+        self.assertIsNone(registry.release("Dune", "Frank Herbert", 2))
+        self.assertEqual(registry.copy_held_by("user1", "Dune", "Frank Herbert"), 1)
+
+        # A copy recorded again moves to its new holder
+        registry.record("user2", "Dune", "Frank Herbert", 1)
+        self.assertEqual(registry.loans_of("user1"), [])
+        self.assertEqual(len(registry), 2)
+
+    def test_save_and_load(self):
+        registry = LoanRegistry()
+        registry.record("user1", "Dune, Part 1", "Frank Herbert", 1)
+        registry.record("user2", "Emma", "Jane Austen", 3)
+        registry.save(self.TEST_FILE)
+
+        loaded = LoanRegistry.load(self.TEST_FILE)
+        self.assertEqual(loaded.loans_of("user1"), [("Dune, Part 1", "Frank Herbert", 1)])
+
+        reconciled = LoanRegistry.load(self.TEST_FILE, is_loaned=lambda title, author, copy_id: title == "Emma")
+        self.assertEqual(len(reconciled), 1)
+        self.assertEqual(len(LoanRegistry.load("missing.loans")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file, save_books_to_file
+from data.cache import clear_cache
+from data.loan_state import (
+    encode_is_loaned,
+    decode_is_loaned,
+    parse_loan_column,
+    loan_matrix,
+    find_copy,
+    with_copy_state,
+)
+
+
+class TestLoanState(unittest.TestCase):
+    TEST_FILE = "test_loan_state_books.csv"
+
+    def tearDown(self):
+        clear_cache(self.TEST_FILE)
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_encode_decode_round_trip(self):
+        is_loaned = {1: "yes", 2: "yes", 3: "no"}
+        self.assertEqual(encode_is_loaned(is_loaned), "YYN")
+        self.assertEqual(decode_is_loaned("YYN"), is_loaned)
+        self.assertEqual(encode_is_loaned({1: "yes"}, 3), "YNN")
+
+    def test_parse_mixed_formats(self):
+        values = ["YYN", "no", "Yes", "{1: 'yes', 3: 'yes'}", {2: "yes"}, float("nan")]
+        copies = [3, 2, 2, 4, 2, 1]
+        codes = parse_loan_column(values, copies)
+        self.assertEqual(list(codes), ["YYN", "NN", "YY", "YNYN", "NY", "N"])
+
+    def test_parse_adjusts_to_copies(self):
+        codes = parse_loan_column(["Y", "YYYY", "{1: 'yes', 5: 'yes'}"], [3, 2, 2])
+        self.assertEqual(list(codes), ["YNN", "YY", "YN"])
+
+    def test_parse_does_not_evaluate_text(self):
+        with self.assertRaises(ValueError):
+            parse_loan_column(["__import__('os').getcwd()"], [1])
+        with self.assertRaises(ValueError):
+            parse_loan_column(["{1: 'yes', 2: print('x')}"], [2])
+
+    def test_loan_matrix(self):
+        matrix = loan_matrix(["YN", "NNN", ""])
+        self.assertEqual(matrix.sum(axis=1).tolist(), [1, 0, 0])
+
+    def test_find_and_set_copy(self):
+        self.assertEqual(find_copy("YYN", loaned=False), 3)
+        self.assertEqual(find_copy("NNY", loaned=True), 3)
+        self.assertIsNone(find_copy("YY", loaned=False))
+        self.assertEqual(with_copy_state("YYN", 3, loaned=True), "YYY")
+        self.assertEqual(with_copy_state("YYN", 1, loaned=False), "NYN")
+
+    def test_file_round_trip_uses_compact_encoding(self):
+        pd.DataFrame([
+            {"title": "Book1", "author": "Author1", "copies": 3, "is_loaned": "{1: 'yes', 2: 'no', 3: 'yes'}", "genre": "Fiction", "year": 2001},
+            {"title": "Book2", "author": "Author2", "copies": 2, "is_loaned": "no", "genre": "Drama", "year": 2010},
+        ]).to_csv(self.TEST_FILE, index=False)
+
+        load_books_from_file(self.TEST_FILE)
+        save_books_to_file(self.TEST_FILE)
+        self.assertEqual(pd.read_csv(self.TEST_FILE)["is_loaned"].tolist(), ["YNY", "NN"])
+
+        books_df = load_books_from_file(self.TEST_FILE)
+        self.assertEqual(books_df.iloc[0]["is_loaned"], "YNY")
+        self.assertEqual(books_df["available"].tolist(), [1, 2])
+        self.assertIs(DataManager.get_instance().get_data(), books_df)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file, _csv_split_points
+
+
+class TestParallelLoading(unittest.TestCase):
+    TEST_FILE = "test_parallel_books.csv"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file whose rows differ in type from part to part.
+        """
+        books_df = pd.DataFrame([
+            {"title": str(1000 + i) if i < 40 else f"Book {i}", "author": f"Author{i % 7}", "genre": ("Fiction", "Drama")[i % 2],
+             "year": 1900 + i, "copies": 1 + i % 4, "is_loaned": ("Y" * (i % 3)) or "no"}
+            for i in range(120)
+        ])
+        books_df.loc[100, "year"] = None
+        books_df.to_csv(self.TEST_FILE, index=False)
+
+    def tearDown(self):
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_parallel_matches_serial(self):
+        expected = load_books_from_file(self.TEST_FILE, use_cache=False).copy()
+        for workers in (2, 3, 8):
+            books_df = load_books_from_file(self.TEST_FILE, use_cache=False, workers=workers)
+            pd.testing.assert_frame_equal(books_df, expected)
+        self.assertIs(DataManager.get_instance().get_data(), books_df)
+
+    def test_split_points_cover_file_at_line_boundaries(self):
+        header, ranges = _csv_split_points(self.TEST_FILE, 5)
+        with open(self.TEST_FILE, "rb") as handle:
+            content = handle.read()
+        self.assertEqual(header, content[:len(header)])
+        self.assertEqual(ranges[0][0], len(header))
+        self.assertEqual(ranges[-1][1], len(content))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(content[start - 1:start], b"\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
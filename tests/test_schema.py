@@ -0,0 +1,69 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file, save_books_to_file
+from data.catalog_store import CatalogStore
+from data.cache import clear_cache
+from data.schema import BOOKS_SCHEMA, apply_schema, concat_books, memory_usage, new_book_row
+
+
+class TestBooksSchema(unittest.TestCase):
+    TEST_FILE = "test_schema_books.csv"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file with repeated authors and genres.
+        """
+        pd.DataFrame([
+            {"title": f"Book{i}", "author": f"Author{i % 5}", "genre": ("Fiction", "Drama")[i % 2],
+             "year": 1950 + i, "copies": 2, "is_loaned": "YN" if i % 3 == 0 else "no"}
+            for i in range(200)
+        ]).to_csv(self.TEST_FILE, index=False)
+
+    def tearDown(self):
+        clear_cache(self.TEST_FILE)
+        if os.path.exists(self.TEST_FILE):
+            os.remove(self.TEST_FILE)
+
+    def test_loaded_frame_uses_schema(self):
+        books_df = load_books_from_file(self.TEST_FILE)
+        for column, dtype in BOOKS_SCHEMA.items():
+            self.assertEqual(books_df[column].dtype, dtype, column)
+        self.assertEqual(books_df.iloc[0]["is_loaned"], "YN")
+        self.assertEqual(books_df["available"].sum(), 200 * 2 - 67)
+
+    def test_schema_reduces_memory(self):
+        books_df = load_books_from_file(self.TEST_FILE)
+        wide_df = books_df.astype({
+            "author": object, "genre": object, "year": "int64", "copies": "int64",
+            "available": "int64", "borrow_count": "int64", "popularity_score": "int64",
+        })
+        self.assertLess(memory_usage(books_df), memory_usage(wide_df))
+        self.assertIs(apply_schema(books_df), books_df)
+
+    def test_concat_keeps_categories(self):
+        books_df = load_books_from_file(self.TEST_FILE)
+        books_df = concat_books(books_df, new_book_row("New Book", "New Author", "Poetry", 2020, 3))
+        self.assertEqual(books_df["author"].dtype, "category")
+        self.assertEqual(books_df["copies"].dtype, "uint32")
+        self.assertEqual(books_df.iloc[-1]["author"], "New Author")
+        self.assertEqual(books_df.iloc[-1]["is_loaned"], "NNN")
+        self.assertEqual(books_df.iloc[-1]["available"], 3)
+        self.assertEqual(books_df.iloc[-1]["waiting_list"], [])
+        self.assertIsNot(DataManager.get_instance().get_data(), books_df)
+
+    def test_negative_years_survive_a_save(self):
+        pd.DataFrame([
+            {"title": "The Odyssey", "author": "Homer", "genre": "Epic Poetry", "year": -800, "copies": 1},
+        ]).to_csv(self.TEST_FILE, index=False)
+        books_df = load_books_from_file(self.TEST_FILE, use_cache=False)
+        self.assertEqual(books_df.at[0, "year"], -800)
+        self.assertEqual(CatalogStore.from_frame(books_df).to_frame().at[0, "year"], -800)
+
+        save_books_to_file(self.TEST_FILE)
+        self.assertEqual(pd.read_csv(self.TEST_FILE)["year"].tolist(), [-800])
+        self.assertEqual(load_books_from_file(self.TEST_FILE, use_cache=False).at[0, "year"], -800)
+
+
+if __name__ == "__main__":
+    unittest.main()
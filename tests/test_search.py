@@ -1,6 +1,6 @@
 import unittest
 import pandas as pd
-from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByGenre, SearchByYear
+from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByGenre, SearchByYear, SearchByKeywords
 
 class TestSearchStrategies(unittest.TestCase):
     def setUp(self):
@@ -55,5 +55,19 @@ class TestSearchStrategies(unittest.TestCase):
         results = self.search_manager.search(self.books_df, "Non-Existent Book")
         self.assertTrue(results.empty)
 
+    def test_search_by_keywords(self):
+        """
+        Test token search: every word must start a word of the title or author.
+        """
+        self.search_manager.set_strategy(SearchByKeywords())
+        results = self.search_manager.search(self.books_df, "the prag")
+        self.assertEqual(results["id"].tolist(), [2])
+        results = self.search_manager.search(self.books_df, "design gamma")
+        self.assertEqual(results["id"].tolist(), [3])
+        self.assertTrue(self.search_manager.search(self.books_df, "ode").empty)
+
+        self.search_manager.set_strategy(SearchByKeywords(fields=["author"]))
+        self.assertTrue(self.search_manager.search(self.books_df, "design").empty)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import pandas as pd
+from data.books import DataManager, update_book_in_dataframe, row_to_book
+from data.schema import new_book_row
+from models.search_cache import SearchCache
+from models.search_strategy import SearchManager, SearchByName, SearchByAuthor, SearchByKeywords
+
+
+class TestSearchCache(unittest.TestCase):
+    def test_least_recently_used_results_are_evicted(self):
+        cache = SearchCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "evictions": 1, "size": 2})
+
+    def test_catalog_changes_are_never_served_stale(self):
+        data_manager = DataManager.get_instance()
+        data_manager.initialize_data(pd.concat([
+            new_book_row("Clean Code", "Robert C. Martin", "Programming", 2008, 1),
+            new_book_row("Design Patterns", "Erich Gamma", "Programming", 1994, 2),
+        ], ignore_index=True))
+        manager = SearchManager(SearchByName(), cache=SearchCache())
+
+        self.assertEqual(manager.search(data_manager.get_data(), "code")["title"].tolist(), ["Clean Code"])
+        result = manager.search(data_manager.get_data(), "code")
+        self.assertEqual(manager.cache_stats()["hits"], 1)
+        # Changing a returned result leaves the cached one intact
+        result.loc[result.index[0], "title"] = "Changed"
+        self.assertEqual(manager.search(data_manager.get_data(), "code")["title"].tolist(), ["Clean Code"])
+
+        data_manager.append_rows(new_book_row("Code Complete", "Steve McConnell", "Programming", 1993, 1))
+        self.assertEqual(manager.search(data_manager.get_data(), "code")["title"].tolist(),
+                         ["Clean Code", "Code Complete"])
+        book = row_to_book(data_manager.get_data().iloc[0])
+        book.copies = 3
+        update_book_in_dataframe(book)
+        self.assertEqual(manager.search(data_manager.get_data(), "code")["copies"].tolist(), [3, 1])
+
+        # Strategies and their settings are part of the key
+        manager.set_strategy(SearchByAuthor())
+        self.assertTrue(manager.search(data_manager.get_data(), "code").empty)
+        manager.set_strategy(SearchByKeywords(fields=["author"]))
+        self.assertEqual(manager.search(data_manager.get_data(), "gamma")["title"].tolist(), ["Design Patterns"])
+        self.assertEqual(manager.cache_stats()["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
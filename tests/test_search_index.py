@@ -0,0 +1,40 @@
+import unittest
+import pandas as pd
+from models.search_index import SearchIndex, tokenize
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex.from_frame(pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming"},
+            {"title": "The Clean Coder", "author": "Robert C. Martin", "genre": "Programming"},
+            {"title": "Dune", "author": "Frank Herbert", "genre": "Science Fiction"},
+        ]))
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Hello, World-2!"), ["hello", "world", "2"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_prefix_and_multi_token_queries(self):
+        self.assertEqual(self.index.search("clean code"), [("Clean Code", "Robert C. Martin"), ("The Clean Coder", "Robert C. Martin")])
+        self.assertEqual(self.index.search("coder"), [("The Clean Coder", "Robert C. Martin")])
+        self.assertEqual(self.index.search("fiction herb"), [("Dune", "Frank Herbert")])
+        self.assertEqual(self.index.search("herbert", fields=["title"]), [])
+        self.assertEqual(self.index.search("  "), [])
+
+    def test_incremental_updates(self):
+        self.index.add("Code Complete", "Steve McConnell", "Programming")
+        self.assertEqual(len(self.index.search("code")), 3)
+        self.assertTrue(self.index.remove("Clean Code", "Robert C. Martin"))
+        self.assertFalse(self.index.remove("Clean Code", "Robert C. Martin"))
+        self.assertEqual(self.index.search("code"), [("The Clean Coder", "Robert C. Martin"), ("Code Complete", "Steve McConnell")])
+
+        # Tokens disappear from the vocabulary with their last book
+        self.index.remove("Dune", "Frank Herbert")
+        self.assertNotIn("dune", self.index.vocabulary["title"])
+        self.assertEqual(self.index.search("d"), [])
+        self.assertEqual(len(self.index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
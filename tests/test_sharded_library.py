@@ -0,0 +1,62 @@
+import unittest
+import os
+import pandas as pd
+from data.cache import clear_cache
+from models.book import Book
+from models.search_strategy import SearchByAuthor
+from services.sharded_library import ShardedLibrary, shard_of, shard_paths, split_catalog
+
+
+class TestShardedLibrary(unittest.TestCase):
+    TEST_FILE = "test_sharded_books.csv"
+    SHARDS = 2
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file; shard files are created from it on demand.
+        """
+        pd.DataFrame([
+            {"title": f"Book {i}", "author": f"Author {i % 3}", "genre": "Fiction", "year": 2000 + i,
+             "copies": 1 + i % 2, "is_loaned": "no"}
+            for i in range(12)
+        ]).to_csv(self.TEST_FILE, index=False)
+
+    def tearDown(self):
+        for path in [self.TEST_FILE, *shard_paths(self.TEST_FILE, self.SHARDS)]:
+            clear_cache(path)
+            for leftover in (path, f"{path}.journal"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+    def test_split_catalog_partitions_by_hash(self):
+        paths = split_catalog(self.TEST_FILE, self.SHARDS)
+        shards = [pd.read_csv(path) for path in paths]
+        self.assertEqual(sum(len(shard) for shard in shards), 12)
+        for index, shard in enumerate(shards):
+            for title, author in zip(shard["title"], shard["author"]):
+                self.assertEqual(shard_of(title, author, self.SHARDS), index)
+
+    def test_router_forwards_and_gathers(self):
+        with ShardedLibrary(self.TEST_FILE, shards=self.SHARDS) as library:
+            self.assertTrue(library.borrow_book("Book 0", "Author 0", "user1"))
+            self.assertFalse(library.borrow_book("Book 0", "Author 0", "user2"))
+            self.assertEqual(library.get_book("Book 0", "Author 0").waiting_list, ["user2"])
+            self.assertIsNone(library.get_book("Book 0", "Nobody"))
+
+            requests = [(f"Book {i}", f"Author {i % 3}", "user3") for i in range(1, 6)] + [("Missing", "Nobody", "user3")]
+            self.assertEqual(library.borrow_many(requests), [True] * 5 + [False])
+            self.assertEqual(library.return_many([("Book 1", "Author 1"), ("Book 6", "Author 0")]), [True, False])
+            self.assertEqual(library.add_books([Book("Book 12", "Author 0", "Fiction", 2012, 1)]), [True])
+
+            found = library.search_books("Author 0", SearchByAuthor())
+            self.assertEqual(sorted(found["title"]), ["Book 0", "Book 12", "Book 3", "Book 6", "Book 9"])
+
+        # Every shard saved its own part of the catalog
+        saved = pd.concat([pd.read_csv(path) for path in shard_paths(self.TEST_FILE, self.SHARDS)]).set_index("title")
+        self.assertEqual(len(saved), 13)
+        self.assertEqual(saved.at["Book 0", "is_loaned"], "Y")
+        self.assertEqual(saved.at["Book 1", "is_loaned"], "NN")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import os
+import numpy as np
+import pandas as pd
+from data.books import DataManager, load_books_from_file, save_books_to_file
+from data.cache import clear_cache
+from data.snapshot import convert_csv_to_snapshot, is_snapshot_path, save_snapshot, load_snapshot
+
+
+class TestSnapshot(unittest.TestCase):
+    CSV_FILE = "test_snapshot_books.csv"
+    SNAPSHOT_FILE = "test_snapshot_books.npy"
+
+    def setUp(self):
+        """
+        Set up a temporary CSV file to convert.
+        """
+        pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 3, "is_loaned": "YNY"},
+            {"title": "Refactoring", "author": "Martin Fowler", "genre": "Programming", "year": 1999, "copies": 1, "is_loaned": "no"},
+        ]).to_csv(self.CSV_FILE, index=False)
+
+    def tearDown(self):
+        clear_cache(self.CSV_FILE)
+        for path in (self.CSV_FILE, self.SNAPSHOT_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_is_snapshot_path(self):
+        self.assertTrue(is_snapshot_path("data/books.npy"))
+        self.assertFalse(is_snapshot_path("data/books.csv"))
+
+    def test_convert_and_load_matches_csv(self):
+        csv_df = load_books_from_file(self.CSV_FILE).copy()
+        self.assertEqual(convert_csv_to_snapshot(self.CSV_FILE), self.SNAPSHOT_FILE)
+
+        snapshot_df = load_books_from_file(self.SNAPSHOT_FILE)
+        self.assertEqual(list(snapshot_df.columns), list(csv_df.columns))
+        for column in ("title", "author", "year", "copies", "available", "borrow_count", "popularity_score"):
+            self.assertEqual(snapshot_df[column].tolist(), csv_df[column].tolist())
+        self.assertEqual(snapshot_df.iloc[0]["is_loaned"], "YNY")
+
+    def test_load_is_memory_mapped_and_copy_on_write(self):
+        convert_csv_to_snapshot(self.CSV_FILE, self.SNAPSHOT_FILE)
+        books_df = load_books_from_file(self.SNAPSHOT_FILE)
+        mapped = np.load(self.SNAPSHOT_FILE, mmap_mode="r")
+        base = books_df["year"].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        self.assertIsInstance(base, np.memmap)
+
+        books_df.at[0, "available"] = 0
+        self.assertEqual(int(mapped["available"][0]), 1)
+
+    def test_save_round_trip(self):
+        convert_csv_to_snapshot(self.CSV_FILE, self.SNAPSHOT_FILE)
+        books_df = load_books_from_file(self.SNAPSHOT_FILE)
+        books_df.at[1, "is_loaned"] = "Y"
+        books_df.at[1, "available"] = 0
+        save_books_to_file(self.SNAPSHOT_FILE)
+
+        reloaded = load_books_from_file(self.SNAPSHOT_FILE)
+        self.assertEqual(reloaded.iloc[1]["is_loaned"], "Y")
+        self.assertEqual(reloaded.iloc[1]["available"], 0)
+        self.assertIs(DataManager.get_instance().get_data(), reloaded)
+
+    def test_waiting_lists_and_missing_values_round_trip(self):
+        books_df = load_books_from_file(self.CSV_FILE).copy()
+        books_df["waiting_list"] = pd.Series([["user1", {"name": "Dana", "phone": "050"}], []], dtype=object)
+        books_df["genre"] = books_df["genre"].cat.add_categories(["Essays"]).astype(object)
+        books_df.at[1, "genre"] = None
+        save_snapshot(books_df, self.SNAPSHOT_FILE)
+
+        reloaded = load_snapshot(self.SNAPSHOT_FILE)
+        self.assertEqual(reloaded["waiting_list"].tolist(), [["user1", {"name": "Dana", "phone": "050"}], []])
+        self.assertIsNot(reloaded.at[1, "waiting_list"], load_snapshot(self.SNAPSHOT_FILE).at[1, "waiting_list"])
+        self.assertEqual(reloaded.at[0, "genre"], "Programming")
+        self.assertTrue(pd.isna(reloaded.at[1, "genre"]))
+        self.assertEqual(reloaded["year"].tolist(), books_df["year"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import pandas as pd
+from data.books import DataManager, load_books_from_file, save_books_to_file
+from data.schema import new_book_row
+from data.cache import clear_cache
+from data.sqlite_store import SQLiteBookStore
+from models.book import Book
+from services.library_manager import LibraryManager
+
+
+class TestSQLiteBookStore(unittest.TestCase):
+    CSV_FILE = "test_sqlite_books.csv"
+    DB_FILE = "test_sqlite_books.db"
+
+    def setUp(self):
+        """
+        Import a temporary CSV catalog into a SQLite database.
+        """
+        pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 2, "is_loaned": "YN"},
+            {"title": "Refactoring", "author": "Martin Fowler", "genre": "Programming", "year": 1999, "copies": 1, "is_loaned": "no"},
+            {"title": "Dune", "author": "Frank Herbert", "genre": "Science Fiction", "year": 1965, "copies": 3, "is_loaned": "no"},
+        ]).to_csv(self.CSV_FILE, index=False)
+        load_books_from_file(self.CSV_FILE)
+        save_books_to_file(self.DB_FILE)
+
+    def tearDown(self):
+        DataManager.get_instance().attach_engine(None)
+        clear_cache(self.CSV_FILE)
+        for path in (self.CSV_FILE, self.DB_FILE, self.DB_FILE + "-wal", self.DB_FILE + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_load_from_database(self):
+        books_df = load_books_from_file(self.DB_FILE)
+        self.assertEqual(books_df["title"].tolist(), ["Clean Code", "Refactoring", "Dune"])
+        self.assertEqual(books_df.iloc[0]["is_loaned"], "YN")
+        self.assertEqual(books_df["available"].tolist(), [1, 1, 3])
+        data_manager = DataManager.get_instance()
+        self.assertIsNotNone(data_manager.engine)
+
+        # The table is read when the whole catalog is first needed
+        self.assertTrue(data_manager.catalog_unread())
+        self.assertEqual(data_manager.get_data()["title"].tolist(), ["Clean Code", "Refactoring", "Dune"])
+        self.assertFalse(data_manager.catalog_unread())
+
+    def test_targeted_reads(self):
+        load_books_from_file(self.DB_FILE)
+        data_manager = DataManager.get_instance()
+        row = data_manager.get_book_row("Dune", "Frank Herbert")
+        self.assertEqual(row["copies"], 3)
+        self.assertIsNone(data_manager.get_book_row("Dune", "Someone Else"))
+        self.assertEqual(data_manager.get_page(1, 1)["title"].tolist(), ["Refactoring"])
+        self.assertEqual(data_manager.count_books(), 3)
+
+        # A changed row is written back on its own, as the books window does
+        row["is_loaned"] = "NYN"
+        row["borrow_count"] += 1
+        data_manager.update_book_row(row)
+        save_books_to_file(self.DB_FILE)
+        self.assertTrue(data_manager.catalog_unread())
+        row = data_manager.get_book_row("Dune", "Frank Herbert")
+        self.assertEqual((row["is_loaned"], row["available"], row["borrow_count"]), ("NYN", 2, 1))
+        self.assertEqual(data_manager.get_data().iloc[2]["is_loaned"], "NYN")
+
+        data_manager.update_book_row({**row, "is_loaned": "NNN"})
+        self.assertEqual(data_manager.get_data().iloc[2]["available"], 3)
+        self.assertEqual(data_manager.get_book_row("Dune", "Frank Herbert")["is_loaned"], "NNN")
+
+    def test_appended_rows_reach_the_database(self):
+        load_books_from_file(self.DB_FILE)
+        data_manager = DataManager.get_instance()
+        # The books window adds rows without reading the catalog first
+        data_manager.append_rows(new_book_row("Emma", "Jane Austen", "Uncategorized", 1815, 2))
+        self.assertEqual(data_manager.get_book_row("Emma", "Jane Austen")["copies"], 2)
+        self.assertEqual(data_manager.count_books(), 4)
+        self.assertEqual(data_manager.get_data()["title"].tolist(), ["Clean Code", "Refactoring", "Dune", "Emma"])
+
+        # Once the catalog is read, new rows go to both
+        data_manager.append_rows(new_book_row("Persuasion", "Jane Austen", "Uncategorized", 1817, 1))
+        self.assertEqual(data_manager.get_page(4, 10)["title"].tolist(), ["Persuasion"])
+        self.assertEqual(data_manager.get_data()["title"].tolist()[-1], "Persuasion")
+        self.assertEqual(len(data_manager.get_data()), 5)
+
+    def test_library_manager_writes_single_rows(self):
+        library_manager = LibraryManager(self.DB_FILE)
+        library_manager.borrow_book("Dune", "Frank Herbert", "user1")
+        library_manager.add_book(Book("Code Complete", "Steve McConnell", "Programming", 2004, 2))
+        library_manager.remove_book("Refactoring", "Martin Fowler")
+
+        store = SQLiteBookStore(self.DB_FILE)
+        books_df = store.read_frame()
+        store.close()
+        self.assertEqual(books_df["title"].tolist(), ["Clean Code", "Dune", "Code Complete"])
+        dune = books_df[books_df["title"] == "Dune"].iloc[0]
+        self.assertEqual(dune["is_loaned"], "YNN")
+        self.assertEqual(dune["borrow_count"], 1)
+
+    def test_set_loan_state(self):
+        store = SQLiteBookStore(self.DB_FILE)
+        # The stored book has two copies; copy 5 has no loan row
+        book = Book("Clean Code", "Robert C. Martin", "Programming", 2008, 5)
+        book.is_loaned[1] = book.is_loaned[2] = "yes"
+        book.borrow_count = 4
+        self.assertTrue(store.set_loan_state(book, 2))
+        row = store.get_book_row("Clean Code", "Robert C. Martin")
+        self.assertEqual((row["available"], row["borrow_count"]), (0, 4))
+
+        book.is_loaned[5] = "yes"
+        book.borrow_count = 5
+        self.assertFalse(store.set_loan_state(book, 5))
+        self.assertEqual(store.get_book_row("Clean Code", "Robert C. Martin")["borrow_count"], 4)
+        store.close()
+
+    def test_borrow_and_return_update_one_loan_row(self):
+        library_manager = LibraryManager(self.DB_FILE)
+        statements = []
+        DataManager.get_instance().engine.connection.set_trace_callback(statements.append)
+
+        self.assertTrue(library_manager.borrow_book("Dune", "Frank Herbert", "user1"))
+        self.assertTrue(library_manager.return_book("Dune", "Frank Herbert", "user1"))
+        writes = [statement for statement in statements if statement.startswith(("UPDATE", "INSERT", "DELETE"))]
+        self.assertEqual([statement.split(" SET")[0] for statement in writes],
+                         ["UPDATE loans", "UPDATE books", "UPDATE loans", "UPDATE books"])
+        self.assertFalse(any("SELECT copy_id" in statement for statement in statements))
+
+        row = DataManager.get_instance().get_book_row("Dune", "Frank Herbert")
+        self.assertEqual((row["is_loaned"], row["borrow_count"]), ("NNN", 1))
+
+    def test_duplicate_title_author_rows(self):
+        store = SQLiteBookStore(self.DB_FILE)
+        store.insert_book(Book("Dune", "Frank Herbert", "Science Fiction", 1965, 1))
+        self.assertEqual(store.count_books(), 4)
+        # Single-book reads and writes use the first of the duplicates
+        self.assertEqual(store.get_book_row("Dune", "Frank Herbert")["copies"], 3)
+        self.assertTrue(store.delete_book("Dune", "Frank Herbert"))
+        self.assertEqual(store.get_book_row("Dune", "Frank Herbert")["copies"], 1)
+        store.close()
+
+    def test_save_catalog_with_duplicates(self):
+        books_df = load_books_from_file("data/books.csv")
+        clear_cache("data/books.csv")
+        self.assertTrue(books_df.duplicated(["title", "author"]).any())
+        save_books_to_file(self.DB_FILE)
+        store = SQLiteBookStore(self.DB_FILE)
+        self.assertEqual(store.count_books(), len(books_df))
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import os
+import random
+import pandas as pd
+from data.books import DataManager
+from data.cache import clear_cache
+from data.schema import new_book_row
+from models.book import Book
+from models.search_strategy import SearchByTrigrams, SearchByName, SearchByAuthor, SearchByGenre
+from services.library_manager import LibraryManager
+
+WORDS = ["The", "great", "Gatsby", "war", "and", "peace", "Code", "clean", "Straße", "İstanbul",
+         "café", "ספר", "O'Brien", "data-driven", "C#", "1984", "night", "NIGHTS", "a"]
+
+
+def random_frame(rng, rows):
+    """
+    A catalog with mixed case, punctuation, non-ASCII words, duplicates and missing values.
+    """
+    def phrase():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+    return pd.DataFrame({
+        "title": [phrase() if rng.random() > 0.05 else None for _ in range(rows)],
+        "author": [phrase() for _ in range(rows)],
+        "genre": [rng.choice(["Fiction", "Science Fiction", "Drama", "Programming", None]) for _ in range(rows)],
+    })
+
+
+def random_queries(rng, books_df, count):
+    """
+    Substrings of the values in every case, and strings that may not occur at all.
+    """
+    values = [value for column in ("title", "author", "genre") for value in books_df[column] if isinstance(value, str)]
+    queries = ["gats", "GATSBY", "c#", "o'b", "ss", "STRASSE", "istan", "ספ", "a.d", "xyz", " and ", "Night"]
+    for _ in range(count):
+        value = rng.choice(values)
+        start = rng.randrange(len(value))
+        query = value[start:start + rng.randint(1, 8)]
+        queries.append(rng.choice([query, query.upper(), query.lower(), query + "z"]))
+    return queries
+
+
+class TestTrigramSearchParity(unittest.TestCase):
+    """
+    SearchByTrigrams must return exactly the rows of the column scans it replaces.
+    """
+    TEST_FILE = "test_trigram_books.csv"
+    SCANS = {"title": SearchByName(), "author": SearchByAuthor(), "genre": SearchByGenre()}
+
+    def tearDown(self):
+        clear_cache(self.TEST_FILE)
+        for path in (self.TEST_FILE, f"{self.TEST_FILE}.barcodes"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def assertParity(self, books_df, queries, strategies):
+        for column, strategy in strategies.items():
+            for query in queries:
+                with self.subTest(column=column, query=query):
+                    pd.testing.assert_frame_equal(strategy.search(books_df, query), self.SCANS[column].search(books_df, query))
+
+    def test_parity_on_a_dataframe(self):
+        rng = random.Random(7)
+        books_df = random_frame(rng, 400)
+        strategies = {column: SearchByTrigrams(column) for column in self.SCANS}
+        self.assertParity(books_df, random_queries(rng, books_df, 300), strategies)
+
+    def test_parity_on_columns_without_trigrams(self):
+        books_df = pd.DataFrame({
+            "title": ["The Great Gatsby", "Clean Code", "Dune", "It"],
+            "author": ["A", "B", "C", "D"],
+            "genre": ["SF", "SF", "SF", "SF"],
+        })
+        for author in (["A", "B", "C", "D"], [None] * 4, [""] * 4):
+            books_df["author"] = author
+            strategies = {column: SearchByTrigrams(column) for column in self.SCANS}
+            self.assertParity(books_df, ["gats", "Code", "SF", "abc", "a", ""], strategies)
+
+    def test_parity_on_the_catalog_as_it_changes(self):
+        rng = random.Random(11)
+        books_df = random_frame(rng, 200).dropna(subset=["title"]).drop_duplicates(["title", "author"]).reset_index(drop=True)
+        data_manager = DataManager.get_instance()
+        data_manager.initialize_data(books_df)
+        strategies = {column: SearchByTrigrams(column) for column in self.SCANS}
+        queries = random_queries(rng, books_df, 100)
+        self.assertParity(data_manager.get_data(), queries, strategies)
+
+        # The index built above follows the changes instead of being rebuilt
+        index = data_manager.get_trigram_index()
+        data_manager.append_rows(new_book_row("The Great Gatsby Returns", "F. Scott", "Fiction", 2001, 1))
+        for title, author in books_df[["title", "author"]].head(20).itertuples(index=False):
+            data_manager.remove_row(title, author)
+        self.assertIs(data_manager.get_trigram_index(), index)
+        self.assertParity(data_manager.get_data(), queries, strategies)
+        self.assertIn("The Great Gatsby Returns", SearchByTrigrams().search(data_manager.get_data(), "gats")["title"].tolist())
+
+    def test_parity_through_library_manager(self):
+        pd.DataFrame([
+            {"title": "The Great Gatsby", "author": "F. Scott Fitzgerald", "genre": "Fiction", "year": 1925, "copies": 1},
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 2},
+        ]).to_csv(self.TEST_FILE, index=False)
+        library_manager = LibraryManager(self.TEST_FILE)
+        strategy = SearchByTrigrams()
+        self.assertEqual(library_manager.search_books("gats", strategy)["title"].tolist(), ["The Great Gatsby"])
+
+        library_manager.add_book(Book("Gatsby Revisited", "Anonymous", "Essays", 2020, 1))
+        library_manager.remove_book("The Great Gatsby", "F. Scott Fitzgerald")
+        for query in ("gats", "code", "e", "ted"):
+            pd.testing.assert_frame_equal(library_manager.search_books(query, strategy),
+                                          library_manager.search_books(query, SearchByName()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import pickle
+from models.book import Book
+from models.waiting_list import WaitingList
+
+
+class TestWaitingList(unittest.TestCase):
+    def test_fifo_and_membership(self):
+        waiting_list = WaitingList(["user1", "user2"])
+        waiting_list.append("user3")
+        self.assertIn("user2", waiting_list)
+        self.assertNotIn("user4", waiting_list)
+        self.assertEqual(len(waiting_list), 3)
+        self.assertEqual(waiting_list.popleft(), "user1")
+        self.assertNotIn("user1", waiting_list)
+        self.assertEqual(waiting_list, ["user2", "user3"])
+        self.assertEqual(waiting_list.peek(), "user2")
+
+    def test_cancel(self):
+        waiting_list = WaitingList(["user1", "user2", "user3", "user1"])
+        self.assertTrue(waiting_list.cancel("user1"))
+        self.assertFalse(waiting_list.cancel("user4"))
+        self.assertEqual(waiting_list.to_list(), ["user2", "user3", "user1"])
+        self.assertIn("user1", waiting_list)
+
+        self.assertTrue(waiting_list.cancel("user2"))
+        self.assertEqual(waiting_list.popleft(), "user3")
+        self.assertEqual(waiting_list.popleft(), "user1")
+        self.assertEqual(len(waiting_list), 0)
+        with self.assertRaises(IndexError):
+            waiting_list.popleft()
+
+    def test_compaction_keeps_order(self):
+        waiting_list = WaitingList(f"user{i}" for i in range(1000))
+        for i in range(1000):
+            if i % 3:
+                waiting_list.cancel(f"user{i}")
+        self.assertEqual(waiting_list.to_list(), [f"user{i}" for i in range(0, 1000, 3)])
+        self.assertLessEqual(len(waiting_list._queue), 2 * len(waiting_list) + 32)
+
+    def test_dict_entries_and_serialized_form(self):
+        entry = {"name": "Dana", "phone": "050", "email": "dana@example.com"}
+        waiting_list = WaitingList([entry])
+        self.assertIn(dict(entry), waiting_list)
+        self.assertEqual(repr(waiting_list), repr([entry]))
+        self.assertEqual(pickle.loads(pickle.dumps(waiting_list)), [entry])
+
+    def test_book_waiting_list(self):
+        book = Book("Dune", "Frank Herbert", "Fiction", 1965, 1, is_loaned_status="yes")
+        book.waiting_list = ["user1"]
+        self.assertIsInstance(book.waiting_list, WaitingList)
+        book.borrow("user2")
+        self.assertEqual(book.to_dict()["waiting_list"], ["user1", "user2"])
+        self.assertIs(type(book.to_dict()["waiting_list"]), list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import time
+import threading
+import pandas as pd
+from data.books import DataManager
+from data.cache import clear_cache
+from data.write_behind import WriteBehindFlusher
+from services.library_manager import LibraryManager
+
+
+class TestWriteBehindFlusher(unittest.TestCase):
+    def setUp(self):
+        self.flushes = []
+        self.flushed = threading.Event()
+
+    def _flush(self):
+        self.flushes.append(time.monotonic())
+        self.flushed.set()
+
+    def test_burst_is_coalesced_into_one_flush(self):
+        flusher = WriteBehindFlusher(self._flush, interval_ms=50, max_pending=1000)
+        for _ in range(200):
+            flusher.mark_dirty()
+        self.assertTrue(self.flushed.wait(2))
+        flusher.stop()
+        self.assertEqual(len(self.flushes), 1)
+
+    def test_max_pending_triggers_flush(self):
+        flusher = WriteBehindFlusher(self._flush, interval_ms=60000, max_pending=5)
+        for _ in range(5):
+            flusher.mark_dirty()
+        self.assertTrue(self.flushed.wait(2))
+        flusher.stop()
+        self.assertEqual(len(self.flushes), 1)
+
+    def test_stop_flushes_pending_mutations(self):
+        flusher = WriteBehindFlusher(self._flush, interval_ms=60000, max_pending=1000)
+        flusher.mark_dirty()
+        flusher.stop()
+        self.assertEqual(len(self.flushes), 1)
+
+    def test_stop_without_mutations_does_not_flush(self):
+        flusher = WriteBehindFlusher(self._flush, interval_ms=50, max_pending=10)
+        flusher.stop()
+        self.assertEqual(self.flushes, [])
+
+
+class TestLibraryManagerWriteBehind(unittest.TestCase):
+    TEST_FILE = "test_write_behind_books.csv"
+
+    def setUp(self):
+        pd.DataFrame([
+            {"title": "Clean Code", "author": "Robert C. Martin", "genre": "Programming", "year": 2008, "copies": 3, "is_loaned": "no"},
+        ]).to_csv(self.TEST_FILE, index=False)
+
+    def tearDown(self):
+        DataManager.get_instance().disable_write_behind()
+        clear_cache(self.TEST_FILE)
+        for path in (self.TEST_FILE,):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_borrows_are_saved_in_the_background(self):
+        library_manager = LibraryManager(self.TEST_FILE, write_behind=True, flush_interval_ms=60000)
+        for user_id in ("user1", "user2"):
+            library_manager.borrow_book("Clean Code", "Robert C. Martin", user_id)
+
+        self.assertTrue(DataManager.get_instance().dirty)
+        self.assertEqual(pd.read_csv(self.TEST_FILE).iloc[0]["is_loaned"], "no")
+
+        library_manager.close()
+        self.assertFalse(DataManager.get_instance().dirty)
+        self.assertEqual(pd.read_csv(self.TEST_FILE).iloc[0]["is_loaned"], "YYN")
+
+
+if __name__ == "__main__":
+    unittest.main()